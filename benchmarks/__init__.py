@@ -0,0 +1,10 @@
+"""Load-testing harness for the MCP-ACP bridge.
+
+- `benchmarks.fake_mcp_server`: an MCP server with configurable latency,
+  payload size and error rate, over stdio or mcpd's REST API
+- `benchmarks.serve_bridge`: runs a bridge in front of it
+- `benchmarks.loadgen`: drives the bridge at target concurrency levels and
+  compares the results with stored baselines
+
+See benchmarks/README.md.
+"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Fake MCP server for load tests.
+
+Serves three tools with controllable behaviour:
+
+- `echo(message)`: returns the message
+- `read_file(path, size)`: returns `size` bytes of text (default
+  `--payload-bytes`)
+- `list_files(path, count)`: returns `count` file names
+
+Every call first sleeps for a latency drawn from `--latency` and fails
+with probability `--error-rate`, so the bridge can be measured against a
+slow, large or flaky server without a real one.
+
+Two transports:
+
+- `--mode stdio`: newline-delimited JSON-RPC 2.0 on stdin/stdout, as MCP's
+  stdio transport (`initialize`, `tools/list`, `tools/call`, `ping`);
+  calls are answered concurrently
+- `--mode http`: mcpd's REST API on `--port`, publishing the tools under
+  the server name `--server-name`
+
+Latency specs: `fixed:S`, `uniform:LO,HI`, `exponential:MEAN`,
+`lognormal:MEDIAN,SIGMA` (all in seconds).
+
+    python -m benchmarks.fake_mcp_server --mode http --port 8099 \\
+        --latency lognormal:0.01,0.5 --payload-bytes 4096 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+TOOLS: List[Dict[str, Any]] = [
+    {
+        "name": "echo",
+        "description": "Echo back the message",
+        "inputSchema": {"type": "object", "properties": {"message": {"type": "string"}}},
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "read_file",
+        "description": "Return `size` bytes of file contents",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"path": {"type": "string"}, "size": {"type": "integer"}},
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "list_files",
+        "description": "List `count` files in a directory",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"path": {"type": "string"}, "count": {"type": "integer"}},
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+]
+
+
+class ToolError(Exception):
+    """A tool call failed (injected by `--error-rate`)."""
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Sampler of call latencies, in seconds, for a latency spec."""
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exponential" and len(values) == 1:
+        return lambda: random.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeTools:
+    """Tool implementations shared by both transports."""
+
+    def __init__(self, latency: Callable[[], float], payload_bytes: int, error_rate: float, seed: Optional[int] = None):
+        self.latency = latency
+        self.payload_bytes = payload_bytes
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def call(self, name: str, args: Dict[str, Any]) -> str:
+        self.calls += 1
+        delay = self.latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ToolError(f"Injected failure in {name}")
+
+        if name == "echo":
+            return str(args.get("message", ""))
+        if name == "read_file":
+            size = int(args.get("size", self.payload_bytes))
+            line = f"{args.get('path', 'file.txt')}: lorem ipsum dolor sit amet\n"
+            return (line * (size // len(line) + 1))[:size]
+        if name == "list_files":
+            count = int(args.get("count", 10))
+            return json.dumps([f"{args.get('path', '.')}/file{i}.txt" for i in range(count)])
+        raise ToolError(f"Unknown tool: {name}")
+
+
+async def serve_stdio(tools: FakeTools) -> None:
+    """Answer JSON-RPC requests on stdin until it is closed."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 24)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def send(message: Dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    async def handle(request: Dict[str, Any]) -> None:
+        method = request.get("method")
+        request_id = request.get("id")
+        if request_id is None:
+            return  # notification
+        params = request.get("params") or {}
+
+        if method == "initialize":
+            result = {
+                "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": "fake-mcp-server", "version": "1.0.0"},
+            }
+        elif method == "tools/list":
+            result = {"tools": TOOLS}
+        elif method == "tools/call":
+            try:
+                text = await tools.call(params.get("name", ""), params.get("arguments") or {})
+                result = {"content": [{"type": "text", "text": text}], "isError": False}
+            except ToolError as e:
+                result = {"content": [{"type": "text", "text": str(e)}], "isError": True}
+        elif method == "ping":
+            result = {}
+        else:
+            send({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": f"Method not found: {method}"}})
+            return
+        send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    pending = set()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            send({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+            continue
+        task = asyncio.ensure_future(handle(request))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def create_http_app(tools: FakeTools, server_name: str = "fake"):
+    """Starlette app serving the tools through mcpd's REST API."""
+    from starlette.applications import Starlette
+    from starlette.requests import ClientDisconnect
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    tool_names = {tool["name"] for tool in TOOLS}
+
+    async def list_servers(request):
+        return JSONResponse([server_name])
+
+    async def list_tools(request):
+        if request.path_params["server"] != server_name:
+            return JSONResponse({"error": "Server not found"}, status_code=404)
+        return JSONResponse({"tools": TOOLS})
+
+    async def call_tool(request):
+        tool = request.path_params["tool"]
+        if request.path_params["server"] != server_name or tool not in tool_names:
+            return JSONResponse({"error": "Tool not found"}, status_code=404)
+        try:
+            args = await request.json()
+        except json.JSONDecodeError:
+            args = {}
+        except ClientDisconnect:
+            # e.g. the losing attempt of a hedged call
+            return Response(status_code=499)
+        try:
+            return JSONResponse({"body": await tools.call(tool, args or {})})
+        except ToolError as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    return Starlette(routes=[
+        Route("/api/v1/servers", list_servers, methods=["GET"]),
+        Route("/api/v1/servers/{server}/tools", list_tools, methods=["GET"]),
+        Route("/api/v1/servers/{server}/tools/{tool}", call_tool, methods=["POST"]),
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--server-name", default="fake", help="mcpd server name in http mode")
+    parser.add_argument("--latency", default="fixed:0", help="Latency distribution of each call")
+    parser.add_argument("--payload-bytes", type=int, default=1024, help="Default read_file result size")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    tools = FakeTools(parse_latency(args.latency), args.payload_bytes, args.error_rate, args.seed)
+
+    if args.mode == "stdio":
+        asyncio.run(serve_stdio(tools))
+    else:
+        import uvicorn
+        uvicorn.run(create_http_app(tools, args.server_name), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Import-time budget check for the bridge's cold start.
+
+Imports a module in a fresh interpreter under `python -X importtime`,
+several times, and keeps the fastest run of each module to damp noise.
+It reports the slowest imports and exits with status 1 when the total
+goes over `--budget-ms`, or when a module that should load lazily (see
+`LAZY_MODULES`) was imported.
+
+    python -m benchmarks.import_time bridge.server_acp --budget-ms 400
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Optional or heavy dependencies the bridge only imports when first used
+LAZY_MODULES = ("agntcy_acp", "httpx", "uvicorn", "starlette")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """`{module: (self_us, cumulative_us)}` from `-X importtime` output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_import(module: str, runs: int = 5) -> Dict[str, Tuple[int, int]]:
+    """Fastest `(self_us, cumulative_us)` per module over `runs` cold imports."""
+    best: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+        for name, timing in parse_importtime(completed.stderr).items():
+            best[name] = min(best.get(name, timing), timing, key=lambda t: t[1])
+    return best
+
+
+def lazy_modules_loaded(timings: Dict[str, Tuple[int, int]], lazy: Sequence[str] = LAZY_MODULES) -> List[str]:
+    """The lazily loaded packages that were imported anyway."""
+    return [name for name in lazy if name in timings]
+
+
+def format_slowest(timings: Dict[str, Tuple[int, int]], limit: int = 15) -> str:
+    """The `limit` imports with the most cumulative time, in ms."""
+    rows = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    width = max((len(name) for name, _ in rows), default=0)
+    return "\n".join(
+        f"{name.ljust(width)}  {cumulative / 1000:8.1f} ms  (self {self_us / 1000:.1f} ms)"
+        for name, (self_us, cumulative) in rows
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="bridge.server_acp")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Longest acceptable cumulative import time")
+    parser.add_argument("--runs", type=int, default=5, help="Cold imports to take the fastest of")
+    args = parser.parse_args(argv)
+
+    timings = measure_import(args.module, args.runs)
+    total_ms = timings[args.module][1] / 1000
+    print(format_slowest(timings))
+    print(f"\n{args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    loaded = lazy_modules_loaded(timings)
+    if loaded:
+        print(f"Imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("Over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Load generator for the MCP-ACP bridge.
+
+By default it starts the fake MCP server and a bridge in front of it as
+subprocesses, then for each scenario and concurrency level keeps that
+many requests in flight for `--duration` seconds (closed loop). The first
+`--warmup` seconds of each level are not measured. It reports throughput,
+p50/p95/p99 latency and the bridge's resident memory, and compares them
+with the stored baselines.
+
+Scenarios:
+
+- `runs`: POST {endpoint}/runs/stateless calling `read_file` with a
+  `--payload-bytes` result
+- `agents`: GET {endpoint}/agents
+- `stream`: POST {endpoint}/runs/stateless/stream, read to the last event
+  (skipped when the server has no streaming route, as the bridge does not)
+
+    python -m benchmarks.loadgen --concurrency 1,8,32 --duration 10
+    python -m benchmarks.loadgen --target http://127.0.0.1:8090/acp --pid 1234
+
+Exits with status 1 when a metric is more than `--tolerance` worse than
+its baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .report import DEFAULT_TOLERANCE, compare, format_table, load_baseline, read_rss_mb, save_baseline, summarize
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+class Scenario:
+    """A request shape sent repeatedly by the workers."""
+
+    def __init__(self, name: str, method: str, path: str, body: Optional[Dict[str, Any]] = None, stream: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.stream = stream
+
+    async def send(self, client: httpx.AsyncClient) -> bool:
+        """Send one request; True if it succeeded."""
+        if self.stream:
+            async with client.stream(self.method, self.path, json=self.body) as response:
+                if response.status_code != 200:
+                    return False
+                last = None
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        last = line
+                return last is not None and _run_succeeded(json.loads(last[6:]))
+        response = await client.request(self.method, self.path, json=self.body)
+        if response.status_code != 200:
+            return False
+        return self.body is None or _run_succeeded(response.json())
+
+
+def _run_succeeded(run: Any) -> bool:
+    return not isinstance(run, dict) or run.get("status", "completed") == "completed"
+
+
+def build_scenarios(tool: str, payload_bytes: int) -> Dict[str, Scenario]:
+    return {
+        "runs": Scenario(
+            "runs", "POST", "/runs/stateless",
+            {"config": {"tool": tool, "args": {"path": "bench.txt", "size": payload_bytes}}},
+        ),
+        "agents": Scenario("agents", "GET", "/agents"),
+        "stream": Scenario(
+            "stream", "POST", "/runs/stateless/stream", {"input": {"query": "benchmark"}}, stream=True
+        ),
+    }
+
+
+async def run_level(base_url: str, scenario: Scenario, concurrency: int, duration: float, warmup: float, pid: Optional[int]) -> Dict[str, Any]:
+    """Keep `concurrency` requests in flight for `duration` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        deadline = started + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    ok = await scenario.send(client)
+                except httpx.HTTPError:
+                    ok = False
+                if start < measure_from:
+                    continue
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - measure_from
+    return summarize(latencies, errors, elapsed, read_rss_mb(pid) if pid else None)
+
+
+async def supports(base_url: str, scenario: Scenario) -> bool:
+    """Whether the server has a route for the scenario."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        response = await client.request(scenario.method, scenario.path, json=scenario.body)
+        return response.status_code not in (404, 405)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process exited with code {process.returncode} before serving {url}")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def _fake_server_args(args: argparse.Namespace) -> List[str]:
+    return [
+        "--latency", args.latency,
+        "--payload-bytes", str(args.payload_bytes),
+        "--error-rate", str(args.error_rate),
+    ]
+
+
+async def start_stack(args: argparse.Namespace) -> tuple:
+    """Start the fake server and bridge; return `(base_url, bridge_process, processes)`."""
+    python = sys.executable
+    processes = []
+    bridge_port = _free_port()
+    bridge_args = [python, "-m", "benchmarks.serve_bridge", "--port", str(bridge_port), "--config", args.bridge_config]
+    if args.backend == "mcpd":
+        mcpd_port = _free_port()
+        fake = subprocess.Popen(
+            [python, "-m", "benchmarks.fake_mcp_server", "--mode", "http", "--port", str(mcpd_port)] + _fake_server_args(args)
+        )
+        processes.append(fake)
+        await _wait_until_ready(f"http://127.0.0.1:{mcpd_port}/api/v1/servers", fake)
+        bridge_args += ["--mcpd-url", f"http://127.0.0.1:{mcpd_port}"]
+    else:
+        command = " ".join([python, "-m", "benchmarks.fake_mcp_server", "--mode", "stdio"] + _fake_server_args(args))
+        bridge_args += ["--mcp-command", command]
+
+    bridge = subprocess.Popen(bridge_args, stdout=subprocess.DEVNULL)
+    processes.append(bridge)
+    base_url = f"http://127.0.0.1:{bridge_port}/mcp-bridge"
+    await _wait_until_ready(f"{base_url}/agents", bridge)
+    return base_url, bridge, processes
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    processes: List[subprocess.Popen] = []
+    if args.target:
+        base_url, pid, backend = args.target.rstrip("/"), args.pid, "external"
+    else:
+        base_url, bridge, processes = await start_stack(args)
+        pid, backend = bridge.pid, args.backend
+
+    tool = "fake/read_file" if backend == "mcpd" else "read_file"
+    scenarios = build_scenarios(args.tool or tool, args.payload_bytes)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name in args.scenarios.split(","):
+            scenario = scenarios[name]
+            if not await supports(base_url, scenario):
+                print(f"Skipping {name}: no {scenario.method} {scenario.path} on this server")
+                continue
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                key = f"{backend}/{name}@{concurrency}"
+                results[key] = await run_level(base_url, scenario, concurrency, args.duration + args.warmup, args.warmup, pid)
+                print(f"{key}: {results[key]}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+    print()
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        environment = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "latency": args.latency,
+            "payload_bytes": args.payload_bytes,
+            "error_rate": args.error_rate,
+            "duration": args.duration,
+        }
+        save_baseline(args.baseline, results, environment)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="runs,agents,stream")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each level")
+    parser.add_argument("--backend", choices=["mcpd", "stdio"], default="mcpd", help="How the bridge reaches the fake server")
+    parser.add_argument("--bridge-config", default="{}", help="Extra bridge config as JSON")
+    parser.add_argument("--latency", default="fixed:0.005", help="Fake server latency spec")
+    parser.add_argument("--payload-bytes", type=int, default=1024)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tool", help="Tool called by the runs scenario")
+    parser.add_argument("--target", help="Benchmark a running server at this base URL instead")
+    parser.add_argument("--pid", type=int, help="Process id of --target, for memory readings")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--output", help="Also write results as JSON to this file")
+    sys.exit(asyncio.run(main_async(parser.parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of the bridge's fixed per-request overhead.
+
+Times the steps a run request goes through besides the tool call itself,
+against a backend whose tools return immediately:
+
+- `parse_run_request`: `RunCreateStateless(**body)`
+- `execute_stateless_run`: dispatch, metrics and result construction
+- `run_result_dump`: building a `RunStateless` and dumping it to a dict
+- `json_response`: encoding the run with Starlette's `JSONResponse`
+- `create_agent_response`: the `/agents` response object, dumped
+- `create_acp_manifest`: building the manifest from the tool catalog
+
+Each variant runs in its own interpreter: `fallback` blocks `agntcy_acp`
+so the bridge's fallback classes are measured, `acp` uses the installed
+SDK (reported as unavailable when it is not installed).
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --variants fallback --tools 100 --save-baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.abc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .report import DEFAULT_TOLERANCE, compare, load_baseline, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "micro_baselines.json")
+VARIANTS = ("fallback", "acp")
+
+
+class _BlockModule(importlib.abc.MetaPathFinder):
+    """Makes a package unimportable, as if it were not installed."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname == self.name or fullname.startswith(self.name + "."):
+            raise ModuleNotFoundError(f"No module named '{fullname}' (blocked)", name=fullname)
+        return None
+
+
+def _build(tool_count: int) -> List[Tuple[str, Callable[[], Any], bool]]:
+    """The benchmarks as `(name, function, is_async)`."""
+    from starlette.responses import JSONResponse
+
+    from bridge.backends import MCPBackend, MCPTool
+    from bridge.bridge_executor import MCPToACPBridgeExecutor, RunCreateStateless, RunStateless, RunStatus
+    from bridge.config_acp import MCPToACPBridgeConfig
+    from bridge.server_acp import _create_agent_response
+
+    class NullBackend(MCPBackend):
+        """Backend whose tools answer instantly."""
+
+        def __init__(self):
+            self.tools = [
+                MCPTool(
+                    f"tool_{i}",
+                    f"Benchmark tool {i}",
+                    {"type": "object", "properties": {"message": {"type": "string"}}},
+                )
+                for i in range(tool_count)
+            ]
+
+        async def connect(self) -> None:
+            pass
+
+        async def disconnect(self) -> None:
+            pass
+
+        async def list_raw_tools(self) -> List[MCPTool]:
+            return self.tools
+
+        async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+            return args.get("message")
+
+    def dump(run: Any) -> Dict[str, Any]:
+        # As the server does
+        return run.model_dump() if hasattr(run, "model_dump") else run.__dict__
+
+    # The watchdog would outlive the short-lived loops used here
+    config = MCPToACPBridgeConfig(mcp_command="true", server_name="bench", loop_stall_threshold=None)
+    executor = MCPToACPBridgeExecutor(NullBackend(), config)
+    asyncio.run(executor.initialize())
+
+    body = {"config": {"tool": "tool_0", "args": {"message": "hello"}}}
+    run_request = RunCreateStateless(**body)
+    result_dict = dump(asyncio.run(executor.execute_stateless_run(run_request)))
+    output = {"result": "hello", "tool": "tool_0", "success": True}
+
+    return [
+        ("parse_run_request", lambda: RunCreateStateless(**body), False),
+        ("execute_stateless_run", lambda: executor.execute_stateless_run(run_request), True),
+        ("run_result_dump", lambda: dump(RunStateless(id="run", status=RunStatus.completed, output=output)), False),
+        ("json_response", lambda: JSONResponse(result_dict), False),
+        ("create_agent_response", lambda: dump(_create_agent_response(executor, config)), False),
+        ("create_acp_manifest", executor._create_acp_manifest, True),
+    ]
+
+
+def _time_rounds(fn: Callable[[], Any], is_async: bool, number: int, repeat: int) -> List[float]:
+    """Seconds per call in each of `repeat` rounds of `number` calls."""
+    if is_async:
+        async def rounds() -> List[float]:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(number):
+                    await fn()
+                times.append((time.perf_counter() - start) / number)
+            return times
+        return asyncio.run(rounds())
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return times
+
+
+def measure(fn: Callable[[], Any], is_async: bool, repeat: int, min_round: float = 0.05) -> Dict[str, Any]:
+    """Median and best microseconds per call, with calls per round calibrated."""
+    number = 1
+    while _time_rounds(fn, is_async, number, 1)[0] * number < min_round and number < 10 ** 6:
+        number *= 4
+    times = _time_rounds(fn, is_async, number, repeat)
+    return {
+        "median_us": round(statistics.median(times) * 1e6, 2),
+        "min_us": round(min(times) * 1e6, 2),
+        "calls_per_round": number,
+    }
+
+
+def run_variant(variant: str, tool_count: int, repeat: int) -> Dict[str, Any]:
+    """Measure all benchmarks in this interpreter."""
+    if variant == "fallback":
+        sys.meta_path.insert(0, _BlockModule("agntcy_acp"))
+    else:
+        if importlib.util.find_spec("agntcy_acp") is None:
+            return {"unavailable": "agntcy_acp is not installed"}
+
+    results: Dict[str, Any] = {}
+    # The bridge logs with print; keep that off the JSON output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, fn, is_async in _build(tool_count):
+            try:
+                results[name] = measure(fn, is_async, repeat)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def _run_in_subprocess(variant: str, tool_count: int, repeat: int) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.micro", "--run-variant", variant, "--tools", str(tool_count), "--repeat", str(repeat)],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"unavailable": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+    return json.loads(completed.stdout)
+
+
+def format_results(results: Dict[str, Dict[str, Any]]) -> str:
+    """Median microseconds per benchmark, one column per variant."""
+    names: List[str] = []
+    for variant_results in results.values():
+        names.extend(name for name in variant_results if name not in names and name != "unavailable")
+    rows = [["benchmark (median us)"] + list(results)]
+    for name in names:
+        row = [name]
+        for variant_results in results.values():
+            entry = variant_results.get(name, {})
+            row.append(str(entry.get("median_us", entry.get("error", "-"))))
+        rows.append(row)
+    for variant, variant_results in results.items():
+        if "unavailable" in variant_results:
+            rows.append([f"({variant}: {variant_results['unavailable']})"] + [""] * len(results))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Comma-separated: fallback, acp")
+    parser.add_argument("--tools", type=int, default=20, help="Tools in the catalog")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--run-variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_variant:
+        print(json.dumps(run_variant(args.run_variant, args.tools, args.repeat)))
+        return
+
+    results = {variant: _run_in_subprocess(variant, args.tools, args.repeat) for variant in args.variants.split(",")}
+    print(format_results(results))
+
+    flat = {
+        f"{variant}/{name}": entry
+        for variant, variant_results in results.items()
+        for name, entry in variant_results.items()
+        if isinstance(entry, dict) and "median_us" in entry
+    }
+    if args.save_baseline:
+        environment = {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "tools": args.tools}
+        save_baseline(args.baseline, flat, environment)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    regressions = compare(flat, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Summaries of load-test runs and comparison with stored baselines."""
+
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+# Fractional change beyond which a metric counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, rss: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Throughput, latency percentiles (ms) and memory of one scenario run."""
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+    if rss:
+        summary.update({key: round(value, 1) for key, value in rss.items()})
+    return summary
+
+
+def read_rss_mb(pid: int) -> Optional[Dict[str, float]]:
+    """Current and peak resident memory of a process in MiB, if readable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {
+            "rss_mb": int(fields["VmRSS"].split()[0]) / 1024,
+            "peak_rss_mb": int(fields["VmHWM"].split()[0]) / 1024,
+        }
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        info = psutil.Process(pid).memory_info()
+    except psutil.Error:
+        return None
+    return {"rss_mb": info.rss / 2 ** 20}
+
+
+# metric -> True when higher is better
+_COMPARED = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+    "median_us": False,
+}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Describe each metric that is more than `tolerance` worse than the baseline."""
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        for metric, higher_is_better in _COMPARED.items():
+            if metric not in result or not expected.get(metric):
+                continue
+            change = (result[metric] - expected[metric]) / expected[metric]
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{key}: {metric} {result[metric]} vs baseline {expected[metric]} ({change:+.0%})"
+                )
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    """Results as an aligned text table."""
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "rss_mb", "peak_rss_mb"]
+    rows = [["scenario"] + columns]
+    for key, result in results.items():
+        rows.append([key] + [str(result.get(column, "-")) for column in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """Stored results keyed by `scenario@concurrency`; empty if missing."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], environment: Dict[str, Any]) -> None:
+    """Store results as the new baseline, merged over existing entries."""
+    merged = {**load_baseline(path), **results}
+    with open(path, "w") as f:
+        json.dump({"environment": environment, "results": merged}, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Run a bridge for load tests, in front of mcpd or a stdio MCP command.
+
+    python -m benchmarks.serve_bridge --port 8091 --mcpd-url http://127.0.0.1:8099
+    python -m benchmarks.serve_bridge --port 8091 --mcp-command "python -m benchmarks.fake_mcp_server"
+
+Extra bridge config can be given as JSON with `--config`, e.g.
+`--config '{"scheduler": {"max_concurrency": 16}}'`.
+"""
+
+import argparse
+import asyncio
+import json
+import shlex
+from typing import List, Optional
+
+from bridge.config_acp import MCPToACPBridgeConfig
+from bridge.server_acp import serve_mcp_as_acp_async
+
+
+async def serve(bridge_config: MCPToACPBridgeConfig) -> None:
+    handle = await serve_mcp_as_acp_async(bridge_config)
+    try:
+        # uvicorn handles SIGINT/SIGTERM and ends the task
+        await handle.task
+    finally:
+        await handle.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument("--mcpd-url")
+    backend.add_argument("--mcp-command", help="Command line of a stdio MCP server")
+    parser.add_argument("--config", default="{}", help="Extra MCPToACPBridgeConfig fields as JSON")
+    args = parser.parse_args(argv)
+
+    fields = {"host": args.host, "port": args.port, "server_name": "fake", "log_level": "warning"}
+    if args.mcpd_url:
+        fields["mcpd_url"] = args.mcpd_url
+    else:
+        command = shlex.split(args.mcp_command)
+        fields["mcp_command"], fields["mcp_args"] = command[0], command[1:]
+    fields.update(json.loads(args.config))
+    asyncio.run(serve(MCPToACPBridgeConfig(**fields)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""ACP models used by the bridge, imported from agntcy_acp on first use.
+
+agntcy_acp is optional and slow to import, so the names below are resolved
+by the module's `__getattr__` the first time one of them is read, not when
+the bridge is imported. Without the SDK they are minimal stand-ins with
+the same attributes; `acp_available` tells which is in use.
+
+    from . import acp_models
+    run = acp_models.RunStateless(id=run_id, status=acp_models.RunStatus.completed)
+"""
+
+from typing import Any, Dict
+
+MODEL_NAMES = ("Agent", "AgentMetadata", "RunCreateStateless", "RunStateless", "RunStatus")
+
+
+class _RunStatus:
+    completed = "completed"
+    failed = "failed"
+
+
+class _Record:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class _Agent(_Record):
+    def model_dump(self):
+        return {
+            k: v.model_dump() if hasattr(v, 'model_dump') else v
+            for k, v in self.__dict__.items()
+        }
+
+
+class _AgentMetadata(_Record):
+    def model_dump(self):
+        return self.__dict__
+
+
+class _RunCreateStateless(_Record):
+    pass
+
+
+class _RunStateless(_Record):
+    pass
+
+
+def _load() -> Dict[str, Any]:
+    try:
+        import agntcy_acp
+    except ImportError:
+        return {
+            "acp_available": False,
+            "Agent": _Agent,
+            "AgentMetadata": _AgentMetadata,
+            "RunCreateStateless": _RunCreateStateless,
+            "RunStateless": _RunStateless,
+            "RunStatus": _RunStatus,
+        }
+    return {"acp_available": True, **{name: getattr(agntcy_acp, name) for name in MODEL_NAMES}}
+
+
+def __getattr__(name: str) -> Any:
+    if name != "acp_available" and name not in MODEL_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Later lookups find the names as plain module globals
+    globals().update(_load())
+    return globals()[name]
@@ -0,0 +1,149 @@
+"""Tool backends for the MCP-ACP bridge executor.
+
+A backend is where `MCPToACPBridgeExecutor` gets its tool catalog from and
+sends tool calls to: a locally spawned MCP process (`SimpleMCPClient`) or
+a remote mcpd daemon (`MCPDBackend`).
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .config_acp import MCPToACPBridgeConfig
+
+if TYPE_CHECKING:
+    from .http_client import MCPDClientManager
+
+
+class MCPTool:
+    """A tool entry in a backend's catalog."""
+
+    __slots__ = ("name", "description", "schema", "idempotent")
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        schema: Optional[Dict[str, Any]] = None,
+        idempotent: bool = False,
+    ):
+        self.name = name
+        self.description = description
+        self.schema = schema or {}
+        self.idempotent = idempotent
+
+
+class MCPBackend(ABC):
+    """Interface between the bridge executor and an MCP tool source."""
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Acquire whatever the backend needs and discover its tools."""
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """Release the backend's resources."""
+
+    @abstractmethod
+    async def list_raw_tools(self) -> List[Any]:
+        """List tools as objects with `name`, `description` and `schema`."""
+
+    @abstractmethod
+    async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """Call a tool and return its result, raising on failure."""
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit and miss counts of the backend's caches, by cache name."""
+        return {}
+
+    def store_sizes(self) -> Dict[str, int]:
+        """Entries held by the backend's long-lived stores, by store name."""
+        return {}
+
+
+class MCPDBackend(MCPBackend):
+    """Backend that exposes the servers of an mcpd daemon over its REST API.
+    
+    Tools are published as `"{server}/{tool}"` so one bridge can front every
+    server mcpd manages; calls map to `POST /api/v1/servers/{server}/tools/{tool}`
+    on a pooled client. No MCP subprocesses are spawned by the bridge.
+    """
+
+    def __init__(
+        self,
+        config: MCPToACPBridgeConfig,
+        client_manager: Optional["MCPDClientManager"] = None,
+    ):
+        self.config = config
+        self.mcpd_url = config.mcpd_url.rstrip("/")
+        self.tools: Dict[str, MCPTool] = {}
+        self._owns_manager = client_manager is None
+        self._client_manager = client_manager
+
+    @property
+    def client(self):
+        """Pooled client for this backend's mcpd URL."""
+        return self._client_manager.get_client(self.mcpd_url)
+
+    async def connect(self) -> None:
+        """Create the pooled client and build the catalog from mcpd's listing."""
+        # httpx loads with the first mcpd backend, not with the bridge
+        from .http_client import MCPDClientManager
+        from .mcpd_tools import is_idempotent, mcpd_list_servers, mcpd_list_tools
+        
+        if self._client_manager is None:
+            self._client_manager = MCPDClientManager.from_bridge_config(self.config)
+        
+        servers = self.config.mcpd_servers or await mcpd_list_servers(self.mcpd_url, self.client)
+        listings = await asyncio.gather(
+            *(mcpd_list_tools(server, self.mcpd_url, self.client) for server in servers)
+        )
+        
+        self.tools = {}
+        for server, tools in zip(servers, listings):
+            for tool in tools:
+                name = f"{server}/{tool['name']}"
+                self.tools[name] = MCPTool(
+                    name=name,
+                    description=tool.get("description", ""),
+                    schema=tool.get("inputSchema", {}),
+                    idempotent=is_idempotent(tool),
+                )
+
+    async def disconnect(self) -> None:
+        """Close the pooled client if this backend created it."""
+        if self._owns_manager and self._client_manager is not None:
+            await self._client_manager.aclose()
+            self._client_manager = None
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Signed identity header cache of the pooled clients, if signing."""
+        identity = self._client_manager.identity if self._client_manager else None
+        if identity is None:
+            return {}
+        return {"identity_assertion": {"hits": identity.cache_hits, "misses": identity.cache_misses}}
+
+    def store_sizes(self) -> Dict[str, int]:
+        """The discovered tool catalog."""
+        return {"tools": len(self.tools)}
+
+    async def list_raw_tools(self) -> List[MCPTool]:
+        """List the discovered mcpd tools."""
+        return list(self.tools.values())
+
+    async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """Call `"{server}/{tool}"` on mcpd."""
+        from .mcpd_tools import mcpd_call_tool_raw
+        
+        server, _, tool = tool_name.partition("/")
+        if not tool:
+            raise ValueError(f"Expected a '<server>/<tool>' name, got: {tool_name}")
+        entry = self.tools.get(tool_name)
+        return await mcpd_call_tool_raw(
+            server,
+            tool,
+            args,
+            self.mcpd_url,
+            client=self.client,
+            idempotent=entry is not None and entry.idempotent,
+        )
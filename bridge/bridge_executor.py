@@ -3,47 +3,38 @@
 import asyncio
 import json
 import subprocess
+import time
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from . import acp_models
+from .backends import MCPBackend, MCPTool
 from .config_acp import MCPToACPBridgeConfig
+from .diagnostics import LoopWatchdog, MemoryTracker, Profiler
+from .metrics import BridgeMetrics
+from .request_body import body_memory
+from .scheduler import RunScheduler
+from .tracing import Tracer, child_span
 
 
-# Check if ACP is available
-acp_available = False
-try:
-    from agntcy_acp import (
-        RunCreateStateless,
-        RunStateless,
-        RunStatus,
-        StreamingMode,
-        StreamingModes,
-    )
-    acp_available = True
-except ImportError:
-    # Fallback classes when ACP not available
-    class RunStatus:
-        completed = "completed"
-        failed = "failed"
-    
-    class RunCreateStateless:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-    
-    class RunStateless:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
+# The ACP models stay importable from here; agntcy_acp loads on first use
+_ACP_EXPORTS = ("acp_available", "RunCreateStateless", "RunStateless", "RunStatus")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _ACP_EXPORTS:
+        return getattr(acp_models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-class SimpleMCPClient:
+class SimpleMCPClient(MCPBackend):
     """Simple MCP client for the bridge."""
     
     def __init__(self, config: MCPToACPBridgeConfig):
         self.config = config
         self.process: Optional[subprocess.Popen] = None
-        self.tools: Dict[str, Any] = {}
+        self.tools: Dict[str, MCPTool] = {}
+        self.restarts = 0
     
     async def connect(self):
         """Start the MCP server process."""
@@ -59,9 +50,12 @@ class SimpleMCPClient:
         
         # Mock tool discovery - in real implementation this would use MCP protocol
         self.tools = {
-            "echo": {"name": "echo", "description": "Echo back the input", "schema": {}},
-            "list_files": {"name": "list_files", "description": "List files in directory", "schema": {}},
-            "read_file": {"name": "read_file", "description": "Read file contents", "schema": {}},
+            tool.name: tool
+            for tool in (
+                MCPTool("echo", "Echo back the input"),
+                MCPTool("list_files", "List files in directory"),
+                MCPTool("read_file", "Read file contents"),
+            )
         }
         
         await asyncio.sleep(0.1)  # Give process time to start
@@ -70,36 +64,95 @@ class SimpleMCPClient:
         """Stop the MCP server process."""
         if self.process:
             self.process.terminate()
-            self.process.wait()
+            # Waiting blocks, so it happens off the event loop
+            try:
+                await asyncio.to_thread(self.process.wait, 5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                await asyncio.to_thread(self.process.wait)
     
     async def list_raw_tools(self):
         """List available tools."""
-        return [type('Tool', (), tool) for tool in self.tools.values()]
+        return list(self.tools.values())
+    
+    def store_sizes(self) -> Dict[str, int]:
+        """The discovered tool catalog."""
+        return {"tools": len(self.tools)}
+    
+    async def _ensure_running(self) -> None:
+        """Restart the MCP server process if it has exited."""
+        if self.process is not None and self.process.poll() is not None:
+            print(f"MCP server process exited with code {self.process.returncode}, restarting")
+            self.restarts += 1
+            await self.connect()
     
     async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """Call a tool (mock implementation)."""
-        if tool_name == "echo":
-            return args.get("message", "Hello from MCP-ACP bridge!")
-        elif tool_name == "list_files":
-            return {"files": ["file1.txt", "file2.txt", "README.md"]}
-        elif tool_name == "read_file":
-            return f"Contents of {args.get('path', 'unknown')}"
-        else:
-            raise ValueError(f"Unknown tool: {tool_name}")
+        with child_span("mcp.call_tool", kind="client", **{"mcp.tool": tool_name}):
+            await self._ensure_running()
+            if tool_name == "echo":
+                return args.get("message", "Hello from MCP-ACP bridge!")
+            elif tool_name == "list_files":
+                return {"files": ["file1.txt", "file2.txt", "README.md"]}
+            elif tool_name == "read_file":
+                return f"Contents of {args.get('path', 'unknown')}"
+            else:
+                raise ValueError(f"Unknown tool: {tool_name}")
 
 
 class MCPToACPBridgeExecutor:
     """Executor that translates ACP requests to MCP tool calls."""
 
-    def __init__(self, mcp_client: SimpleMCPClient, bridge_config: MCPToACPBridgeConfig):
+    def __init__(self, mcp_client: MCPBackend, bridge_config: MCPToACPBridgeConfig):
         """Initialize the executor."""
         self.mcp_client = mcp_client
         self.bridge_config = bridge_config
         self._mcp_tools: Dict[str, Any] = {}
         self._agent_manifest: Optional[Dict[str, Any]] = None
+        self.scheduler: Optional[RunScheduler] = None
+        if bridge_config.scheduler is not None:
+            self.scheduler = RunScheduler(bridge_config.scheduler, on_wait=self._observe_wait)
+        self.tracer: Optional[Tracer] = None
+        if bridge_config.tracing is not None:
+            self.tracer = Tracer(bridge_config.tracing)
+        self.in_flight = 0
+        self.metrics = BridgeMetrics()
+        self.metrics.watch_runs(lambda: self.in_flight, self._queued_runs)
+        self.metrics.watch_restarts(lambda: getattr(self.mcp_client, "restarts", 0))
+        self.metrics.watch_caches(self.mcp_client.cache_stats)
+        self.metrics.watch_sizes(self._store_sizes)
+        self.metrics.registry.callback(
+            "acp_request_body_bytes", "Bytes of request bodies held by open runs", lambda: body_memory.in_flight
+        )
+        self.watchdog: Optional[LoopWatchdog] = None
+        if bridge_config.loop_stall_threshold is not None:
+            self.watchdog = LoopWatchdog(bridge_config.loop_stall_threshold)
+            self.metrics.registry.callback(
+                "acp_event_loop_stalls_total", "Event loop stalls over the threshold", lambda: self.watchdog.stalls, "counter"
+            )
+        self.profiler = Profiler(bridge_config.max_profile_seconds)
+        self.memory = MemoryTracker()
+    
+    def _observe_wait(self, lane: str, wait: float) -> None:
+        self.metrics.scheduler_wait.labels(lane).observe(wait)
+
+    def _store_sizes(self) -> Dict[str, int]:
+        sizes = self.mcp_client.store_sizes()
+        if self.scheduler is not None:
+            sizes.update(self.scheduler.store_sizes())
+        if self.tracer is not None:
+            sizes["trace_queue"] = self.tracer.stats()["pending"]
+        return sizes
+
+    def _queued_runs(self) -> int:
+        if self.scheduler is None:
+            return 0
+        return sum(lane["waiting"] for lane in self.scheduler.stats()["lanes"].values())
 
     async def initialize(self) -> None:
         """Initialize by loading MCP tools and creating ACP manifest."""
+        if self.watchdog is not None:
+            self.watchdog.start()
         await self.mcp_client.connect()
         raw_tools = await self.mcp_client.list_raw_tools()
         self._mcp_tools = {tool.name: tool for tool in raw_tools}
@@ -164,7 +217,18 @@ class MCPToACPBridgeExecutor:
 
     async def execute_stateless_run(self, run_request) -> Any:
         """Execute a stateless ACP run by calling appropriate MCP tool."""
+        with child_span("execute_stateless_run") as span:
+            run = await self._execute_stateless_run(run_request)
+            if span is not None:
+                span.set_attribute("acp.run.id", run.id)
+                span.set_attribute("acp.run.status", str(getattr(run.status, "value", run.status)))
+                if run.status == acp_models.RunStatus.failed:
+                    span.error = run.error["message"]
+            return run
+    
+    async def _execute_stateless_run(self, run_request) -> Any:
         run_id = str(uuid4())
+        self.in_flight += 1
         
         try:
             # Extract tool and args from config
@@ -190,12 +254,19 @@ class MCPToACPBridgeExecutor:
             
             # Call MCP tool
             print(f"Calling MCP tool '{tool_name}' with args: {args}")
-            result = await self.mcp_client.call_tool(tool_name, args)
+            start = time.perf_counter()
+            try:
+                result = await self.mcp_client.call_tool(tool_name, args)
+            except Exception:
+                self.metrics.tool_errors.labels(tool_name).inc()
+                raise
+            finally:
+                self.metrics.tool_duration.labels(tool_name).observe(time.perf_counter() - start)
             
             # Create successful run result
-            return RunStateless(
+            return acp_models.RunStateless(
                 id=run_id,
-                status=RunStatus.completed,
+                status=acp_models.RunStatus.completed,
                 output={
                     "result": result,
                     "tool": tool_name,
@@ -205,9 +276,9 @@ class MCPToACPBridgeExecutor:
             
         except Exception as e:
             print(f"Error executing MCP tool: {e}")
-            return RunStateless(
+            return acp_models.RunStateless(
                 id=run_id,
-                status=RunStatus.failed,
+                status=acp_models.RunStatus.failed,
                 error={
                     "type": "ToolExecutionError",
                     "message": str(e)
@@ -217,8 +288,15 @@ class MCPToACPBridgeExecutor:
                     "success": False
                 }
             )
+        finally:
+            self.in_flight -= 1
     
     async def cleanup(self):
         """Clean up resources."""
+        await self.metrics.close()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.tracer is not None:
+            await self.tracer.close()
         if self.mcp_client:
             await self.mcp_client.disconnect()
\ No newline at end of file
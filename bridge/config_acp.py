@@ -1,7 +1,11 @@
 """Configuration for MCP-ACP bridge serving."""
 
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from .rate_limit import RateLimitConfig
+from .scheduler import SchedulerConfig
+from .tracing import TracingConfig
 
 
 class MCPConfig(BaseModel):
@@ -25,26 +29,91 @@ class MCPToACPBridgeConfig(BaseModel):
             organization="demo-org",
             identity_id="did:agntcy:dev:demo-org:filesystem-server"
         )
+
+        # Or expose every server of a running mcpd daemon
+        bridge_config = MCPToACPBridgeConfig(mcpd_url="http://localhost:8090", port=8091)
     """
 
     model_config = ConfigDict(extra="forbid", arbitrary_types_allowed=True)
 
-    # MCP Configuration
-    mcp_command: str = Field(description="Command to start MCP server")
+    # MCP Configuration (either a local command or an mcpd daemon)
+    mcp_command: Optional[str] = Field(default=None, description="Command to start MCP server")
     mcp_args: list[str] = Field(default_factory=list, description="Arguments for MCP command")
     mcp_env: Optional[Dict[str, str]] = Field(default=None, description="Environment variables")
+    mcpd_url: Optional[str] = Field(default=None, description="mcpd base URL to bridge instead of spawning mcp_command")
+    mcpd_servers: Optional[list[str]] = Field(default=None, description="mcpd servers to expose (default: all)")
 
     # Server Configuration
     host: str = Field(default="localhost", description="Host to serve on")
     port: int = Field(default=8090, description="Port to serve on")
     endpoint: str = Field(default="/mcp-bridge", description="Endpoint path")
+    uds: Optional[str] = Field(default=None, description="Unix domain socket path to also serve on")
+    uds_only: bool = Field(default=False, description="Serve only on the Unix domain socket, not TCP")
+    uds_mode: int = Field(
+        default=0o600,
+        ge=0,
+        le=0o777,
+        description="Permission bits of the Unix domain socket; connecting needs write access (0o660 to share with the group)",
+    )
     log_level: str = Field(default="warning", description="Log level for uvicorn server")
+    max_request_body_size: int = Field(
+        default=10 * 1024 * 1024,
+        gt=0,
+        description="Maximum run request body size in bytes; larger requests get 413",
+    )
 
     # Bridge Configuration
     server_name: str = Field(default="mcp-server", description="MCP server name")
     identity_id: Optional[str] = Field(default=None, description="AGNTCY Identity DID")
+    identity_key_path: Optional[str] = Field(default=None, description="Key file for signing identity assertions on outbound requests")
+    identity_token_ttl: float = Field(default=300.0, gt=0, description="Lifetime in seconds of each signed identity assertion")
     version: str = Field(default="1.0.0", description="Version of the bridge")
     organization: str = Field(default="demo-org", description="Organization name")
     
+    # Scheduling and rate limiting
+    scheduler: Optional[SchedulerConfig] = Field(
+        default=None,
+        description="Priority lanes, per-caller fair share and concurrency caps for runs (default: run in arrival order)",
+    )
+    rate_limit: Optional[RateLimitConfig] = Field(
+        default=None,
+        description="Token-bucket limits on runs per identity and organization (default: unlimited)",
+    )
+    
+    # Observability
+    metrics_path: Optional[str] = Field(
+        default="/metrics",
+        description="Path serving Prometheus metrics, outside the ACP endpoint (None to disable)",
+    )
+    tracing: Optional[TracingConfig] = Field(
+        default=None,
+        description="Sampled W3C traceparent spans of runs and tool calls (default: off)",
+    )
+    loop_stall_threshold: Optional[float] = Field(
+        default=0.25,
+        gt=0,
+        description="Print the event loop's stack when it is blocked this many seconds (None to disable)",
+    )
+    admin_token: Optional[str] = Field(
+        default=None,
+        description="Bearer token for the /admin/profile and /admin/memory endpoints, which are off without one",
+    )
+    max_profile_seconds: float = Field(default=30.0, gt=0, description="Longest profile /admin/profile will capture")
+    
     # HTTP Configuration (from rejected PR mozilla-ai/any-llm#254)
-    http_client: Any = Field(default=None, description="Optional httpx.AsyncClient for custom HTTP configuration")
\ No newline at end of file
+    http_client: Any = Field(default=None, description="Optional httpx.AsyncClient for custom HTTP configuration")
+    http_max_connections: int = Field(default=100, gt=0, description="Connection limit of pooled HTTP clients")
+    http_max_keepalive_connections: int = Field(default=20, ge=0, description="Idle keep-alive connections kept per pooled client")
+    http2: bool = Field(default=False, description="Enable HTTP/2 on pooled clients (needs the `h2` package)")
+
+    @model_validator(mode="after")
+    def _check_backend(self) -> "MCPToACPBridgeConfig":
+        if (self.mcp_command is None) == (self.mcpd_url is None):
+            raise ValueError("Set exactly one of mcp_command or mcpd_url")
+        return self
+
+    @model_validator(mode="after")
+    def _check_listeners(self) -> "MCPToACPBridgeConfig":
+        if self.uds_only and not self.uds:
+            raise ValueError("uds_only requires uds to be set")
+        return self
@@ -0,0 +1,273 @@
+"""Event loop stall detection and on-demand profiling.
+
+`LoopWatchdog` catches blocking calls on the event loop: the loop bumps a
+heartbeat every `interval`, and a daemon thread that finds the heartbeat
+late by more than `threshold` prints the loop thread's current stack,
+once per stall. That points at the call that blocked, which the lag
+histogram in `bridge.metrics` can only say happened.
+
+`Profiler` captures a time-boxed profile of the running bridge for the
+admin endpoint, either by sampling the loop thread's stack from another
+thread (flamegraph "collapsed" text, low overhead) or with cProfile on the
+loop thread (pstats file, higher overhead). One profile runs at a time and
+its length is capped, so it is safe to leave enabled in production.
+
+`MemoryTracker` finds memory growth in a running bridge: it starts
+tracemalloc on demand, keeps a few numbered snapshots, and reports the
+top allocation sites of one snapshot or the difference between two.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class LoopWatchdog:
+    """Prints the loop thread's stack when the event loop stalls."""
+
+    def __init__(self, threshold: float = 0.1, interval: Optional[float] = None):
+        self.threshold = threshold
+        self.interval = interval or min(threshold / 2, 0.05)
+        self.stalls = 0
+        self.longest_stall = 0.0
+        self.last_stack: Optional[str] = None
+        self._beat = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start watching the running loop; call from the loop thread."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="bridge-loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def _heartbeat(self) -> None:
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            lag = time.monotonic() - beat - self.interval
+            if lag < self.threshold:
+                continue
+            self.longest_stall = max(self.longest_stall, lag)
+            if beat == reported_beat:
+                continue  # same stall, already reported
+            reported_beat = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            self.last_stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>"
+            print(
+                f"Event loop blocked for over {lag * 1000:.0f} ms "
+                f"(threshold {self.threshold * 1000:.0f} ms) in:\n{self.last_stack}"
+            )
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class ProfilerBusy(Exception):
+    """A profile is already being captured."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Time-boxed profiles of the event loop thread, one at a time."""
+
+    def __init__(self, max_seconds: float = 30.0, sample_interval: float = 0.005):
+        self.max_seconds = max_seconds
+        self.sample_interval = sample_interval
+        self._busy = False
+
+    async def capture(self, seconds: float, fmt: str = "collapsed") -> Tuple[bytes, str]:
+        """Profile the loop for `seconds` (capped); return `(content, media type)`.
+
+        `fmt` is `"collapsed"` for sampled stacks in flamegraph collapsed
+        format, or `"pstats"` for a cProfile dump readable by `pstats`.
+        """
+        if not math.isfinite(seconds) or seconds <= 0:
+            raise ValueError(f"Profile length must be a positive number of seconds, got: {seconds}")
+        if fmt not in ("collapsed", "pstats"):
+            raise ValueError(f"Unknown profile format: {fmt}")
+        if self._busy:
+            raise ProfilerBusy("A profile is already running")
+        seconds = min(seconds, self.max_seconds)
+        self._busy = True
+        try:
+            if fmt == "pstats":
+                return await self._cprofile(seconds), "application/octet-stream"
+            return await self._sample(seconds), "text/plain"
+        finally:
+            self._busy = False
+
+    async def _sample(self, seconds: float) -> bytes:
+        loop_thread = threading.get_ident()
+        stacks = await asyncio.to_thread(self._sample_thread, loop_thread, seconds)
+        lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode()
+
+    def _sample_thread(self, thread_id: int, seconds: float) -> Counter:
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                stacks[";".join(reversed(labels))] += 1
+            time.sleep(self.sample_interval)
+        return stacks
+
+    async def _cprofile(self, seconds: float) -> bytes:
+        import cProfile
+        import pstats
+        import tempfile
+
+        # Profiles whatever runs on the loop thread meanwhile
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bridge.pstats")
+            pstats.Stats(profile).dump_stats(path)
+            with open(path, "rb") as f:
+                return f.read()
+
+
+class MemoryTrackingOff(Exception):
+    """tracemalloc is not tracing, so there is nothing to snapshot."""
+
+
+class UnknownSnapshot(Exception):
+    """No snapshot with the requested id is kept."""
+
+
+# Allocations made by tracemalloc itself and by imports are noise here
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+_GROUPINGS = ("lineno", "filename", "traceback")
+
+
+def _site(traceback_: tracemalloc.Traceback, group_by: str) -> str:
+    if group_by == "filename":
+        return traceback_[0].filename
+    if group_by == "traceback":
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in traceback_)
+    return f"{traceback_[0].filename}:{traceback_[0].lineno}"
+
+
+class MemoryTracker:
+    """tracemalloc snapshots of the bridge, kept by id for diffing."""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._next_id = 1
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing allocations, recording `frames` frames per site."""
+        if frames < 1:
+            raise ValueError("frames must be at least 1")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop the snapshots."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """Whether tracing is on, traced bytes and the kept snapshot ids."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": list(self._snapshots),
+        }
+
+    async def snapshot(self) -> int:
+        """Take a snapshot and return its id; the oldest is dropped past the limit."""
+        if not tracemalloc.is_tracing():
+            raise MemoryTrackingOff("Memory tracking is off; start it first")
+        snapshot = await asyncio.to_thread(lambda: tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS))
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._snapshots[snapshot_id] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        try:
+            return self._snapshots[snapshot_id]
+        except KeyError:
+            raise UnknownSnapshot(f"No snapshot {snapshot_id}")
+
+    async def top(self, snapshot_id: int, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """The allocation sites holding the most memory in a snapshot."""
+        if group_by not in _GROUPINGS:
+            raise ValueError(f"Unknown grouping: {group_by}")
+        snapshot = self._get(snapshot_id)
+        stats = await asyncio.to_thread(snapshot.statistics, group_by)
+        return [
+            {"site": _site(stat.traceback, group_by), "size_bytes": stat.size, "count": stat.count}
+            for stat in stats[:limit]
+        ]
+
+    async def diff(self, from_id: int, to_id: int, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """The allocation sites that grew or shrank most between two snapshots."""
+        if group_by not in _GROUPINGS:
+            raise ValueError(f"Unknown grouping: {group_by}")
+        old, new = self._get(from_id), self._get(to_id)
+        stats = await asyncio.to_thread(new.compare_to, old, group_by)
+        return [
+            {
+                "site": _site(stat.traceback, group_by),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
@@ -0,0 +1,160 @@
+"""HTTP client helpers for talking to bridges and mcpd."""
+
+import asyncio
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from .identity import IdentityHeaderProvider
+
+
+def create_uds_client(
+    uds_path: str,
+    base_url: str = "http://localhost",
+    **client_kwargs: Any,
+) -> httpx.AsyncClient:
+    """Create an AsyncClient that reaches a bridge over its Unix domain socket.
+    
+    Requests are addressed with normal URLs (the host part is ignored), so
+    existing ACP calls only need the client swapped:
+    
+        async with create_uds_client("/run/bridge.sock") as client:
+            await client.get("/mcp-bridge/agents")
+    
+    Args:
+        uds_path: Path of the socket the bridge was configured with (`uds`)
+        base_url: Base URL used to build request URLs
+        **client_kwargs: Extra arguments for `httpx.AsyncClient`
+    """
+    transport = httpx.AsyncHTTPTransport(uds=uds_path)
+    return httpx.AsyncClient(transport=transport, base_url=base_url, **client_kwargs)
+
+
+class MCPDClientManager:
+    """Shared, pooled AsyncClients keyed by mcpd base URL.
+    
+    Each mcpd URL gets one long-lived client, so tool calls reuse keep-alive
+    connections (and HTTP/2 streams when enabled) instead of opening a new
+    TCP connection per call. Clients passed to `register` are used as-is and
+    left open on `aclose`, since their owner is responsible for them.
+    
+    A manager's clients belong to the event loop they were first used on.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        timeout: float = 30.0,
+        identity: Optional["IdentityHeaderProvider"] = None,
+    ):
+        self.identity = identity
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._injected: Dict[str, httpx.AsyncClient] = {}
+    
+    @classmethod
+    def from_bridge_config(cls, bridge_config) -> "MCPDClientManager":
+        """Create a manager from the HTTP settings of a bridge config.
+        
+        When the config carries an `http_client`, it serves every mcpd URL.
+        """
+        identity = None
+        if bridge_config.identity_id and bridge_config.identity_key_path:
+            from .identity import IdentityHeaderProvider
+            
+            identity = IdentityHeaderProvider(
+                bridge_config.identity_id,
+                bridge_config.identity_key_path,
+                ttl=bridge_config.identity_token_ttl,
+            )
+        
+        manager = cls(
+            max_connections=bridge_config.http_max_connections,
+            max_keepalive_connections=bridge_config.http_max_keepalive_connections,
+            http2=bridge_config.http2,
+            identity=identity,
+        )
+        if bridge_config.http_client is not None:
+            manager.register("*", bridge_config.http_client)
+        return manager
+    
+    def register(self, mcpd_url: str, client: httpx.AsyncClient) -> None:
+        """Use an existing client for `mcpd_url` (or for every URL with "*")."""
+        if self.identity is not None:
+            self.identity.install(client)
+        self._injected[mcpd_url.rstrip("/")] = client
+    
+    def get_client(self, mcpd_url: str) -> httpx.AsyncClient:
+        """Return the pooled client for `mcpd_url`, creating it on first use."""
+        key = mcpd_url.rstrip("/")
+        client = self._injected.get(key) or self._injected.get("*") or self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                event_hooks={"request": [self.identity.attach]} if self.identity else None,
+            )
+            self._clients[key] = client
+        return client
+    
+    async def aclose(self) -> None:
+        """Close every client this manager created."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+    
+    async def __aenter__(self) -> "MCPDClientManager":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+_default_managers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPDClientManager]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def default_client_manager() -> MCPDClientManager:
+    """Return the shared client manager for the running event loop.
+    
+    Pooled connections cannot cross event loops, so each loop gets its own
+    manager; it goes away together with its loop.
+    """
+    loop = asyncio.get_running_loop()
+    manager = _default_managers.get(loop)
+    if manager is None:
+        manager = _default_managers[loop] = MCPDClientManager(identity=_default_identity)
+    return manager
+
+
+_default_identity: Optional["IdentityHeaderProvider"] = None
+
+
+def set_default_identity(identity: Optional["IdentityHeaderProvider"]) -> None:
+    """Sign every request of the default pooled clients with `identity`.
+    
+    Applies to default managers created afterwards, e.g. call it at startup
+    with `IdentityHeaderProvider.from_env()`.
+    """
+    global _default_identity
+    _default_identity = identity
+
+
+async def close_mcpd_clients() -> None:
+    """Close the pooled mcpd clients of the running event loop."""
+    manager = _default_managers.pop(asyncio.get_running_loop(), None)
+    if manager is not None:
+        await manager.aclose()
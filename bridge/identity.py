@@ -0,0 +1,170 @@
+"""Signed AGNTCY identity assertions for outbound requests.
+
+`IdentityHeaderProvider` mints a short-lived JWT asserting the configured
+DID and attaches it, with the DID itself, to every request sent by the
+pooled clients:
+
+    X-AGNTCY-DID: did:agntcy:dev:org:server
+    X-AGNTCY-Identity-Assertion: <jwt>
+
+Assertions are cached until shortly before they expire and re-minted in
+the background, so a request pays one dictionary lookup rather than a
+signature. The signing key is read from a local file: a PEM Ed25519
+private key signs with EdDSA (needs `cryptography`), any other content is
+used as an HMAC secret for HS256.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+DID_HEADER = "X-AGNTCY-DID"
+ASSERTION_HEADER = "X-AGNTCY-Identity-Assertion"
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class IdentityHeaderProvider:
+    """Mints, caches and refreshes identity headers for one DID."""
+
+    def __init__(
+        self,
+        did: str,
+        key_path: str,
+        ttl: float = 300.0,
+        refresh_margin: Optional[float] = None,
+        audience: Optional[str] = None,
+    ):
+        """Initialize the provider.
+
+        Args:
+            did: The DID to assert, e.g. `did:agntcy:dev:org:server`
+            key_path: File holding the signing key
+            ttl: Lifetime of each assertion in seconds
+            refresh_margin: How long before expiry a background refresh starts
+                (default: a fifth of `ttl`, at most 60 seconds)
+            audience: Optional `aud` claim
+        """
+        if refresh_margin is None:
+            refresh_margin = min(60.0, ttl / 5)
+        if refresh_margin >= ttl:
+            raise ValueError("refresh_margin must be shorter than ttl")
+        self.did = did
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.audience = audience
+        self._alg, self._key = self._load_key(os.path.expanduser(key_path))
+        # (headers, refresh_at, expires_at), replaced as a whole so readers on
+        # other threads never see a half-updated state
+        self._state: Tuple[Dict[str, str], float, float] = ({}, 0.0, 0.0)
+        self._refreshing = False
+        self.mint_count = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["IdentityHeaderProvider"]:
+        """Create a provider from `AGNTCY_DID` and `AGNTCY_KEY_FILE`, if both are set."""
+        did = os.getenv("AGNTCY_DID")
+        key_path = os.getenv("AGNTCY_KEY_FILE")
+        if not did or not key_path:
+            return None
+        return cls(did, key_path)
+
+    @staticmethod
+    def _load_key(key_path: str):
+        with open(key_path, "rb") as f:
+            data = f.read()
+        if not data.startswith(b"-----BEGIN"):
+            return "HS256", data.strip()
+        try:
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key
+        except ImportError:
+            raise ImportError("You need to `pip install cryptography` to sign with a PEM key")
+        key = load_pem_private_key(data, password=None)
+        if not isinstance(key, Ed25519PrivateKey):
+            raise ValueError(f"Unsupported key type in {key_path}; expected Ed25519")
+        return "EdDSA", key
+
+    def headers(self) -> Dict[str, str]:
+        """Return the current identity headers.
+
+        Normally a cached dictionary. Near expiry a refresh is started in the
+        background on the running loop; only an expired (or first) assertion
+        is minted inline.
+        """
+        headers, refresh_at, expires_at = self._state
+        now = time.time()
+        if now < refresh_at:
+            self.cache_hits += 1
+            return headers
+        if now >= expires_at:
+            self.cache_misses += 1
+            return self._mint()
+        if not self._refreshing:
+            self._start_background_refresh()
+        self.cache_hits += 1
+        return headers
+
+    async def attach(self, request) -> None:
+        """httpx request event hook that adds the identity headers."""
+        request.headers.update(self.headers())
+
+    def install(self, client) -> None:
+        """Add the identity headers to every request sent by an httpx client."""
+        hooks = client.event_hooks
+        if self.attach not in hooks["request"]:
+            hooks["request"] = [*hooks["request"], self.attach]
+            client.event_hooks = hooks
+
+    def _start_background_refresh(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._mint()
+            return
+        self._refreshing = True
+        task = loop.run_in_executor(None, self._mint)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, future) -> None:
+        self._refreshing = False
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Identity assertion refresh failed: {future.exception()}")
+
+    def _mint(self) -> Dict[str, str]:
+        now = time.time()
+        claims = {
+            "iss": self.did,
+            "sub": self.did,
+            "iat": int(now),
+            "exp": int(now + self.ttl),
+            "jti": uuid4().hex,
+        }
+        if self.audience:
+            claims["aud"] = self.audience
+        header = {"alg": self._alg, "typ": "JWT", "kid": f"{self.did}#key-1"}
+        signing_input = ".".join(
+            _b64url(json.dumps(part, separators=(",", ":")).encode()) for part in (header, claims)
+        ).encode("ascii")
+        if self._alg == "HS256":
+            signature = hmac.new(self._key, signing_input, hashlib.sha256).digest()
+        else:
+            signature = self._key.sign(signing_input)
+
+        headers = {
+            DID_HEADER: self.did,
+            ASSERTION_HEADER: f"{signing_input.decode('ascii')}.{_b64url(signature)}",
+        }
+        self._state = (headers, now + self.ttl - self.refresh_margin, now + self.ttl)
+        self.mint_count += 1
+        return headers
@@ -0,0 +1,235 @@
+"""Cached, versioned discovery of the tools an mcpd daemon exposes.
+
+Instead of hand-writing wrappers per mcpd server (see
+`create_filesystem_tools`), agents can build their tools from mcpd's own
+listings:
+
+    catalog = MCPDToolCatalog("http://localhost:8090", cache_path="~/.cache/mcpd-tools.json")
+    tools = await catalog.get_tools()
+
+Listings are kept in memory and optionally on disk. Within `ttl` they are
+served without any request; after that they are revalidated with
+`If-None-Match`/`If-Modified-Since`, so an unchanged catalog costs one
+304 per listing and a changed one is picked up without a restart.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from .http_client import default_client_manager
+from .mcpd_tools import create_mcpd_tool, is_idempotent
+
+CACHE_FORMAT = 1
+
+
+class MCPDToolCatalog:
+    """Server and tool listings of one mcpd daemon, cached and revalidated."""
+
+    def __init__(
+        self,
+        mcpd_url: str = "http://localhost:8090",
+        servers: Optional[List[str]] = None,
+        ttl: float = 300.0,
+        cache_path: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize the catalog.
+
+        Args:
+            mcpd_url: Base URL for mcpd
+            servers: Servers to include (default: every server mcpd lists)
+            ttl: Seconds a listing is trusted before it is revalidated
+            cache_path: Optional JSON file the catalog is persisted to, so a
+                fresh process starts without any listing calls
+            client: Optional client; defaults to the pooled client for `mcpd_url`
+        """
+        self.mcpd_url = mcpd_url.rstrip("/")
+        self.servers = servers
+        self.ttl = ttl
+        self.cache_path = os.path.expanduser(cache_path) if cache_path else None
+        self._client = client
+        # url -> {"data": ..., "etag": ..., "last_modified": ...}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._server_names: List[str] = []
+        self._fetched_at = 0.0
+        self._version: Optional[str] = None
+        self._tools_version: Optional[str] = None
+        self._tools: List[Callable] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._load_from_disk()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Content hash of the current catalog; changes whenever a listing does."""
+        return self._version
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the cached listings are still within `ttl`."""
+        return bool(self._entries) and time.time() - self._fetched_at < self.ttl
+
+    async def refresh(self, force: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Return `{server: [tool definitions]}`, revalidating when stale.
+
+        If mcpd cannot be reached and a cached catalog exists, the cached
+        catalog is returned and revalidation is retried on the next call.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if force or not self.is_fresh:
+                try:
+                    await self._revalidate()
+                except httpx.HTTPError as e:
+                    if not self._entries:
+                        raise
+                    print(f"Serving cached mcpd catalog, revalidation failed: {e}")
+            return self._catalog()
+
+    async def get_tools(self, force: bool = False) -> List[Callable]:
+        """Return `create_mcpd_tool` callables for every tool in the catalog.
+
+        Callables are rebuilt only when the catalog version changes.
+        """
+        catalog = await self.refresh(force)
+        if self._tools_version != self._version:
+            self._tools = [
+                create_mcpd_tool(
+                    server,
+                    tool["name"],
+                    self.mcpd_url,
+                    self._client,
+                    input_schema=tool.get("inputSchema"),
+                    description=tool.get("description"),
+                    idempotent=is_idempotent(tool),
+                )
+                for server, tools in catalog.items()
+                for tool in tools
+            ]
+            self._tools_version = self._version
+        return self._tools
+
+    async def _revalidate(self) -> None:
+        servers = self.servers
+        if servers is None:
+            listed = await self._conditional_get(f"{self.mcpd_url}/api/v1/servers")
+            if isinstance(listed, dict):
+                listed = listed.get("servers", [])
+            servers = [entry["name"] if isinstance(entry, dict) else entry for entry in listed]
+
+        await asyncio.gather(
+            *(self._conditional_get(self._tools_url(server)) for server in servers)
+        )
+
+        # Forget servers that are no longer listed
+        wanted = {self._tools_url(server) for server in servers} | {f"{self.mcpd_url}/api/v1/servers"}
+        self._entries = {url: entry for url, entry in self._entries.items() if url in wanted}
+        self._server_names = list(servers)
+        self._fetched_at = time.time()
+        self._version = self._compute_version()
+        self._save_to_disk()
+
+    async def _conditional_get(self, url: str) -> Any:
+        """GET `url` with the cached validators; a 304 keeps the cached data."""
+        client = self._client or default_client_manager().get_client(self.mcpd_url)
+        entry = self._entries.get(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            return entry["data"]
+        response.raise_for_status()
+
+        data = response.json()
+        self._entries[url] = {
+            "data": data,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        return data
+
+    def _tools_url(self, server: str) -> str:
+        return f"{self.mcpd_url}/api/v1/servers/{server}/tools"
+
+    def _catalog(self) -> Dict[str, List[Dict[str, Any]]]:
+        catalog = {}
+        for server in self._server_names:
+            entry = self._entries.get(self._tools_url(server))
+            if entry is None:
+                continue
+            tools = entry["data"]
+            if isinstance(tools, dict):
+                tools = tools.get("tools", [])
+            catalog[server] = tools
+        return catalog
+
+    def _compute_version(self) -> str:
+        encoded = json.dumps(self._catalog(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+    def _load_from_disk(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable mcpd catalog cache {self.cache_path}: {e}")
+            return
+        if cached.get("format") != CACHE_FORMAT or cached.get("mcpd_url") != self.mcpd_url:
+            return
+        # A cache written with another server filter lists other servers
+        if cached.get("server_filter") != self.servers:
+            return
+        self._entries = cached["entries"]
+        self._server_names = cached["servers"]
+        self._fetched_at = cached["fetched_at"]
+        self._version = cached["version"]
+
+    def _save_to_disk(self) -> None:
+        if not self.cache_path:
+            return
+        cached = {
+            "format": CACHE_FORMAT,
+            "mcpd_url": self.mcpd_url,
+            "server_filter": self.servers,
+            "servers": self._server_names,
+            "fetched_at": self._fetched_at,
+            "version": self._version,
+            "entries": self._entries,
+        }
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial file
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, self.cache_path)
+
+
+async def discover_mcpd_tools(
+    mcpd_url: str = "http://localhost:8090",
+    servers: Optional[List[str]] = None,
+    cache_path: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Callable]:
+    """Build tool callables for everything mcpd exposes, in one call.
+
+    Keep an `MCPDToolCatalog` around instead when tools should follow
+    catalog changes over the life of the process.
+    """
+    catalog = MCPDToolCatalog(mcpd_url, servers=servers, cache_path=cache_path, client=client)
+    return await catalog.get_tools()
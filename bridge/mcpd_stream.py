@@ -0,0 +1,309 @@
+"""Streaming variants of the mcpd tool calls for large responses.
+
+`mcpd_call_tool` buffers the whole response, parses it and re-stringifies
+non-dict results, so a big `read_file` peaks at several times the payload.
+`mcpd_stream_tool` instead reads the response incrementally and pulls the
+`"body"` string out of the JSON document as it arrives, yielding decoded
+text chunks without ever materializing the full document:
+
+    async for chunk in mcpd_stream_tool("filesystem", "read_file", {"path": "big.log"}):
+        sink.write(chunk)
+
+Responses whose `body` is not a string (or that have no `body`) fall back
+to a regular parse at the end of the stream.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .http_client import default_client_manager
+from .resilience import CircuitOpenError, is_server_failure, resilience_for
+from .tracing import child_span, inject_traceparent
+
+_BODY_SPECIAL = re.compile(r'["\\]')
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_WHITESPACE = " \t\r\n"
+
+
+class JSONBodyExtractor:
+    """Incrementally extract a top-level string field from a JSON object.
+
+    Feed decoded text with `feed`, which returns the pieces of the field's
+    value decoded so far. Text before the field is kept (to allow a
+    fallback parse) only until the field's string value starts; the value
+    itself is never accumulated. Call `finish` at the end of the input.
+    """
+
+    def __init__(self, key: str = "body"):
+        self.key = key
+        self.found = False
+        self._state = "start"
+        self._buf = ""
+        self._raw: Optional[List[str]] = []
+        self._key_chars: List[str] = []
+        self._current_key = ""
+        self._escape = False
+        self._in_string = False
+        self._depth = 0
+        self._high_surrogate: Optional[int] = None
+
+    def feed(self, text: str) -> List[str]:
+        """Consume more text and return newly decoded pieces of the value."""
+        if self._raw is not None:
+            self._raw.append(text)
+        self._buf += text
+        out: List[str] = []
+        if self._state == "body":
+            self._read_body(out)
+        else:
+            self._scan(out)
+        return out
+
+    def finish(self) -> Optional[str]:
+        """End the input; return the fallback value when no string field streamed.
+
+        Returns:
+            None if the value was streamed through `feed`, otherwise the
+            string form of the field (or of the whole document if the field
+            is missing), matching `mcpd_call_tool`.
+
+        Raises:
+            ValueError: If the input ended inside the streamed string.
+        """
+        if self.found:
+            if self._state != "done":
+                raise ValueError(f"Response ended inside the '{self.key}' string")
+            return None
+        document = json.loads("".join(self._raw))
+        if isinstance(document, dict) and self.key in document:
+            document = document[self.key]
+        return document if isinstance(document, str) else str(document)
+
+    def _scan(self, out: List[str]) -> None:
+        """Walk the object's structure up to the value of `key`."""
+        buf = self._buf
+        i = 0
+        while i < len(buf):
+            c = buf[i]
+            state = self._state
+            i += 1
+            if state in ("done", "fallback"):
+                break
+            if state == "start":
+                if c == "{":
+                    self._state = "key_wait"
+                elif c not in _WHITESPACE:
+                    self._state = "fallback"
+            elif state == "key_wait":
+                if c == '"':
+                    self._state = "key"
+                    self._key_chars = []
+                elif c == "}":
+                    self._state = "done"
+                elif c not in _WHITESPACE and c != ",":
+                    self._state = "fallback"
+            elif state == "key":
+                if self._escape:
+                    self._key_chars.append(c)
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._current_key = "".join(self._key_chars)
+                    self._state = "colon"
+                else:
+                    self._key_chars.append(c)
+            elif state == "colon":
+                if c == ":":
+                    self._state = "value_wait"
+            elif state == "value_wait":
+                if c in _WHITESPACE:
+                    continue
+                if self._current_key == self.key and c == '"':
+                    # Found the string value: stop keeping raw text and stream it
+                    self.found = True
+                    self._raw = None
+                    self._state = "body"
+                    self._buf = buf[i:]
+                    self._read_body(out)
+                    return
+                if c == '"':
+                    self._state = "skip_string"
+                elif c in "{[":
+                    self._state = "skip_nested"
+                    self._depth = 1
+                    self._in_string = False
+                else:
+                    self._state = "skip_scalar"
+            elif state == "skip_string":
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._state = "after_value"
+            elif state == "skip_nested":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                elif c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._state = "after_value"
+            elif state == "skip_scalar":
+                if c == ",":
+                    self._state = "key_wait"
+                elif c == "}":
+                    self._state = "done"
+            elif state == "after_value":
+                if c == ",":
+                    self._state = "key_wait"
+                elif c == "}":
+                    self._state = "done"
+        self._buf = ""
+
+    def _read_body(self, out: List[str]) -> None:
+        """Decode the value string, keeping a split escape sequence for later."""
+        buf = self._buf
+        i = 0
+        while True:
+            match = _BODY_SPECIAL.search(buf, i)
+            if match is None:
+                self._emit(out, buf[i:])
+                i = len(buf)
+                break
+            j = match.start()
+            self._emit(out, buf[i:j])
+            if buf[j] == '"':
+                self._flush_surrogate(out)
+                self._state = "done"
+                i = j + 1
+                break
+            if j + 1 >= len(buf):
+                i = j
+                break
+            escape = buf[j + 1]
+            if escape != "u":
+                self._emit(out, _SIMPLE_ESCAPES.get(escape, escape))
+                i = j + 2
+                continue
+            if j + 6 > len(buf):
+                i = j
+                break
+            self._emit_code_unit(out, int(buf[j + 2:j + 6], 16))
+            i = j + 6
+        self._buf = buf[i:] if self._state == "body" else ""
+
+    def _emit(self, out: List[str], text: str) -> None:
+        if text:
+            self._flush_surrogate(out)
+            out.append(text)
+
+    def _emit_code_unit(self, out: List[str], code: int) -> None:
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            out.append(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+            self._high_surrogate = None
+            return
+        self._flush_surrogate(out)
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+        else:
+            out.append(chr(code))
+
+    def _flush_surrogate(self, out: List[str]) -> None:
+        # An unpaired high surrogate is kept as-is, as json.loads does
+        if self._high_surrogate is not None:
+            out.append(chr(self._high_surrogate))
+            self._high_surrogate = None
+
+
+async def mcpd_stream_tool(
+    server: str,
+    tool: str,
+    args: Dict[str, Any],
+    mcpd_url: str = "http://localhost:8090",
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[str]:
+    """Call an MCP tool via mcpd and yield its `body` text as it arrives.
+
+    Failures raise. The call counts towards the server's circuit breaker,
+    but is never hedged or retried, since chunks may already have been
+    consumed.
+
+    Inside a traced run, the call is a client span whose `traceparent` is
+    sent to mcpd, as in `mcpd_call_tool_raw`.
+    """
+    if client is None:
+        client = default_client_manager().get_client(mcpd_url)
+    breaker = resilience_for(mcpd_url).breaker(server)
+    if not breaker.allow():
+        raise CircuitOpenError(server, breaker.retry_in())
+
+    try:
+        with child_span("mcpd.call_tool", kind="client", **{"mcp.server": server, "mcp.tool": tool}) as span:
+            async with client.stream(
+                "POST",
+                f"{mcpd_url}/api/v1/servers/{server}/tools/{tool}",
+                json=args,
+                headers=inject_traceparent(headers),
+            ) as response:
+                if span is not None:
+                    span.set_attribute("http.status_code", response.status_code)
+                response.raise_for_status()
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                extractor = JSONBodyExtractor("body")
+                async for raw in response.aiter_bytes():
+                    pieces = extractor.feed(decoder.decode(raw))
+                    if pieces:
+                        yield "".join(pieces)
+                pieces = extractor.feed(decoder.decode(b"", final=True))
+                if pieces:
+                    yield "".join(pieces)
+                fallback = extractor.finish()
+                if fallback is not None:
+                    yield fallback
+    except Exception as e:
+        if is_server_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    except BaseException:
+        breaker.abandon()
+        raise
+    else:
+        breaker.record_success()
+
+
+async def mcpd_call_tool_streaming(
+    server: str,
+    tool: str,
+    args: Dict[str, Any],
+    mcpd_url: str = "http://localhost:8090",
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
+    """Like `mcpd_call_tool`, but reads the response incrementally.
+
+    The result is still returned whole, but the raw document and its fully
+    parsed copy are never held, so peak memory stays near the size of the
+    text itself.
+    """
+    try:
+        chunks = [chunk async for chunk in mcpd_stream_tool(server, tool, args, mcpd_url, headers, client)]
+        return "".join(chunks)
+    except Exception as e:
+        return f"Error calling MCP tool {tool}: {e!s}"
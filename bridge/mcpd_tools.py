@@ -4,8 +4,14 @@ This module shows the core concepts from agent-factory PR #310
 for integrating with mcpd's REST API instead of using MCPStdio.
 """
 
+import asyncio
+import inspect
 import httpx
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, List, Tuple
+
+from .http_client import default_client_manager
+from .resilience import MCPDResilience, resilience_for
+from .tracing import child_span, inject_traceparent
 
 
 async def mcpd_call_tool(
@@ -13,7 +19,9 @@ async def mcpd_call_tool(
     tool: str, 
     args: Dict[str, Any], 
     mcpd_url: str = "http://localhost:8090",
-    headers: Optional[Dict[str, str]] = None
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    idempotent: bool = False,
 ) -> str:
     """Call an MCP tool via mcpd's REST API.
     
@@ -22,55 +30,278 @@ async def mcpd_call_tool(
         tool: Tool name to call
         args: Arguments for the tool
         mcpd_url: Base URL for mcpd
-        headers: Optional headers (for future AGNTCY DID auth)
+        headers: Optional extra headers; AGNTCY identity headers are added by
+            the pooled client when an identity is configured
+            (see `bridge.identity`)
+        client: Optional client to send the request with (its timeouts
+            apply); defaults to the pooled client for `mcpd_url` from the
+            shared client manager
+        idempotent: Whether the tool is safe to send twice, which allows
+            hedged attempts and retries (see `bridge.resilience`)
     """
     try:
-        # Future: AGNTCY headers would be added here
-        # headers = headers or {}
-        # if agntcy_did := os.getenv("AGNTCY_DID"):
-        #     headers["X-AGNTCY-DID"] = agntcy_did
-        
-        async with httpx.AsyncClient() as client:
+        result = await mcpd_call_tool_raw(
+            server, tool, args, mcpd_url, headers, client, idempotent=idempotent
+        )
+        # Fallback for responses without an extracted string "body"
+        return result if isinstance(result, str) else str(result)
+    except Exception as e:
+        return f"Error calling MCP tool {tool}: {e!s}"
+
+
+async def mcpd_call_tool_raw(
+    server: str,
+    tool: str,
+    args: Dict[str, Any],
+    mcpd_url: str = "http://localhost:8090",
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    idempotent: bool = False,
+    resilience: Optional[MCPDResilience] = None,
+) -> Any:
+    """Call an MCP tool via mcpd and return the decoded result.
+    
+    Unlike `mcpd_call_tool`, failures raise instead of being folded into
+    the returned string, and non-"body" responses are returned as decoded.
+    The call runs under the per-server circuit breaker, retry budget and
+    (for idempotent tools) hedging of `resilience`, which defaults to the
+    shared state for `mcpd_url`.
+    
+    Inside a traced run, each attempt is a client span whose `traceparent`
+    is sent to mcpd (see `bridge.tracing`).
+    """
+    if client is None:
+        client = default_client_manager().get_client(mcpd_url)
+    if resilience is None:
+        resilience = resilience_for(mcpd_url)
+    
+    async def send() -> Any:
+        with child_span("mcpd.call_tool", kind="client", **{"mcp.server": server, "mcp.tool": tool}) as span:
             response = await client.post(
                 f"{mcpd_url}/api/v1/servers/{server}/tools/{tool}",
                 json=args,
-                headers=headers,
-                timeout=30.0,
+                headers=inject_traceparent(headers),
             )
+            if span is not None:
+                span.set_attribute("http.status_code", response.status_code)
             response.raise_for_status()
-            result = response.json()
-            
-            # mcpd returns the extracted message in the "body" field
-            if isinstance(result, dict) and "body" in result:
-                return result["body"]
-            # Fallback for direct string responses
-            return str(result)
-    except Exception as e:
-        return f"Error calling MCP tool {tool}: {e!s}"
+            return response.json()
+    
+    result = await resilience.call(server, send, idempotent)
+    
+    # mcpd returns the extracted message in the "body" field
+    if isinstance(result, dict) and "body" in result:
+        return result["body"]
+    return result
+
+
+async def mcpd_list_servers(
+    mcpd_url: str = "http://localhost:8090",
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[str]:
+    """List the MCP server names managed by mcpd."""
+    if client is None:
+        client = default_client_manager().get_client(mcpd_url)
+    
+    response = await client.get(f"{mcpd_url}/api/v1/servers")
+    response.raise_for_status()
+    result = response.json()
+    if isinstance(result, dict):
+        result = result.get("servers", [])
+    return [entry["name"] if isinstance(entry, dict) else entry for entry in result]
+
+
+async def mcpd_list_tools(
+    server: str,
+    mcpd_url: str = "http://localhost:8090",
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Dict[str, Any]]:
+    """List the tool definitions (name, description, inputSchema) of an mcpd server."""
+    if client is None:
+        client = default_client_manager().get_client(mcpd_url)
+    
+    response = await client.get(f"{mcpd_url}/api/v1/servers/{server}/tools")
+    response.raise_for_status()
+    result = response.json()
+    if isinstance(result, dict):
+        result = result.get("tools", [])
+    return result
+
+
+async def mcpd_call_many(
+    calls: Iterable[Tuple[str, str, Dict[str, Any]]],
+    mcpd_url: str = "http://localhost:8090",
+    max_concurrency: int = 10,
+    per_server_limit: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    idempotent: bool = False,
+) -> List[str]:
+    """Call many mcpd tools concurrently and return results in call order.
+    
+    Args:
+        calls: `(server, tool, args)` tuples
+        mcpd_url: Base URL for mcpd
+        max_concurrency: Maximum calls in flight overall
+        per_server_limit: Maximum calls in flight per mcpd server
+        headers: Optional headers sent with every call
+        client: Optional client shared by all calls; defaults to the pooled
+            client for `mcpd_url`
+        idempotent: Whether every call may be hedged and retried
+    
+    Failed calls yield error strings in their slot, as with `mcpd_call_tool`.
+    """
+    tasks = _start_limited_calls(
+        calls, mcpd_url, max_concurrency, per_server_limit, headers, client, idempotent
+    )
+    try:
+        return [result for _, result in await asyncio.gather(*tasks)]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def mcpd_iter_many(
+    calls: Iterable[Tuple[str, str, Dict[str, Any]]],
+    mcpd_url: str = "http://localhost:8090",
+    max_concurrency: int = 10,
+    per_server_limit: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    idempotent: bool = False,
+) -> AsyncIterator[Tuple[int, str]]:
+    """Call many mcpd tools concurrently, yielding `(index, result)` as each completes.
+    
+    Takes the same arguments as `mcpd_call_many`. Calls still pending when
+    the caller stops iterating are cancelled.
+    """
+    tasks = _start_limited_calls(
+        calls, mcpd_url, max_concurrency, per_server_limit, headers, client, idempotent
+    )
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _start_limited_calls(
+    calls: Iterable[Tuple[str, str, Dict[str, Any]]],
+    mcpd_url: str,
+    max_concurrency: int,
+    per_server_limit: Optional[int],
+    headers: Optional[Dict[str, str]],
+    client: Optional[httpx.AsyncClient],
+    idempotent: bool,
+) -> List["asyncio.Task[Tuple[int, str]]"]:
+    """Schedule one task per call, gated by the overall and per-server limits."""
+    if client is None:
+        client = default_client_manager().get_client(mcpd_url)
+    
+    overall = asyncio.Semaphore(max_concurrency)
+    per_server: Dict[str, asyncio.Semaphore] = {}
+    
+    async def run(index: int, server: str, tool: str, args: Dict[str, Any]) -> Tuple[int, str]:
+        # Wait for the server's slot first so a busy server does not hold overall slots
+        server_slot = per_server.get(server)
+        if server_slot is None and per_server_limit is not None:
+            server_slot = per_server[server] = asyncio.Semaphore(per_server_limit)
+        
+        if server_slot is None:
+            async with overall:
+                return index, await mcpd_call_tool(server, tool, args, mcpd_url, headers, client, idempotent)
+        async with server_slot, overall:
+            return index, await mcpd_call_tool(server, tool, args, mcpd_url, headers, client, idempotent)
+    
+    return [
+        asyncio.ensure_future(run(index, server, tool, args))
+        for index, (server, tool, args) in enumerate(calls)
+    ]
 
 
 def create_mcpd_tool(
     server: str, 
     tool_name: str, 
-    mcpd_url: str = "http://localhost:8090"
+    mcpd_url: str = "http://localhost:8090",
+    client: Optional[httpx.AsyncClient] = None,
+    input_schema: Optional[Dict[str, Any]] = None,
+    description: Optional[str] = None,
+    idempotent: bool = False,
 ):
     """Create a tool function that calls mcpd.
     
     This demonstrates the pattern used in agent-factory
     for creating callable tool functions.
+    
+    When the tool's JSON `input_schema` is given, the function gets a real
+    keyword-only signature, annotations and an Args section built from it,
+    so agent frameworks can introspect the parameters.
     """
     async def tool_func(**kwargs) -> str:
-        return await mcpd_call_tool(server, tool_name, kwargs, mcpd_url)
+        return await mcpd_call_tool(
+            server, tool_name, kwargs, mcpd_url, client=client, idempotent=idempotent
+        )
     
     tool_func.__name__ = tool_name
-    tool_func.__doc__ = f"Call {tool_name} via mcpd server {server}"
+    tool_func.__doc__ = description or f"Call {tool_name} via mcpd server {server}"
     tool_func.__annotations__ = {"return": str}
     
+    if input_schema:
+        _apply_input_schema(tool_func, input_schema)
+    
     return tool_func
 
 
+_JSON_SCHEMA_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def _apply_input_schema(tool_func, input_schema: Dict[str, Any]) -> None:
+    """Give `tool_func` the signature and docs described by a JSON schema."""
+    properties = input_schema.get("properties", {})
+    required = set(input_schema.get("required", []))
+    
+    parameters = []
+    arg_docs = []
+    # Required parameters first, so the signature stays valid to read
+    for name in sorted(properties, key=lambda name: name not in required):
+        spec = properties[name]
+        annotation = _JSON_SCHEMA_TYPES.get(spec.get("type"), Any)
+        if name not in required:
+            annotation = Optional[annotation]
+        parameters.append(inspect.Parameter(
+            name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=inspect.Parameter.empty if name in required else None,
+            annotation=annotation,
+        ))
+        tool_func.__annotations__[name] = annotation
+        if spec.get("description"):
+            arg_docs.append(f"    {name}: {spec['description']}")
+    
+    tool_func.__signature__ = inspect.Signature(parameters, return_annotation=str)
+    if arg_docs:
+        tool_func.__doc__ = "\n\n".join([tool_func.__doc__, "Args:\n" + "\n".join(arg_docs)])
+
+
+def is_idempotent(tool: Dict[str, Any]) -> bool:
+    """Whether an MCP tool definition is annotated as read-only or idempotent."""
+    annotations = tool.get("annotations") or {}
+    return bool(annotations.get("readOnlyHint") or annotations.get("idempotentHint"))
+
+
 # Example: Create filesystem tools
-def create_filesystem_tools(mcpd_url: str = "http://localhost:8090") -> List:
+def create_filesystem_tools(
+    mcpd_url: str = "http://localhost:8090",
+    client: Optional[httpx.AsyncClient] = None,
+) -> List:
     """Create filesystem tools that work with mcpd.
     
     This shows the migration path from:
@@ -80,13 +311,13 @@ def create_filesystem_tools(mcpd_url: str = "http://localhost:8090") -> List:
     tools = []
     
     # Create read_file tool
-    read_file = create_mcpd_tool("filesystem", "read_file", mcpd_url)
+    read_file = create_mcpd_tool("filesystem", "read_file", mcpd_url, client, idempotent=True)
     read_file.__doc__ = "Read the contents of a file at the specified path"
     read_file.__annotations__["path"] = str
     tools.append(read_file)
     
     # Create list_directory tool
-    list_directory = create_mcpd_tool("filesystem", "list_directory", mcpd_url)
+    list_directory = create_mcpd_tool("filesystem", "list_directory", mcpd_url, client, idempotent=True)
     list_directory.__doc__ = "List the contents of a directory"
     list_directory.__annotations__["path"] = str
     tools.append(list_directory)
@@ -0,0 +1,160 @@
+"""Per-identity and per-organization token-bucket rate limiting.
+
+Each caller identity (`X-AGNTCY-Identity`) and organization
+(`X-AGNTCY-Organization`) has a token bucket refilled at `rate` tokens per
+second up to `burst`; a run takes one token from both. Callers without an
+identity share the `anonymous` bucket.
+
+Buckets are two floats in an LRU-ordered dict. A bucket that has been
+idle long enough to be full again is indistinguishable from a new one,
+so it is dropped; beyond `max_tracked_keys` the least recently seen
+bucket is dropped too. Memory stays bounded however many identities call.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+IDENTITY_HEADER = "X-AGNTCY-Identity"
+ORGANIZATION_HEADER = "X-AGNTCY-Organization"
+
+
+class RateLimitConfig(BaseModel):
+    """Settings for rate limiting run requests."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    identity_rate: Optional[float] = Field(default=5.0, gt=0, description="Runs per second per identity (None: unlimited)")
+    identity_burst: int = Field(default=20, gt=0, description="Runs an identity may send at once")
+    organization_rate: Optional[float] = Field(default=None, gt=0, description="Runs per second per organization (None: unlimited)")
+    organization_burst: int = Field(default=100, gt=0, description="Runs an organization may send at once")
+    max_tracked_keys: int = Field(default=10000, gt=0, description="Buckets kept per dimension before the oldest is dropped")
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by caller, with bounded, self-expiring state."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def peek(self, key: str, now: float) -> float:
+        """Tokens available to `key` at `now`."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, last = bucket
+        return min(float(self.burst), tokens + (now - last) * self.rate)
+
+    def take(self, key: str, now: float) -> float:
+        """Take one token (the caller checked `peek`); return what is left."""
+        tokens = self.peek(key, now) - 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        self._expire(now)
+        return tokens
+
+    def retry_after(self, tokens: float) -> float:
+        """Seconds until a bucket holding `tokens` has a whole token."""
+        return max(0.0, (1 - tokens) / self.rate)
+
+    def reset_after(self, tokens: float) -> float:
+        """Seconds until a bucket holding `tokens` is full again."""
+        return max(0.0, (self.burst - tokens) / self.rate)
+
+    def _expire(self, now: float) -> None:
+        refill_time = self.burst / self.rate
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and now - last < refill_time:
+                break
+            del self._buckets[key]
+
+
+class RateLimitDecision:
+    """Outcome of a rate-limit check, with the headers to send back."""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after")
+
+    def __init__(self, allowed: bool, limit: int, remaining: float, reset: float, retry_after: float = 0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        """`RateLimit-*` headers, plus `Retry-After` when rejected."""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(max(0, math.floor(self.remaining))),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimiter:
+    """Checks run requests against the identity and organization buckets."""
+
+    def __init__(self, config: Optional[RateLimitConfig] = None):
+        self.config = config or RateLimitConfig()
+        self._limiters: List[Tuple[str, TokenBucketLimiter]] = []
+        if self.config.identity_rate is not None:
+            self._limiters.append((
+                IDENTITY_HEADER,
+                TokenBucketLimiter(self.config.identity_rate, self.config.identity_burst, self.config.max_tracked_keys),
+            ))
+        if self.config.organization_rate is not None:
+            self._limiters.append((
+                ORGANIZATION_HEADER,
+                TokenBucketLimiter(self.config.organization_rate, self.config.organization_burst, self.config.max_tracked_keys),
+            ))
+        self.rejected = 0
+
+    def tracked_keys(self) -> int:
+        """Buckets held across all limited dimensions."""
+        return sum(len(limiter) for _, limiter in self._limiters)
+
+    def check(self, headers: Mapping[str, str]) -> Optional[RateLimitDecision]:
+        """Take a token for the request's caller, if every bucket has one.
+
+        Returns None when no dimension is limited. Rejected requests take
+        no tokens, so a throttled caller recovers at the configured rate.
+        """
+        if not self._limiters:
+            return None
+        now = time.monotonic()
+        keyed = [(limiter, headers.get(header) or "anonymous") for header, limiter in self._limiters]
+
+        for limiter, key in keyed:
+            tokens = limiter.peek(key, now)
+            if tokens < 1:
+                self.rejected += 1
+                return RateLimitDecision(
+                    False, limiter.burst, tokens, limiter.reset_after(tokens), limiter.retry_after(tokens)
+                )
+
+        # Report the dimension closest to its limit
+        decision = None
+        for limiter, key in keyed:
+            tokens = limiter.take(key, now)
+            if decision is None or tokens < decision.remaining:
+                decision = RateLimitDecision(True, limiter.burst, tokens, limiter.reset_after(tokens))
+        return decision
+
+    def stats(self) -> Dict[str, int]:
+        """Tracked buckets per dimension and rejected requests."""
+        stats = {f"tracked_{header}": len(limiter) for header, limiter in self._limiters}
+        stats["rejected"] = self.rejected
+        return stats
@@ -0,0 +1,81 @@
+"""Bounded request body reading for the bridge server."""
+
+import json
+from typing import Any, Tuple
+
+
+class RequestBodyTooLarge(Exception):
+    """Raised when a request body exceeds the configured size limit."""
+
+    def __init__(self, limit: int, received: int):
+        self.limit = limit
+        self.received = received
+        super().__init__(f"Request body exceeds limit of {limit} bytes")
+
+
+class InvalidRequestBody(ValueError):
+    """Raised when a request's `Content-Length` or JSON body is malformed."""
+
+
+class BodyMemoryTracker:
+    """Track bytes held by request bodies that are currently being processed.
+
+    Handlers acquire the body size once it has been read and release it when
+    the run finishes, so `in_flight` reflects what all open requests pin.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.total = 0
+
+    def acquire(self, size: int) -> None:
+        self.in_flight += size
+        self.total += size
+        if self.in_flight > self.peak:
+            self.peak = self.in_flight
+
+    def release(self, size: int) -> None:
+        self.in_flight -= size
+
+
+body_memory = BodyMemoryTracker()
+
+
+async def read_json_body(request, max_body_size: int) -> Tuple[Any, int]:
+    """Read and decode a JSON request body without exceeding `max_body_size`.
+
+    Oversized requests are rejected up front from `Content-Length` when the
+    client sends it, otherwise as soon as the streamed body crosses the limit.
+    Chunks are appended into a single buffer that `json.loads` decodes in
+    place, so the body is never held twice as bytes and a joined copy.
+
+    Returns:
+        The decoded body and its size in bytes.
+
+    Raises:
+        RequestBodyTooLarge: If the body is larger than `max_body_size`.
+        InvalidRequestBody: If `Content-Length` is malformed or the body is not JSON.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            declared = -1
+        if declared < 0:
+            raise InvalidRequestBody(f"Invalid Content-Length header: {content_length!r}")
+        if declared > max_body_size:
+            raise RequestBodyTooLarge(max_body_size, declared)
+
+    buffer = bytearray()
+    async for chunk in request.stream():
+        if len(buffer) + len(chunk) > max_body_size:
+            raise RequestBodyTooLarge(max_body_size, len(buffer) + len(chunk))
+        buffer += chunk
+
+    request.state.body_bytes = len(buffer)
+    try:
+        return json.loads(buffer), len(buffer)
+    except ValueError as e:
+        raise InvalidRequestBody(f"Request body is not valid JSON: {e}")
@@ -0,0 +1,285 @@
+"""Tail-latency controls for mcpd tool calls.
+
+Three mechanisms sit between `mcpd_call_tool` and the network:
+
+- Hedged requests: an idempotent call that has not answered after the
+  server's observed p95 latency gets a second, concurrent attempt and the
+  first success wins.
+- Per-server circuit breakers: after repeated failures a server is failed
+  fast for `reset_timeout` seconds, then probed with a single call.
+- A retry budget: retries and hedges are only sent while they stay under a
+  fixed fraction of regular traffic, with jittered exponential backoff, so
+  an outage does not turn into a retry storm.
+
+State is plain data keyed by mcpd URL and server, shared by every caller
+in the process.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the server's circuit is open."""
+
+    def __init__(self, server: str, retry_in: float):
+        self.server = server
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for mcpd server '{server}', retry in {retry_in:.1f}s")
+
+
+class ResiliencePolicy(BaseModel):
+    """Settings for hedging, circuit breaking and retries of mcpd calls."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    hedge: bool = Field(default=True, description="Send a hedged attempt for slow idempotent calls")
+    hedge_delay: Optional[float] = Field(default=None, gt=0, description="Fixed hedge delay in seconds (default: observed p95)")
+    hedge_min_samples: int = Field(default=20, gt=0, description="Latency samples needed before hedging on p95")
+    failure_threshold: int = Field(default=5, gt=0, description="Consecutive failures that open a server's circuit")
+    reset_timeout: float = Field(default=30.0, gt=0, description="Seconds a circuit stays open before a probe call")
+    max_retries: int = Field(default=2, ge=0, description="Retries per call, within the retry budget")
+    retry_budget_ratio: float = Field(default=0.1, gt=0, description="Retries and hedges allowed per regular call")
+    retry_budget_reserve: int = Field(default=10, gt=0, description="Largest burst of retries and hedges the budget allows")
+    backoff_base: float = Field(default=0.1, ge=0, description="Base delay of the jittered exponential backoff")
+    backoff_max: float = Field(default=2.0, ge=0, description="Upper bound of a single backoff delay")
+
+
+class LatencyTracker:
+    """Recent successful-call latencies of one server, for percentile queries."""
+
+    def __init__(self, size: int = 256):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        index = min(len(self._sorted) - 1, int(fraction * len(self._sorted)))
+        return self._sorted[index]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; claims the probe when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def abandon(self) -> None:
+        """Give up a claimed probe without a verdict, e.g. on cancellation."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class RetryBudget:
+    """Caps retries and hedges at a fraction of regular calls.
+
+    A token bucket holding at most `reserve` tokens: every regular call
+    deposits `ratio` tokens and every extra attempt withdraws one. Bursts of
+    retries are bounded by `reserve`, sustained retries by `ratio`.
+    """
+
+    def __init__(self, ratio: float, reserve: int):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = float(reserve)
+
+    def deposit(self) -> None:
+        self.balance = min(self.balance + self.ratio, float(self.reserve))
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+def is_server_failure(error: Exception) -> bool:
+    """Errors that say something about the server's health (not 4xx)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _never_sent(error: Exception) -> bool:
+    """Errors raised before the request reached the server; always safe to retry."""
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+class MCPDResilience:
+    """Hedging, circuit breakers and retry budget for one mcpd daemon."""
+
+    def __init__(self, policy: Optional[ResiliencePolicy] = None):
+        self.policy = policy or ResiliencePolicy()
+        self.budget = RetryBudget(self.policy.retry_budget_ratio, self.policy.retry_budget_reserve)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+
+    def breaker(self, server: str) -> CircuitBreaker:
+        breaker = self.breakers.get(server)
+        if breaker is None:
+            breaker = self.breakers[server] = CircuitBreaker(
+                self.policy.failure_threshold, self.policy.reset_timeout
+            )
+        return breaker
+
+    def latency(self, server: str) -> LatencyTracker:
+        tracker = self.latencies.get(server)
+        if tracker is None:
+            tracker = self.latencies[server] = LatencyTracker()
+        return tracker
+
+    def hedge_delay(self, server: str) -> Optional[float]:
+        """Delay before a hedged attempt, or None when hedging is off or unknown."""
+        if not self.policy.hedge:
+            return None
+        if self.policy.hedge_delay is not None:
+            return self.policy.hedge_delay
+        tracker = self.latency(server)
+        if len(tracker) < self.policy.hedge_min_samples:
+            return None
+        return tracker.percentile(0.95)
+
+    async def call(
+        self,
+        server: str,
+        send: Callable[[], Awaitable[Any]],
+        idempotent: bool = False,
+    ) -> Any:
+        """Run `send` under the server's breaker, with hedging and retries.
+
+        Only idempotent calls are hedged or retried after reaching the
+        server; calls that failed to connect are retried either way.
+        """
+        breaker = self.breaker(server)
+        if not breaker.allow():
+            raise CircuitOpenError(server, breaker.retry_in())
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                if idempotent:
+                    result = await self._hedged(server, send)
+                else:
+                    result = await self._timed(server, send)
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except Exception as e:
+                if not is_server_failure(e):
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if (
+                    attempt >= self.policy.max_retries
+                    or not (idempotent or _never_sent(e))
+                    or not breaker.allow()
+                    or not self.budget.withdraw()
+                ):
+                    raise
+                attempt += 1
+                backoff = min(self.policy.backoff_max, self.policy.backoff_base * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, backoff))
+            else:
+                breaker.record_success()
+                return result
+
+    async def _timed(self, server: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        result = await send()
+        self.latency(server).record(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, server: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self.hedge_delay(server)
+        if delay is None:
+            return await self._timed(server, send)
+
+        pending = {asyncio.ensure_future(self._timed(server, send))}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and self.budget.withdraw():
+                pending.add(asyncio.ensure_future(self._timed(server, send)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+_resilience: Dict[str, MCPDResilience] = {}
+
+
+def resilience_for(mcpd_url: str) -> MCPDResilience:
+    """Return the shared resilience state for an mcpd URL."""
+    key = mcpd_url.rstrip("/")
+    resilience = _resilience.get(key)
+    if resilience is None:
+        resilience = _resilience[key] = MCPDResilience()
+    return resilience
+
+
+def configure_resilience(mcpd_url: str, policy: ResiliencePolicy) -> MCPDResilience:
+    """Replace the resilience state of an mcpd URL with one using `policy`."""
+    resilience = _resilience[mcpd_url.rstrip("/")] = MCPDResilience(policy)
+    return resilience
@@ -0,0 +1,196 @@
+"""Priority and fair-share scheduling of bridge runs.
+
+Runs wait for a slot before they execute. Slots are handed out:
+
+- by lane: a waiting run in a higher-priority lane (lower `priority`
+  number) always goes before one in a lower-priority lane, as long as the
+  lane is below its own concurrency cap;
+- within a lane, by weighted fair queuing on the caller: each caller's
+  runs get virtual finish tags spaced by `1 / weight`, so a batch job
+  submitting thousands of runs interleaves with an interactive caller
+  instead of queuing in front of it.
+
+The lane comes from the `X-ACP-Priority` header or `metadata.priority` in
+the run request; the caller from `X-AGNTCY-Identity`, falling back to
+`X-AGNTCY-Organization`.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat, model_validator
+
+PRIORITY_HEADER = "X-ACP-Priority"
+IDENTITY_HEADER = "X-AGNTCY-Identity"
+ORGANIZATION_HEADER = "X-AGNTCY-Organization"
+
+
+class LaneConfig(BaseModel):
+    """One priority lane."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    priority: int = Field(default=0, description="Lower runs first")
+    max_concurrency: Optional[int] = Field(default=None, gt=0, description="Runs of this lane executing at once")
+
+
+def _default_lanes() -> Dict[str, LaneConfig]:
+    return {
+        "interactive": LaneConfig(priority=0),
+        "default": LaneConfig(priority=1),
+        "batch": LaneConfig(priority=2, max_concurrency=2),
+    }
+
+
+class SchedulerConfig(BaseModel):
+    """Settings for the run scheduler."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    max_concurrency: int = Field(default=8, gt=0, description="Runs executing at once across all lanes")
+    lanes: Dict[str, LaneConfig] = Field(default_factory=_default_lanes, description="Priority lanes by name")
+    default_lane: str = Field(default="default", description="Lane of runs that do not ask for one")
+    caller_weights: Dict[str, PositiveFloat] = Field(default_factory=dict, description="Fair-share weight per caller, above 0 (default 1)")
+
+    @model_validator(mode="after")
+    def _check_default_lane(self) -> "SchedulerConfig":
+        if self.default_lane not in self.lanes:
+            raise ValueError(f"default_lane '{self.default_lane}' is not a configured lane")
+        return self
+
+
+class _Lane:
+    def __init__(self, name: str, config: LaneConfig):
+        self.name = name
+        self.priority = config.priority
+        self.max_concurrency = config.max_concurrency
+        self.queue: List[Tuple[float, int, asyncio.Future]] = []
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.running = 0
+        self.dispatched = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def has_capacity(self) -> bool:
+        return self.max_concurrency is None or self.running < self.max_concurrency
+
+    def push(self, caller: str, weight: float, seq: int, waiter: asyncio.Future) -> None:
+        start = max(self.virtual_time, self.last_finish.get(caller, 0.0))
+        tag = start + 1.0 / weight
+        self.last_finish[caller] = tag
+        heapq.heappush(self.queue, (tag, seq, waiter))
+
+    def pop(self) -> Optional[asyncio.Future]:
+        while self.queue:
+            tag, _, waiter = heapq.heappop(self.queue)
+            if waiter.done():
+                continue  # cancelled while waiting
+            self.virtual_time = max(self.virtual_time, tag)
+            if len(self.last_finish) > 1024:
+                # Callers at or behind the virtual clock carry no history
+                self.last_finish = {
+                    caller: finish for caller, finish in self.last_finish.items() if finish > self.virtual_time
+                }
+            return waiter
+        return None
+
+    def waiting(self) -> int:
+        return sum(1 for _, _, waiter in self.queue if not waiter.done())
+
+
+class RunScheduler:
+    """Hands out run slots by lane priority, caller fair share and caps."""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None, on_wait: Optional[Callable[[str, float], None]] = None):
+        """Initialize the scheduler; `on_wait(lane, seconds)` is called as each run gets its slot."""
+        self.config = config or SchedulerConfig()
+        self.on_wait = on_wait
+        self.lanes = {name: _Lane(name, lane) for name, lane in self.config.lanes.items()}
+        self._by_priority = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+        self._running = 0
+        self._seq = itertools.count()
+
+    def classify(self, headers: Mapping[str, str], body: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Return the `(lane, caller)` of a run request."""
+        metadata = (body or {}).get("metadata") or {}
+        lane = headers.get(PRIORITY_HEADER) or (metadata.get("priority") if isinstance(metadata, dict) else None)
+        if not isinstance(lane, str) or lane not in self.lanes:
+            lane = self.config.default_lane
+        caller = headers.get(IDENTITY_HEADER) or headers.get(ORGANIZATION_HEADER) or "anonymous"
+        return lane, caller
+
+    @asynccontextmanager
+    async def slot(self, lane: str, caller: str) -> AsyncIterator[None]:
+        """Wait for a run slot in `lane` and hold it for the `async with` block."""
+        queue_lane = self.lanes.get(lane) or self.lanes[self.config.default_lane]
+        waiter = asyncio.get_running_loop().create_future()
+        queue_lane.push(caller, self.config.caller_weights.get(caller, 1.0), next(self._seq), waiter)
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled; hand the slot on
+                self._finish(queue_lane)
+            raise
+
+        wait = time.monotonic() - queued_at
+        queue_lane.wait_time_total += wait
+        queue_lane.wait_time_max = max(queue_lane.wait_time_max, wait)
+        if self.on_wait is not None:
+            self.on_wait(queue_lane.name, wait)
+        try:
+            yield
+        finally:
+            self._finish(queue_lane)
+
+    def _finish(self, lane: _Lane) -> None:
+        lane.running -= 1
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._running < self.config.max_concurrency:
+            for lane in self._by_priority:
+                if lane.has_capacity():
+                    waiter = lane.pop()
+                    if waiter is not None:
+                        break
+            else:
+                return
+            lane.running += 1
+            lane.dispatched += 1
+            self._running += 1
+            waiter.set_result(None)
+
+    def store_sizes(self) -> Dict[str, int]:
+        """Queue entries, cancelled ones included, and per-caller finish tags held."""
+        return {
+            "scheduler_queue": sum(len(lane.queue) for lane in self.lanes.values()),
+            "scheduler_callers": sum(len(lane.last_finish) for lane in self.lanes.values()),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Running and waiting runs and queue wait times per lane."""
+        return {
+            "running": self._running,
+            "max_concurrency": self.config.max_concurrency,
+            "lanes": {
+                lane.name: {
+                    "priority": lane.priority,
+                    "running": lane.running,
+                    "waiting": lane.waiting(),
+                    "max_concurrency": lane.max_concurrency,
+                    "dispatched": lane.dispatched,
+                    "wait_time_avg": lane.wait_time_total / lane.dispatched if lane.dispatched else 0.0,
+                    "wait_time_max": lane.wait_time_max,
+                }
+                for lane in self._by_priority
+            },
+        }
@@ -1,37 +1,31 @@
 """ACP server implementation for MCP-ACP bridge."""
 
 import asyncio
+import contextlib
+import hmac
 import json
+import os
+import socket
+import stat
 from typing import Optional
 
-from .bridge_executor import MCPToACPBridgeExecutor, SimpleMCPClient, RunCreateStateless
+from . import acp_models
+from .backends import MCPBackend, MCPDBackend
+from .bridge_executor import MCPToACPBridgeExecutor, SimpleMCPClient
 from .config_acp import MCPToACPBridgeConfig
-
-# Check if ACP is available
-acp_available = False
-try:
-    from agntcy_acp import Agent, AgentMetadata
-    acp_available = True
-except ImportError:
-    # Fallback when ACP not available
-    class Agent:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-        def model_dump(self):
-            return self.__dict__
-    
-    class AgentMetadata:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
+from .diagnostics import MemoryTrackingOff, ProfilerBusy, UnknownSnapshot
+from .rate_limit import RateLimiter
+from .request_body import InvalidRequestBody, RequestBodyTooLarge, body_memory, read_json_body
+from .tracing import TRACEPARENT_HEADER, SpanContext, child_span
 
 
 class ServerHandle:
     """Handle for managing the server."""
-    def __init__(self, task, server=None):
+    def __init__(self, task, server=None, uds: Optional[str] = None, executor=None):
         self.task = task
         self.server = server
+        self.uds = uds
+        self.executor = executor
     
     async def shutdown(self):
         """Shutdown the server."""
@@ -39,6 +33,10 @@ class ServerHandle:
             self.server.should_exit = True
         if self.task:
             self.task.cancel()
+        if self.uds and os.path.exists(self.uds):
+            os.unlink(self.uds)
+        if self.executor:
+            await self.executor.cleanup()
 
 
 async def serve_mcp_as_acp_async(
@@ -56,8 +54,8 @@ async def serve_mcp_as_acp_async(
     except ImportError:
         raise ImportError("You need to `pip install uvicorn starlette` to run the bridge server")
     
-    # Create MCP client and executor
-    mcp_client = SimpleMCPClient(bridge_config)
+    # Create MCP backend and executor
+    mcp_client = _create_backend(bridge_config)
     executor = MCPToACPBridgeExecutor(mcp_client, bridge_config)
     await executor.initialize()
     
@@ -69,6 +67,7 @@ async def serve_mcp_as_acp_async(
     
     # Create and start server
     server_handle = await _start_uvicorn_server(app, bridge_config)
+    server_handle.executor = executor
     
     # Log startup information
     _log_server_startup(bridge_config, server_handle)
@@ -76,8 +75,32 @@ async def serve_mcp_as_acp_async(
     return server_handle
 
 
+# Served outside the ACP endpoint, only when an admin token is configured
+ADMIN_ROUTES = [
+    ("/admin/profile", "admin_profile", "GET"),
+    ("/admin/memory", "admin_memory", "GET"),
+    ("/admin/memory/start", "admin_memory_start", "POST"),
+    ("/admin/memory/stop", "admin_memory_stop", "POST"),
+    ("/admin/memory/snapshots", "admin_memory_snapshot", "POST"),
+    ("/admin/memory/snapshots/{snapshot_id:int}", "admin_memory_top", "GET"),
+    ("/admin/memory/diff", "admin_memory_diff", "GET"),
+]
+
+
+def _create_backend(bridge_config: MCPToACPBridgeConfig) -> MCPBackend:
+    """Create the tool backend selected by the bridge config."""
+    if bridge_config.mcpd_url:
+        return MCPDBackend(bridge_config)
+    return SimpleMCPClient(bridge_config)
+
+
 def _create_route_handlers(executor: MCPToACPBridgeExecutor, bridge_config: MCPToACPBridgeConfig):
     """Create ACP route handlers."""
+    from starlette.responses import JSONResponse, Response
+    
+    rate_limiter = RateLimiter(bridge_config.rate_limit) if bridge_config.rate_limit else None
+    if rate_limiter is not None:
+        executor.metrics.watch_sizes(lambda: {"rate_limit_buckets": rate_limiter.tracked_keys()})
     
     async def get_agents(request):
         """List available agents (in this case, just our bridge)."""
@@ -102,19 +125,65 @@ def _create_route_handlers(executor: MCPToACPBridgeExecutor, bridge_config: MCPT
     
     async def create_stateless_run(request):
         """Create a stateless run."""
+        if executor.tracer is None:
+            return await run_stateless(request)
+        parent = SpanContext.from_traceparent(request.headers.get(TRACEPARENT_HEADER))
+        with executor.tracer.span("POST /runs/stateless", parent=parent, kind="server") as span:
+            response = await run_stateless(request)
+            span.set_attribute("http.status_code", response.status_code)
+            return response
+    
+    async def run_stateless(request):
+        limit = rate_limiter.check(request.headers) if rate_limiter else None
+        if limit is not None and not limit.allowed:
+            message = f"Rate limit exceeded, retry in {limit.headers()['Retry-After']}s"
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "RateLimited", "message": message},
+                "output": {"error": message, "success": False}
+            }, status_code=429, headers=limit.headers())
+        
+        body_size = 0
         try:
-            body = await request.json()
-            print(f"Received run request: {body}")
+            with child_span("read_body") as span:
+                body, body_size = await read_json_body(request, bridge_config.max_request_body_size)
+                if span is not None:
+                    span.set_attribute("http.request.body.size", body_size)
+            body_memory.acquire(body_size)
+            print(f"Received run request ({body_size} bytes)")
             
             # Create run request object
-            run_request = RunCreateStateless(**body)
+            run_request = acp_models.RunCreateStateless(**body)
             
-            # Execute the run
-            result = await executor.execute_stateless_run(run_request)
+            # Execute the run, after waiting for a slot when scheduling is on
+            async with contextlib.AsyncExitStack() as stack:
+                if executor.scheduler is not None:
+                    lane, caller = executor.scheduler.classify(request.headers, body)
+                    with child_span("scheduler.wait", **{"acp.lane": lane}):
+                        await stack.enter_async_context(executor.scheduler.slot(lane, caller))
+                result = await executor.execute_stateless_run(run_request)
             
-            result_dict = result.model_dump() if hasattr(result, 'model_dump') else result.__dict__
-            return JSONResponse(result_dict)
+            with child_span("serialize_response"):
+                result_dict = result.model_dump() if hasattr(result, 'model_dump') else result.__dict__
+                return JSONResponse(result_dict, headers=limit.headers() if limit else None)
             
+        except RequestBodyTooLarge as e:
+            print(f"Rejected run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "RequestTooLarge", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=413)
+        except InvalidRequestBody as e:
+            print(f"Rejected run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "InvalidRequest", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=400)
         except Exception as e:
             print(f"Error in create_stateless_run: {e}")
             return JSONResponse({
@@ -123,6 +192,8 @@ def _create_route_handlers(executor: MCPToACPBridgeExecutor, bridge_config: MCPT
                 "error": {"type": "RequestError", "message": str(e)},
                 "output": {"error": str(e), "success": False}
             }, status_code=500)
+        finally:
+            body_memory.release(body_size)
     
     async def get_stateless_run(request):
         """Get stateless run status - not implemented for bridge."""
@@ -131,13 +202,113 @@ def _create_route_handlers(executor: MCPToACPBridgeExecutor, bridge_config: MCPT
             status_code=501
         )
     
-    return {
+    async def metrics(request):
+        """Prometheus metrics."""
+        return Response(executor.metrics.render(), media_type="text/plain; version=0.0.4")
+    
+    def admin(handler):
+        """Require the admin token and map diagnostics errors to statuses."""
+        
+        async def checked(request):
+            token = request.headers.get("authorization", "")
+            expected = f"Bearer {bridge_config.admin_token}"
+            if not hmac.compare_digest(token.encode(), expected.encode()):
+                return JSONResponse({"error": "Unauthorized"}, status_code=401)
+            try:
+                return await handler(request)
+            except (ProfilerBusy, MemoryTrackingOff) as e:
+                return JSONResponse({"error": str(e)}, status_code=409)
+            except UnknownSnapshot as e:
+                return JSONResponse({"error": str(e)}, status_code=404)
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+        
+        checked.__name__ = handler.__name__
+        checked.__doc__ = handler.__doc__
+        return checked
+    
+    def int_param(request, name: str, default: Optional[int] = None) -> int:
+        value = request.query_params.get(name)
+        if value is None:
+            if default is None:
+                raise ValueError(f"Missing query parameter: {name}")
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Query parameter {name} must be an integer, got: {value}")
+    
+    async def admin_profile(request):
+        """Capture a time-boxed profile: `?seconds=5&format=collapsed|pstats`."""
+        fmt = request.query_params.get("format", "collapsed")
+        seconds = float(request.query_params.get("seconds", "5"))
+        content, media_type = await executor.profiler.capture(seconds, fmt)
+        filename = "bridge.pstats" if fmt == "pstats" else "bridge.collapsed"
+        return Response(
+            content,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    
+    async def admin_memory(request):
+        """Memory tracking status and traced bytes."""
+        return JSONResponse(executor.memory.status())
+    
+    async def admin_memory_start(request):
+        """Start tracing allocations: `?frames=1`."""
+        executor.memory.start(int_param(request, "frames", 1))
+        return JSONResponse(executor.memory.status())
+    
+    async def admin_memory_stop(request):
+        """Stop tracing allocations and drop the snapshots."""
+        executor.memory.stop()
+        return JSONResponse(executor.memory.status())
+    
+    async def admin_memory_snapshot(request):
+        """Take a snapshot and return its top sites: `?limit=20&group_by=lineno`."""
+        snapshot_id = await executor.memory.snapshot()
+        top = await executor.memory.top(
+            snapshot_id, int_param(request, "limit", 20), request.query_params.get("group_by", "lineno")
+        )
+        return JSONResponse({"id": snapshot_id, "top": top})
+    
+    async def admin_memory_top(request):
+        """Top allocation sites of a kept snapshot: `?limit=20&group_by=lineno`."""
+        snapshot_id = request.path_params["snapshot_id"]
+        top = await executor.memory.top(
+            snapshot_id, int_param(request, "limit", 20), request.query_params.get("group_by", "lineno")
+        )
+        return JSONResponse({"id": snapshot_id, "top": top})
+    
+    async def admin_memory_diff(request):
+        """Growth between two snapshots: `?from=1&to=2&limit=20&group_by=lineno`."""
+        from_id, to_id = int_param(request, "from"), int_param(request, "to")
+        diff = await executor.memory.diff(
+            from_id, to_id, int_param(request, "limit", 20), request.query_params.get("group_by", "lineno")
+        )
+        return JSONResponse({"from": from_id, "to": to_id, "diff": diff})
+    
+    handlers = {
         "get_agents": get_agents,
         "search_agents": search_agents,
         "get_agent_by_id": get_agent_by_id,
         "create_stateless_run": create_stateless_run,
         "get_stateless_run": get_stateless_run,
     }
+    handlers = {name: executor.metrics.instrument(name, handler) for name, handler in handlers.items()}
+    if bridge_config.metrics_path:
+        handlers["metrics"] = metrics
+    if bridge_config.admin_token:
+        handlers.update({
+            "admin_profile": admin(admin_profile),
+            "admin_memory": admin(admin_memory),
+            "admin_memory_start": admin(admin_memory_start),
+            "admin_memory_stop": admin(admin_memory_stop),
+            "admin_memory_snapshot": admin(admin_memory_snapshot),
+            "admin_memory_top": admin(admin_memory_top),
+            "admin_memory_diff": admin(admin_memory_diff),
+        })
+    return handlers
 
 
 def _create_agent_response(executor: MCPToACPBridgeExecutor, bridge_config: MCPToACPBridgeConfig):
@@ -146,11 +317,11 @@ def _create_agent_response(executor: MCPToACPBridgeExecutor, bridge_config: MCPT
     agent_name = f"{bridge_config.server_name} MCP Bridge"
     agent_description = f"MCP server '{bridge_config.server_name}' exposed via ACP"
     
-    return Agent(
+    return acp_models.Agent(
         id=agent_id,
         name=agent_name,
         description=agent_description,
-        metadata=AgentMetadata(
+        metadata=acp_models.AgentMetadata(
             organization=bridge_config.organization,
             version=bridge_config.version,
         ),
@@ -171,6 +342,11 @@ def _create_starlette_app(bridge_config: MCPToACPBridgeConfig, handlers: dict) -
         Route(f"{base_path}/runs/stateless", handlers["create_stateless_run"], methods=["POST"]),
         Route(f"{base_path}/runs/stateless/{{run_id}}", handlers["get_stateless_run"], methods=["GET"]),
     ]
+    if "metrics" in handlers:
+        routes.append(Route(bridge_config.metrics_path, handlers["metrics"], methods=["GET"]))
+    for path, name, method in ADMIN_ROUTES:
+        if name in handlers:
+            routes.append(Route(path, handlers[name], methods=[method]))
     
     return Starlette(routes=routes)
 
@@ -188,23 +364,69 @@ async def _start_uvicorn_server(app, bridge_config: MCPToACPBridgeConfig) -> Ser
     )
     server = uvicorn.Server(config)
     
-    # Start server in background
-    task = asyncio.create_task(server.serve())
+    # Start server in background, on explicit sockets when a Unix socket is configured
+    if bridge_config.uds:
+        task = asyncio.create_task(server.serve(sockets=_bind_sockets(bridge_config)))
+    else:
+        task = asyncio.create_task(server.serve())
     
     # Wait for server to start
     while not server.started:
         await asyncio.sleep(0.1)
     
-    return ServerHandle(task=task, server=server)
+    return ServerHandle(task=task, server=server, uds=bridge_config.uds)
+
+
+def _bind_sockets(bridge_config: MCPToACPBridgeConfig) -> list:
+    """Bind the Unix domain socket and, unless `uds_only`, the TCP socket."""
+    path = bridge_config.uds
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise OSError(f"Refusing to replace non-socket file at {path}")
+        os.unlink(path)
+    
+    uds_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The socket is created with `uds_mode` rather than chmod-ed after
+    # bind, so it is never reachable with the umask's permissions
+    umask = os.umask(0o777 & ~bridge_config.uds_mode)
+    try:
+        uds_sock.bind(path)
+    except OSError:
+        uds_sock.close()
+        raise
+    finally:
+        os.umask(umask)
+    sockets = [uds_sock]
+    
+    if not bridge_config.uds_only:
+        family = socket.AF_INET6 if ":" in bridge_config.host else socket.AF_INET
+        tcp_sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            tcp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            tcp_sock.bind((bridge_config.host, bridge_config.port))
+        except OSError:
+            tcp_sock.close()
+            uds_sock.close()
+            os.unlink(path)
+            raise
+        sockets.append(tcp_sock)
+    
+    return sockets
 
 
 def _log_server_startup(bridge_config: MCPToACPBridgeConfig, server_handle: ServerHandle) -> None:
     """Log server startup information."""
-    bridge_url = f"http://{bridge_config.host}:{bridge_config.port}{bridge_config.endpoint}"
+    if bridge_config.uds_only:
+        bridge_url = f"http://localhost{bridge_config.endpoint}"
+    else:
+        bridge_url = f"http://{bridge_config.host}:{bridge_config.port}{bridge_config.endpoint}"
     
     if bridge_config.identity_id:
         print(f"MCP to ACP bridge started at {bridge_url} with identity {bridge_config.identity_id}")
     else:
         print(f"MCP to ACP bridge started at {bridge_url}")
     
+    if bridge_config.uds:
+        print(f"Listening on unix socket {bridge_config.uds}")
+    
     print(f"ACP manifest available at: {bridge_url}/agents")
\ No newline at end of file
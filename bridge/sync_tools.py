@@ -0,0 +1,149 @@
+"""Synchronous facades for the async mcpd tools.
+
+Sync agent frameworks cannot await `create_mcpd_tool` functions, and
+wrapping each call in `asyncio.run()` builds and tears down an event loop
+and an HTTP client every time. The facades here instead submit calls to
+one persistent event loop running in a daemon thread, where the pooled
+mcpd clients live for the life of the process:
+
+    read_file = create_mcpd_sync_tool("filesystem", "read_file", timeout=10)
+    read_file(path="README.md")
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .http_client import close_mcpd_clients
+from .mcpd_tools import create_filesystem_tools, create_mcpd_tool
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self, name: str = "mcpd-tools-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the loop thread if it is not running yet."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> "concurrent.futures.Future[Any]":
+        """Schedule a coroutine on the loop and return a thread-safe future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block until it finishes.
+
+        Raises:
+            TimeoutError: If it does not finish within `timeout` seconds; the
+                coroutine is cancelled.
+            RuntimeError: If called from the loop's own thread, which would
+                deadlock.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() called from its own loop thread")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Call did not finish within {timeout} seconds")
+
+    def stop(self) -> None:
+        """Close the loop's pooled clients, then stop and close the loop."""
+        with self._lock:
+            if self._thread is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(close_mcpd_clients(), self.loop).result(5)
+            except Exception as e:
+                print(f"Error closing mcpd clients: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self.loop = None
+            self._thread = None
+
+
+_background_loop = BackgroundLoop()
+atexit.register(_background_loop.stop)
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide loop that sync tool calls run on."""
+    return _background_loop
+
+
+def sync_tool(
+    async_tool: Callable[..., Awaitable[Any]],
+    timeout: Optional[float] = None,
+    loop: Optional[BackgroundLoop] = None,
+) -> Callable[..., Any]:
+    """Wrap an async tool function into a blocking one.
+
+    The wrapper keeps the tool's name, docstring and signature, so it can
+    be handed to sync frameworks as-is (including tools built by
+    `MCPDToolCatalog.get_tools`).
+
+    Args:
+        async_tool: The async tool function
+        timeout: Seconds to wait for each call before raising TimeoutError
+        loop: Loop to run on (default: the shared background loop)
+    """
+    background = loop or _background_loop
+
+    @functools.wraps(async_tool)
+    def tool_func(**kwargs: Any) -> Any:
+        return background.run(async_tool(**kwargs), timeout)
+
+    return tool_func
+
+
+def create_mcpd_sync_tool(
+    server: str,
+    tool_name: str,
+    mcpd_url: str = "http://localhost:8090",
+    timeout: Optional[float] = None,
+    input_schema: Optional[Dict[str, Any]] = None,
+    description: Optional[str] = None,
+    idempotent: bool = False,
+) -> Callable[..., str]:
+    """Create a blocking tool function that calls mcpd on the background loop."""
+    return sync_tool(
+        create_mcpd_tool(
+            server,
+            tool_name,
+            mcpd_url,
+            input_schema=input_schema,
+            description=description,
+            idempotent=idempotent,
+        ),
+        timeout,
+    )
+
+
+def create_filesystem_sync_tools(
+    mcpd_url: str = "http://localhost:8090",
+    timeout: Optional[float] = None,
+) -> List[Callable[..., str]]:
+    """Blocking variants of `create_filesystem_tools`."""
+    return [sync_tool(tool, timeout) for tool in create_filesystem_tools(mcpd_url)]
@@ -0,0 +1,304 @@
+"""Request tracing with W3C `traceparent` propagation.
+
+A run request gets a server span, with children for reading the body,
+waiting for a scheduler slot, executing the run and the MCP or mcpd tool
+call, so a slow run shows where its time went. Context is propagated in
+the W3C `traceparent` header: an incoming header makes the bridge's spans
+part of the caller's trace, and mcpd calls carry the header onwards.
+
+Sampling is decided once per trace, at its head: a trace started by the
+bridge is sampled with probability `sample_rate`, one started upstream
+keeps the caller's decision. Spans of unsampled traces still carry ids
+for propagation but are never recorded. Finished spans are buffered and
+exported in batches from a background task, as JSON lines to a file or
+as OTLP/JSON to a collector, so exporting never blocks a request.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Literal, Mapping, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+TRACEPARENT_HEADER = "traceparent"
+
+_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class TracingConfig(BaseModel):
+    """Settings for request tracing."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    sample_rate: float = Field(default=0.1, ge=0, le=1, description="Fraction of traces started by the bridge that are recorded")
+    exporter: Literal["file", "otlp"] = Field(default="file", description="Where finished spans go")
+    file_path: str = Field(default="bridge-traces.jsonl", description="JSON lines file for the file exporter")
+    otlp_endpoint: str = Field(default="http://localhost:4318", description="OTLP/HTTP collector base URL")
+    service_name: str = Field(default="mcp-acp-bridge", description="service.name resource attribute")
+    max_queue_size: int = Field(default=2048, gt=0, description="Finished spans buffered before the oldest are dropped")
+    export_interval: float = Field(default=5.0, gt=0, description="Seconds between batch exports")
+
+
+class SpanContext:
+    """Identifiers of a span, as carried in `traceparent`."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a `traceparent` header; None if absent or malformed."""
+        if not value:
+            return None
+        parts = value.strip().lower().split("-")
+        if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+            return None
+        _, trace_id, span_id, flags = parts[:4]
+        if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+            return None
+        try:
+            int(trace_id, 16), int(span_id, 16)
+            sampled = bool(int(flags, 16) & 1)
+        except ValueError:
+            return None
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, sampled)
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = ("tracer", "name", "context", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_id: Optional[str], kind: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.context.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("bridge_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The span active in this context, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def child_span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open a child of the active span; does nothing outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with parent.tracer.span(name, kind=kind, **attributes) as span:
+        yield span
+
+
+def inject_traceparent(headers: Optional[Mapping[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Copy of `headers` with the active span's `traceparent` added."""
+    span = _current_span.get()
+    if span is None:
+        return dict(headers) if headers is not None else None
+    return {**(headers or {}), TRACEPARENT_HEADER: span.context.to_traceparent()}
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def close(self) -> None:
+        pass
+
+
+class OTLPSpanExporter:
+    """Posts finished spans as OTLP/JSON to `{endpoint}/v1/traces`."""
+
+    def __init__(self, endpoint: str, service_name: str, client: Any = None):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._client = client
+        self._owns_client = client is None
+
+    async def export(self, spans: List[Span]) -> None:
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(timeout=10.0)
+        response = await self._client.post(self.url, json=self.payload(spans))
+        response.raise_for_status()
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "bridge.tracing"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+    async def close(self) -> None:
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": _SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+class Tracer:
+    """Creates spans, decides sampling and exports finished spans in batches."""
+
+    def __init__(self, config: Optional[TracingConfig] = None, exporter: Any = None):
+        self.config = config or TracingConfig()
+        if exporter is None:
+            if self.config.exporter == "otlp":
+                exporter = OTLPSpanExporter(self.config.otlp_endpoint, self.config.service_name)
+            else:
+                exporter = FileSpanExporter(self.config.file_path)
+        self.exporter = exporter
+        self._finished: "deque[Span]" = deque(maxlen=self.config.max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[SpanContext] = None, kind: str = "internal", **attributes: Any) -> Iterator[Span]:
+        """Run the `with` block in a new span, a child of `parent` or the active span."""
+        if parent is None:
+            active = _current_span.get()
+            parent = active.context if active is not None else None
+        if parent is None:
+            context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex(), random.random() < self.config.sample_rate)
+        else:
+            context = SpanContext(parent.trace_id, os.urandom(8).hex(), parent.sampled)
+
+        span = Span(self, name, context, parent.span_id if parent else None, kind, attributes if context.sampled else {})
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if context.sampled:
+                self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        if len(self._finished) == self._finished.maxlen:
+            self.dropped += 1
+        self._finished.append(span)
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._export_loop())
+            except RuntimeError:
+                pass  # no loop: exported on the next flush
+
+    async def _export_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.export_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Export the spans finished so far."""
+        while self._finished:
+            batch = [self._finished.popleft() for _ in range(min(len(self._finished), 512))]
+            try:
+                await self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                print(f"Error exporting {len(batch)} spans: {e}")
+                self.dropped += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        """Spans waiting, exported and dropped."""
+        return {"pending": len(self._finished), "exported": self.exported, "dropped": self.dropped}
+
+    async def close(self) -> None:
+        """Stop the export task and export what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.exporter.close()
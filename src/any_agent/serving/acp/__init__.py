@@ -1,12 +1,39 @@
 """ACP serving module for any-agent.
 
 Following patterns from any_agent.serving.a2a and any_agent.serving.mcp
+
+The exports are imported on first access, so importing the package does
+not load the server, its executor or agntcy_acp.
 """
 
-from .config_acp import ACPServingConfig
-from .server_acp import serve_acp_async
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config_acp import ACPServingConfig
+    from .server_acp import serve_acp_async
+
+_EXPORTS = {
+    "ACPServingConfig": ".config_acp",
+    "serve_acp_async": ".server_acp",
+}
 
 __all__ = [
     "ACPServingConfig",
     "serve_acp_async",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
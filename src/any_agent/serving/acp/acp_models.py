@@ -0,0 +1,60 @@
+"""ACP models, imported from agntcy_acp on first use.
+
+agntcy_acp is an optional dependency and slow to import, so the names
+below are resolved by the module's `__getattr__` the first time one of
+them is read rather than when the serving package is imported. Without
+the SDK they are minimal stand-ins with the same attributes;
+`acp_available` tells which is in use.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+MODEL_NAMES = ("Agent", "AgentMetadata", "RunCreateStateless", "RunStateless", "RunStatus")
+
+
+class _RunStatus:
+    completed = "completed"
+    failed = "failed"
+
+
+class _Record:
+    def __init__(self, **kwargs: Any) -> None:
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def model_dump(self) -> dict[str, Any]:
+        return self.__dict__
+
+
+class _Agent(_Record):
+    def model_dump(self) -> dict[str, Any]:
+        return {
+            k: v.model_dump() if hasattr(v, "model_dump") else v
+            for k, v in self.__dict__.items()
+        }
+
+
+def _load() -> dict[str, Any]:
+    try:
+        import agntcy_acp
+    except ImportError:
+        return {
+            "acp_available": False,
+            "Agent": _Agent,
+            "AgentMetadata": _Record,
+            "RunCreateStateless": _Record,
+            "RunStateless": _Record,
+            "RunStatus": _RunStatus,
+        }
+    return {"acp_available": True, **{name: getattr(agntcy_acp, name) for name in MODEL_NAMES}}
+
+
+def __getattr__(name: str) -> Any:
+    if name != "acp_available" and name not in MODEL_NAMES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    # Later lookups find the names as plain module globals
+    globals().update(_load())
+    return globals()[name]
@@ -6,68 +6,97 @@ Following patterns from any_agent.serving.a2a.agent_executor
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import contextlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
 from uuid import uuid4
 
 from any_agent.logging import logger
 
+from . import acp_models
+from .agent_pool import AgentFactory, AgentReplicaPool, default_agent_factory
+from .cancellation import CancellationCallback, bind_cancel_event, unbind_cancel_event
 from .config_acp import ACPServingConfig
+from .metrics import ACPMetrics
+from .result_cache import ResultCache, make_cache_key, tools_fingerprint
+from .run_pool import SyncRunPool
+from .scheduler import RunScheduler
+from .tool_usage import ToolUsageCallback, ToolUsageTracker
 
 if TYPE_CHECKING:
-    from any_agent.frameworks.any_agent import AnyAgent
+    from agntcy_acp import Agent, RunStateless
 
-# Check if ACP is available
-acp_available = False
-try:
-    from agntcy_acp import (
-        Agent,
-        AgentMetadata,
-        RunCreateStateless,
-        RunStateless,
-        RunStatus,
-        StreamingMode,
-        StreamingModes,
-    )
-    acp_available = True
-except ImportError:
-    # Fallback classes when ACP not available
-    class RunStatus:
-        completed = "completed"
-        failed = "failed"
-    
-    class RunStateless:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-    
-    class Agent:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-        def model_dump(self):
-            return self.__dict__
-    
-    class AgentMetadata:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
+    from any_agent.frameworks.any_agent import AnyAgent
 
 
 class ACPAgentExecutor:
     """Executor that bridges any-agent to ACP protocol."""
 
-    def __init__(self, agent: AnyAgent, serving_config: ACPServingConfig):
+    def __init__(
+        self,
+        agent: AnyAgent,
+        serving_config: ACPServingConfig,
+        agent_factory: Optional[AgentFactory] = None,
+    ):
         """Initialize the executor.
 
         Args:
             agent: The any-agent instance to serve
             serving_config: ACP serving configuration
+            agent_factory: Coroutine function creating agent replicas when
+                `max_agent_replicas` is set (default: re-create the agent
+                from its framework and config)
 
         """
         self.agent = agent
         self.serving_config = serving_config
         self._agent_manifest: Optional[Dict[str, Any]] = None
         self._agent_id = f"any-agent-{serving_config.server_name}"
+        self._run_pool = SyncRunPool(
+            serving_config.sync_run_executor, serving_config.sync_run_workers
+        )
+        if serving_config.stream_tool_usage and not self._install_callback(ToolUsageCallback()):
+            logger.warning(
+                "Agent config has no callbacks list; only tools wrapped with "
+                "`track_tool` will be reported"
+            )
+        if serving_config.cancel_on_disconnect:
+            self._install_callback(CancellationCallback())
+        self.cancelled_runs = 0
+        self._result_cache: Optional[ResultCache] = None
+        if serving_config.result_cache:
+            self._result_cache = ResultCache(
+                max_entries=serving_config.result_cache_max_entries,
+                ttl=serving_config.result_cache_ttl,
+                path=serving_config.result_cache_path,
+            )
+        self._tools_fingerprint = ""
+        self.scheduler: Optional[RunScheduler] = None
+        if serving_config.scheduler is not None:
+            self.scheduler = RunScheduler(serving_config.scheduler, on_wait=self._observe_wait)
+        self._agent_pool: Optional[AgentReplicaPool] = None
+        if serving_config.max_agent_replicas is not None:
+            self._agent_pool = AgentReplicaPool(
+                agent,
+                agent_factory or default_agent_factory(agent),
+                min_replicas=serving_config.min_agent_replicas,
+                max_replicas=serving_config.max_agent_replicas,
+                idle_timeout=serving_config.agent_replica_idle_timeout,
+            )
+        self.in_flight = 0
+        self.metrics = ACPMetrics()
+        self.metrics.watch_runs(lambda: self.in_flight, self._queued_runs)
+        self.metrics.watch_caches(self._cache_stats)
+
+    def _install_callback(self, callback: Any) -> bool:
+        """Add a callback to the agent config once; False if it has no callbacks list."""
+        callbacks = getattr(self.agent.agent_config, "callbacks", None)
+        if not isinstance(callbacks, list):
+            return False
+        if not any(type(cb) is type(callback) for cb in callbacks):
+            callbacks.append(callback)
+        return True
 
     async def initialize(self) -> None:
         """Initialize by creating ACP manifest from agent configuration."""
@@ -76,6 +105,11 @@ class ACPAgentExecutor:
         
         # Create ACP manifest
         self._agent_manifest = await self._create_acp_manifest(tools)
+        self._tools_fingerprint = tools_fingerprint(self._agent_manifest["acp"]["tools"])
+        
+        if self._agent_pool is not None:
+            await self._agent_pool.fill()
+            self._agent_pool.ensure_started()
         
         logger.info(f"ACP executor initialized with {len(tools)} tools")
     
@@ -138,11 +172,11 @@ class ACPAgentExecutor:
 
     def get_agents(self) -> List[Agent]:
         """Get list of available agents."""
-        agent = Agent(
+        agent = acp_models.Agent(
             id=self._agent_id,
             name=f"{self.serving_config.server_name} (any-agent)",
             description=self.agent.agent_config.description or "Any-agent served via ACP",
-            metadata=AgentMetadata(
+            metadata=acp_models.AgentMetadata(
                 organization=self.serving_config.organization,
                 version=self.serving_config.version,
                 framework=str(self.agent.agent_framework),
@@ -168,53 +202,376 @@ class ACPAgentExecutor:
 
         """
         run_id = str(uuid4())
+        tracker = self._new_tool_tracker()
+        token = tracker.bind() if tracker else None
+        self.in_flight += 1
+        start = time.perf_counter()
+        status = "cancelled"
         
         try:
-            # Extract query from request
-            query = run_request_data.get("input", {}).get("query")
-            if not query and isinstance(run_request_data.get("input"), str):
-                query = run_request_data["input"]
+            query = self._extract_query(run_request_data)
             
-            if not query:
-                raise ValueError("No query provided in request")
+            cache_key = self._cache_key(query, run_request_data)
+            if cache_key is not None:
+                cached = await self._result_cache.get(cache_key)
+                if cached is not None:
+                    status = "cached"
+                    return self._cached_run(run_id, query, cached)
             
             # Run the agent
             logger.info(f"Executing agent with query: {query}")
+            result = await self._run_agent(query)
             
-            # Use any-agent's run method
-            if asyncio.iscoroutinefunction(self.agent.run):
-                result = await self.agent.run(query)
-            else:
-                result = self.agent.run(query)
+            status = "completed"
+            run = self._completed_run(run_id, query, result, _timing(tracker))
+            if cache_key is not None:
+                await self._cache_result(cache_key, run)
+            return run
             
-            # Format response
-            if hasattr(result, 'final_output'):
-                output_text = result.final_output
-            else:
-                output_text = str(result)
+        except Exception as e:
+            logger.error(f"Error executing agent: {e}")
+            status = "failed"
+            return self._failed_run(run_id, e, _timing(tracker))
+        finally:
+            self.in_flight -= 1
+            self.metrics.run_duration.labels(status).observe(time.perf_counter() - start)
+            if token is not None:
+                tracker.unbind(token)
+
+    async def stream_stateless_run(
+        self, run_request_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a stateless ACP run, yielding events as the agent produces them.
+
+        Yields `{"event": ..., "data": ...}` dictionaries:
+
+        - `run`: emitted immediately with the run id and `running` status
+        - `token`: a text delta (`{"delta": ...}`) from the agent
+        - `step`: an intermediate agent step (message, tool call, ...)
+        - `tool_start` / `tool_end`: tool executions, when `stream_tool_usage`
+          is enabled
+        - `result`: the final run, shaped like `execute_stateless_run`'s result
+
+        Agents exposing an async `run_stream(query)` iterator are streamed
+        item by item: strings become `token` events, objects with a
+        `final_output` are taken as the final result, anything else becomes
+        a `step`. Other agents produce a single `result` event.
+
+        The agent's iterator is only advanced when the consumer asks for the
+        next event, so a slow client slows the agent down instead of
+        buffering its output.
+
+        Args:
+            run_request_data: Dictionary with run request data
+
+        """
+        self.in_flight += 1
+        start = time.perf_counter()
+        status = "cancelled"
+        try:
+            async with contextlib.aclosing(self._stream_run(run_request_data)) as events:
+                async for event in events:
+                    if event["event"] == "result":
+                        status = _run_status(event["data"])
+                    yield event
+        finally:
+            self.in_flight -= 1
+            self.metrics.run_duration.labels(status).observe(time.perf_counter() - start)
+
+    async def _stream_run(
+        self, run_request_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        run_id = str(uuid4())
+        yield {"event": "run", "data": {"id": run_id, "status": "running"}}
+        
+        tracker = self._new_tool_tracker()
+        token = tracker.bind() if tracker else None
+        try:
+            query = self._extract_query(run_request_data)
             
-            # Create successful run result
-            return RunStateless(
-                id=run_id,
-                status=RunStatus.completed,
-                output={
-                    "result": output_text,
-                    "query": query,
-                    "success": True
-                }
-            )
+            cache_key = self._cache_key(query, run_request_data)
+            if cache_key is not None:
+                cached = await self._result_cache.get(cache_key)
+                if cached is not None:
+                    run = self._cached_run(run_id, query, cached)
+                    yield {"event": "result", "data": run.model_dump()}
+                    return
             
+            logger.info(f"Streaming agent run with query: {query}")
+            async with self._checkout_agent() as agent:
+                async for event, value in self._stream_agent(agent, query, tracker):
+                    if event is None:
+                        result = value
+                    else:
+                        yield {"event": event, "data": value}
+            error = None
         except Exception as e:
-            logger.error(f"Error executing agent: {e}")
-            return RunStateless(
-                id=run_id,
-                status=RunStatus.failed,
-                error={
-                    "type": "AgentExecutionError",
-                    "message": str(e)
-                },
-                output={
-                    "error": str(e),
-                    "success": False
-                }
-            )
\ No newline at end of file
+            logger.error(f"Error streaming agent run: {e}")
+            error = e
+        finally:
+            if token is not None:
+                tracker.unbind(token)
+        
+        if tracker is not None:
+            for event in tracker.drain():
+                yield {"event": event["event"], "data": event}
+        if error is None:
+            run = self._completed_run(run_id, query, result, _timing(tracker))
+            if cache_key is not None:
+                await self._cache_result(cache_key, run)
+        else:
+            run = self._failed_run(run_id, error, _timing(tracker))
+        
+        yield {
+            "event": "result",
+            "data": run.model_dump() if hasattr(run, "model_dump") else run,
+        }
+
+    async def _stream_agent(
+        self, agent: AnyAgent, query: str, tracker: Optional[ToolUsageTracker]
+    ) -> AsyncIterator[tuple[Optional[str], Any]]:
+        """Stream `(event, data)` pairs of one run; the result comes last as `(None, result)`."""
+        run_stream = getattr(agent, "run_stream", None)
+        if run_stream is None:
+            async for event, value in _with_tool_events(self._call_agent(agent, query), tracker):
+                yield event, value
+            return
+        
+        result = None
+        tokens: List[str] = []
+        stream = run_stream(query)
+        iterator = stream.__aiter__()
+        try:
+            while True:
+                async for event, value in _with_tool_events(_next_item(iterator), tracker):
+                    if event is None:
+                        item = value
+                    else:
+                        yield event, value
+                if item is _END:
+                    break
+                if isinstance(item, str):
+                    tokens.append(item)
+                    yield "token", {"delta": item}
+                elif hasattr(item, "final_output"):
+                    result = item
+                else:
+                    yield "step", _dump_step(item)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        yield None, result if result is not None else "".join(tokens)
+
+    def _checkout_agent(self) -> Any:
+        """Context manager giving the agent (or replica) a run should use."""
+        if self._agent_pool is None:
+            return contextlib.nullcontext(self.agent)
+        return self._agent_pool.checkout()
+
+    async def _run_agent(self, query: str) -> Any:
+        """Run the agent on the query."""
+        async with self._checkout_agent() as agent:
+            return await self._call_agent(agent, query)
+
+    async def _call_agent(self, agent: AnyAgent, query: str) -> Any:
+        # The flag lets runs in worker threads notice a cancellation at
+        # their next LLM or tool call
+        cancel = threading.Event()
+        token = bind_cancel_event(cancel)
+        try:
+            # Blocking runs go to the pool so they don't stall other requests
+            # on the event loop
+            if asyncio.iscoroutinefunction(agent.run):
+                return await agent.run(query)
+            # A cancelled run's worker may keep using the replica; the pool
+            # cleans it up only after the worker lets go
+            on_done = self._agent_pool.hold(agent) if self._agent_pool is not None else None
+            return await self._run_pool.run(agent.run, query, on_done=on_done)
+        except asyncio.CancelledError:
+            cancel.set()
+            self.cancelled_runs += 1
+            logger.info("Agent run cancelled")
+            raise
+        finally:
+            unbind_cancel_event(token)
+
+    def _new_tool_tracker(self) -> Optional[ToolUsageTracker]:
+        if not self.serving_config.stream_tool_usage:
+            return None
+        return ToolUsageTracker(self.serving_config.tool_usage_max_events)
+
+    def _cache_key(self, query: str, run_request_data: Dict[str, Any]) -> Optional[str]:
+        if self._result_cache is None:
+            return None
+        run_input = run_request_data.get("input")
+        context = run_input.get("context") if isinstance(run_input, dict) else None
+        return make_cache_key(
+            query, context, self.agent.agent_config.model_id, self._tools_fingerprint
+        )
+
+    async def _cache_result(self, cache_key: str, run: RunStateless) -> None:
+        # Only plain-text results are cached; they round-trip exactly
+        result = run.output.get("result")
+        if isinstance(result, str):
+            await self._result_cache.set(cache_key, result)
+
+    @staticmethod
+    def _cached_run(run_id: str, query: str, result: str) -> RunStateless:
+        return acp_models.RunStateless(
+            id=run_id,
+            status=acp_models.RunStatus.completed,
+            output={
+                "result": result,
+                "query": query,
+                "success": True,
+                "cached": True,
+            },
+        )
+
+    @staticmethod
+    def _extract_query(run_request_data: Dict[str, Any]) -> str:
+        """Get the user query from a run request."""
+        query = run_request_data.get("input", {}).get("query")
+        if not query and isinstance(run_request_data.get("input"), str):
+            query = run_request_data["input"]
+        
+        if not query:
+            raise ValueError("No query provided in request")
+        return query
+
+    @staticmethod
+    def _completed_run(
+        run_id: str, query: str, result: Any, timing: Optional[Dict[str, Any]] = None
+    ) -> RunStateless:
+        if hasattr(result, 'final_output'):
+            output_text = result.final_output
+        else:
+            output_text = str(result)
+        
+        output = {
+            "result": output_text,
+            "query": query,
+            "success": True
+        }
+        if timing is not None:
+            output["timing"] = timing
+        return acp_models.RunStateless(id=run_id, status=acp_models.RunStatus.completed, output=output)
+
+    @staticmethod
+    def _failed_run(
+        run_id: str, error: Exception, timing: Optional[Dict[str, Any]] = None
+    ) -> RunStateless:
+        output = {
+            "error": str(error),
+            "success": False
+        }
+        if timing is not None:
+            output["timing"] = timing
+        return acp_models.RunStateless(
+            id=run_id,
+            status=acp_models.RunStatus.failed,
+            error={
+                "type": "AgentExecutionError",
+                "message": str(error)
+            },
+            output=output,
+        )
+
+    def get_run_pool_stats(self) -> Dict[str, Any]:
+        """Utilization, queue depth and wait times of the sync run pool."""
+        return self._run_pool.stats()
+
+    def get_agent_pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Size and utilization of the agent replica pool, if enabled."""
+        if self._agent_pool is None:
+            return None
+        return self._agent_pool.stats()
+
+    def get_result_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit rate and size of the result cache, if enabled."""
+        if self._result_cache is None:
+            return None
+        return self._result_cache.stats()
+
+    def _observe_wait(self, lane: str, wait: float) -> None:
+        self.metrics.scheduler_wait.labels(lane).observe(wait)
+
+    def _queued_runs(self) -> int:
+        """Runs waiting for a scheduler slot or a sync pool worker."""
+        queued = self._run_pool.queue_depth
+        if self.scheduler is not None:
+            queued += sum(lane.waiting() for lane in self.scheduler.lanes.values())
+        return queued
+
+    def _cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        if self._result_cache is None:
+            return {}
+        return {"result": self._result_cache.stats()}
+
+    async def cleanup(self) -> None:
+        """Release executor resources."""
+        await self.metrics.close()
+        self._run_pool.shutdown()
+        if self._agent_pool is not None:
+            await self._agent_pool.close()
+
+
+def _dump_step(item: Any) -> Dict[str, Any]:
+    """JSON-friendly form of an intermediate agent step."""
+    if hasattr(item, "model_dump"):
+        return item.model_dump(mode="json")
+    if isinstance(item, dict):
+        return item
+    return {"content": str(item)}
+
+
+def _run_status(run: Dict[str, Any]) -> str:
+    """Outcome label of a dumped run: `cached`, `completed` or `failed`."""
+    output = run.get("output")
+    if isinstance(output, dict) and output.get("cached"):
+        return "cached"
+    status = run.get("status")
+    return str(getattr(status, "value", status))
+
+
+def _timing(tracker: Optional[ToolUsageTracker]) -> Optional[Dict[str, Any]]:
+    return tracker.timing() if tracker is not None else None
+
+
+_END = object()
+
+
+async def _next_item(iterator: Any) -> Any:
+    """Next item of an async iterator, or `_END` when it is exhausted."""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+async def _with_tool_events(
+    awaitable: Any, tracker: Optional[ToolUsageTracker]
+) -> AsyncIterator[tuple[Optional[str], Any]]:
+    """Await `awaitable`, yielding `(event, data)` for tool events meanwhile.
+
+    The awaited value is yielded last as `(None, value)`.
+    """
+    if tracker is None:
+        yield None, await awaitable
+        return
+    
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while not task.done():
+            waiter = asyncio.ensure_future(tracker.changed.wait())
+            try:
+                await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+            for event in tracker.drain():
+                yield event["event"], event
+    finally:
+        if not task.done():
+            task.cancel()
+    yield None, task.result()
@@ -0,0 +1,274 @@
+"""Pool of agent replicas for concurrent ACP runs.
+
+Each run checks out its own replica so runs never share agent state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Optional
+
+from any_agent.logging import logger
+
+if TYPE_CHECKING:
+    from any_agent.frameworks.any_agent import AnyAgent
+
+AgentFactory = Callable[[], Awaitable["AnyAgent"]]
+
+
+class AgentReplicaPool:
+    """Hands out one agent replica per run, growing and shrinking with load.
+
+    Runs check a replica out for their whole duration, so frameworks that
+    keep per-run state on the agent object never see two runs at once.
+    The pool grows on demand up to `max_replicas`; replicas idle for more
+    than `idle_timeout` seconds are retired down to `min_replicas`, both
+    when a run checks one in and, once `ensure_started` has been called,
+    from a background task, so the pool also shrinks when traffic stops.
+    """
+
+    def __init__(
+        self,
+        agent: AnyAgent,
+        factory: AgentFactory,
+        min_replicas: int = 1,
+        max_replicas: int = 4,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            agent: The first replica, normally the agent being served
+            factory: Coroutine function creating a new replica
+            min_replicas: Replicas kept even when idle
+            max_replicas: Upper bound on replicas; further runs wait
+            idle_timeout: Seconds before an idle replica above `min_replicas`
+                is retired
+
+        """
+        self._factory = factory
+        self._agent = agent
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.idle_timeout = idle_timeout
+        # Idle replicas with the time they were checked in, most recent last
+        self._idle: list[tuple[Any, float]] = [(agent, time.monotonic())]
+        self._size = 1
+        self._busy = 0
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+        # Replicas dropped after a cancelled run, by id, until cleaned up
+        self._discarded: dict[int, Any] = {}
+        # Holds on replicas still used by worker threads, by id
+        self._holds: dict[int, int] = {}
+        self._cleanups: set[asyncio.Task[None]] = set()
+        self._reaper: Optional[asyncio.Task[None]] = None
+        self.created = 1
+        self.retired = 0
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+
+    @property
+    def size(self) -> int:
+        """Replicas that exist or are being created."""
+        return self._size
+
+    async def fill(self) -> None:
+        """Create replicas until `min_replicas` exist."""
+        while self._size < self.min_replicas:
+            self._size += 1
+            try:
+                replica = await self._factory()
+            except BaseException:
+                self._size -= 1
+                raise
+            self.created += 1
+            async with self._condition:
+                self._idle.append((replica, time.monotonic()))
+                self._condition.notify()
+
+    def ensure_started(self) -> None:
+        """Start retiring idle replicas on the running loop, if not already started."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+
+    async def _reap(self) -> None:
+        # Check twice per timeout, so a replica retires within 1.5 timeouts
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            async with self._condition:
+                retired = self._retire_idle(time.monotonic())
+            for old in retired:
+                await self._cleanup(old)
+
+    @contextlib.asynccontextmanager
+    async def checkout(self) -> AsyncIterator[Any]:
+        """Borrow a replica for the duration of the `async with` block."""
+        replica = await self._acquire()
+        try:
+            yield replica
+        except asyncio.CancelledError:
+            # A cancelled run may have left per-run state behind (or still be
+            # running in a worker thread), so the replica is not reused; it
+            # is cleaned up once no worker holds it
+            await self._discard(replica)
+            raise
+        except BaseException:
+            await self._release(replica)
+            raise
+        await self._release(replica)
+
+    async def _acquire(self) -> Any:
+        started = time.monotonic()
+        create = False
+        async with self._condition:
+            self._waiting += 1
+            try:
+                while not self._idle and self._size >= self.max_replicas:
+                    await self._condition.wait()
+            finally:
+                self._waiting -= 1
+            if self._idle:
+                # Most recently used first, so the oldest ones go idle and retire
+                replica, _ = self._idle.pop()
+            else:
+                self._size += 1
+                create = True
+            self._busy += 1
+
+        if create:
+            try:
+                replica = await self._factory()
+            except BaseException:
+                async with self._condition:
+                    self._size -= 1
+                    self._busy -= 1
+                    self._condition.notify()
+                raise
+            self.created += 1
+            logger.info(f"Agent pool grew to {self._size} replicas")
+
+        self.checkouts += 1
+        self.wait_time_total += time.monotonic() - started
+        return replica
+
+    async def _release(self, replica: Any) -> None:
+        now = time.monotonic()
+        async with self._condition:
+            self._busy -= 1
+            self._idle.append((replica, now))
+            retired = self._retire_idle(now)
+            self._condition.notify()
+        for old in retired:
+            await self._cleanup(old)
+
+    async def _discard(self, replica: Any) -> None:
+        async with self._condition:
+            self._busy -= 1
+            self._size -= 1
+            self.retired += 1
+            self._condition.notify()
+        self._discarded[id(replica)] = replica
+        if id(replica) not in self._holds:
+            self._schedule_cleanup(replica)
+
+    def hold(self, replica: Any) -> Callable[[], None]:
+        """Mark `replica` as used outside the run's task, e.g. by a worker thread.
+
+        Returns:
+            The function ending the hold; a replica discarded meanwhile is
+            cleaned up once its last hold ends.
+
+        """
+        key = id(replica)
+        self._holds[key] = self._holds.get(key, 0) + 1
+
+        def release() -> None:
+            self._holds[key] -= 1
+            if self._holds[key] == 0:
+                del self._holds[key]
+                if key in self._discarded:
+                    self._schedule_cleanup(replica)
+
+        return release
+
+    def _schedule_cleanup(self, replica: Any) -> None:
+        del self._discarded[id(replica)]
+        task = asyncio.ensure_future(self._cleanup(replica))
+        self._cleanups.add(task)
+        task.add_done_callback(self._cleanups.discard)
+
+    def _retire_idle(self, now: float) -> list[Any]:
+        retired = []
+        while (
+            self._size > self.min_replicas
+            and self._idle
+            and now - self._idle[0][1] > self.idle_timeout
+        ):
+            replica, _ = self._idle.pop(0)
+            self._size -= 1
+            self.retired += 1
+            retired.append(replica)
+        if retired:
+            logger.info(f"Agent pool shrank to {self._size} replicas")
+        return retired
+
+    def stats(self) -> dict[str, Any]:
+        """Current pool size, utilization and queueing metrics."""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "busy": self._busy,
+            "waiting": self._waiting,
+            "min_replicas": self.min_replicas,
+            "max_replicas": self.max_replicas,
+            "utilization": self._busy / self.max_replicas,
+            "created": self.created,
+            "retired": self.retired,
+            "checkouts": self.checkouts,
+            "wait_time_avg": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Retire all idle replicas and those discarded after cancelled runs."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        async with self._condition:
+            idle = [replica for replica, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+        # Workers still holding a discarded replica are abandoned with it
+        discarded = list(self._discarded.values())
+        self._discarded.clear()
+        for replica in idle + discarded:
+            await self._cleanup(replica)
+        if self._cleanups:
+            await asyncio.gather(*self._cleanups)
+
+    async def _cleanup(self, replica: Any) -> None:
+        # The served agent belongs to the caller
+        if replica is self._agent:
+            return
+        cleanup = getattr(replica, "cleanup_async", None)
+        if cleanup is None:
+            return
+        try:
+            await cleanup()
+        except Exception as e:
+            logger.warning(f"Error cleaning up agent replica: {e}")
+
+
+def default_agent_factory(agent: AnyAgent) -> AgentFactory:
+    """Factory creating replicas from the served agent's framework and config."""
+
+    async def create_replica() -> AnyAgent:
+        from any_agent import AnyAgent
+
+        return await AnyAgent.create_async(agent.agent_framework, agent.agent_config)
+
+    return create_replica
@@ -0,0 +1,67 @@
+"""Cooperative cancellation of agent runs.
+
+Following patterns from any_agent.callbacks
+"""
+
+from __future__ import annotations
+
+import threading
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+try:
+    from any_agent.callbacks import Callback as _CallbackBase
+except ImportError:
+    _CallbackBase = object
+
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar(
+    "acp_run_cancel_event", default=None
+)
+
+
+class RunCancelledError(Exception):
+    """Raised inside an agent run whose caller has gone away."""
+
+
+def bind_cancel_event(event: threading.Event) -> Token:
+    """Make `event` the cancellation flag of the run executing in this context."""
+    return _cancel_event.set(event)
+
+
+def unbind_cancel_event(token: Token) -> None:
+    """Restore the cancellation flag that was active before `bind_cancel_event`."""
+    _cancel_event.reset(token)
+
+
+def is_cancelled() -> bool:
+    """Whether the run executing in this context has been cancelled."""
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def raise_if_cancelled() -> None:
+    """Raise `RunCancelledError` if the current run has been cancelled.
+
+    Long-running sync tools can call this between steps; asyncio tasks are
+    cancelled directly and do not need it.
+    """
+    if is_cancelled():
+        msg = "Agent run cancelled"
+        raise RunCancelledError(msg)
+
+
+class CancellationCallback(_CallbackBase):
+    """any-agent callback stopping a cancelled run at its next LLM or tool call.
+
+    Runs executing in the sync run pool cannot be interrupted from the
+    event loop; this makes them give up at the next step instead of
+    running to completion.
+    """
+
+    def before_llm_call(self, context: Any, *args: Any, **kwargs: Any) -> Any:
+        raise_if_cancelled()
+        return context
+
+    def before_tool_execution(self, context: Any, *args: Any, **kwargs: Any) -> Any:
+        raise_if_cancelled()
+        return context
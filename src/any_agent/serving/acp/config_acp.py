@@ -3,9 +3,14 @@
 Following patterns from any_agent.serving.a2a.config_a2a and any_agent.serving.mcp.config_mcp
 """
 
-from typing import Optional
+from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from .rate_limit import RateLimitConfig
+from .scheduler import SchedulerConfig
 
 
 class ACPServingConfig(BaseModel):
@@ -34,9 +39,33 @@ class ACPServingConfig(BaseModel):
     endpoint: str = "/acp"
     """Will be passed as argument to `Starlette().add_route`"""
 
+    uds: Optional[str] = None
+    """Path of a Unix domain socket to serve on, alongside `host`/`port`.
+
+    Lets co-located agents skip loopback TCP. Connect with
+    `httpx.AsyncHTTPTransport(uds=...)`.
+    """
+
+    uds_only: bool = False
+    """Serve only on `uds` and do not open a TCP listener."""
+
+    uds_mode: int = Field(default=0o600, ge=0, le=0o777)
+    """Permission bits of the `uds` socket file.
+
+    Clients need write access to connect, so the default admits only the
+    server's user. Use `0o660` to let the group's processes in as well.
+    """
+
     log_level: str = "warning"
     """Will be passed as argument to the `uvicorn` server."""
 
+    max_request_body_size: int = Field(default=10 * 1024 * 1024, gt=0)
+    """Maximum run request body size in bytes.
+
+    Larger requests are rejected with 413, from `Content-Length` when present
+    or while the body is being streamed.
+    """
+
     version: str = "1.0.0"
     """Version of the ACP bridge service."""
 
@@ -57,9 +86,92 @@ class ACPServingConfig(BaseModel):
     See: https://spec.identity.agntcy.org/
     """
 
+    # Execution configuration
+    sync_run_executor: Literal["thread", "process"] = "thread"
+    """Pool that runs synchronous `agent.run` calls off the event loop.
+
+    `"process"` requires the agent to be picklable.
+    """
+
+    sync_run_workers: int = Field(default=4, gt=0)
+    """Maximum number of synchronous agent runs executing at once."""
+
+    cancel_on_disconnect: bool = True
+    """Cancel a run when its caller disconnects before the response is sent.
+
+    Async agents are cancelled immediately; runs in the sync pool stop at
+    their next LLM or tool call.
+    """
+
+    scheduler: Optional[SchedulerConfig] = None
+    """Priority lanes, per-caller fair share and concurrency caps for runs.
+
+    `None` runs requests in arrival order.
+    """
+
+    rate_limit: Optional[RateLimitConfig] = None
+    """Token-bucket limits on runs per `X-AGNTCY-Identity` and organization.
+
+    Rejected runs get 429 with `Retry-After`; accepted ones carry
+    `RateLimit-*` headers. `None` disables rate limiting.
+    """
+
+    max_agent_replicas: Optional[int] = Field(default=None, gt=0)
+    """Serve runs from a pool of up to this many agent replicas.
+
+    Each run checks out its own replica, created from the served agent's
+    framework and config, so frameworks keeping per-run state on the agent
+    can run queries in parallel. `None` shares the single served agent
+    between all runs.
+    """
+
+    min_agent_replicas: int = Field(default=1, gt=0)
+    """Replicas kept alive when the pool is idle."""
+
+    agent_replica_idle_timeout: float = Field(default=300.0, gt=0)
+    """Seconds before an idle replica above `min_agent_replicas` is retired."""
+
+    result_cache: bool = False
+    """Cache successful run results for identical inputs.
+
+    Only enable for deterministic agents (e.g. temperature 0). Entries are
+    keyed on the normalized query, the context, the model id and the tool
+    catalog.
+    """
+
+    result_cache_max_entries: int = Field(default=1024, gt=0)
+    """Results kept in memory before least recently used ones are evicted."""
+
+    result_cache_ttl: Optional[float] = Field(default=3600.0, gt=0)
+    """Seconds a cached result stays valid; `None` never expires."""
+
+    result_cache_path: Optional[str] = None
+    """Optional SQLite file persisting the cache across restarts and processes."""
+
+    metrics_path: Optional[str] = "/metrics"
+    """Path serving Prometheus metrics, outside `endpoint`; `None` disables it."""
+
     # Streaming configuration (matching A2A patterns)
     stream_agent_responses: bool = True
     """Whether to stream agent responses via ACP."""
 
     stream_tool_usage: bool = False
-    """Whether to stream tool execution results."""
\ No newline at end of file
+    """Whether to report tool executions of each run.
+
+    Adds `tool_start`/`tool_end` events to streamed runs and per-tool
+    timings under `output["timing"]`. Only tool names and durations are
+    recorded.
+    """
+
+    tool_usage_max_events: int = Field(default=256, gt=0)
+    """Maximum number of tool events kept per run when `stream_tool_usage` is on."""
+
+    @model_validator(mode="after")
+    def _check_consistency(self) -> ACPServingConfig:
+        if self.uds_only and not self.uds:
+            msg = "uds_only requires uds to be set"
+            raise ValueError(msg)
+        if self.max_agent_replicas is not None and self.min_agent_replicas > self.max_agent_replicas:
+            msg = "min_agent_replicas cannot exceed max_agent_replicas"
+            raise ValueError(msg)
+        return self
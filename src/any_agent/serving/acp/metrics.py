@@ -0,0 +1,364 @@
+"""Prometheus metrics for ACP serving.
+
+Counters and histograms rendered in the Prometheus text format for `/metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from any_agent.logging import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class CounterChild:
+    """One labelled counter series."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class HistogramChild:
+    """One labelled histogram series; bucket counts are cumulated at render."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """The series for these label values; keep it to skip the lookup."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                msg = f"{self.name} expects labels {self.labelnames}"
+                raise ValueError(msg)
+            child = self._children[values] = self._new_child()
+        return child
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for values, child in self._children.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """A distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for values, child in self._children.items():
+            # Snapshot first so the cumulative counts stay consistent
+            counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose value is read from a callback at scrape time.
+
+    The callback returns a number, or a dict from label-value tuples to
+    numbers for labelled series.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], Any],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.warning(f"Error collecting metric {self.name}: {e}")
+            return []
+        lines = self.header()
+        series = value.items() if isinstance(value, dict) else [((), value)]
+        for values, number in series:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(number)}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            msg = f"Metric {metric.name} already registered"
+            raise ValueError(msg)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], Any],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = (),
+    ) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help_text, callback, kind, labelnames))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep."""
+
+    def __init__(self, histogram: HistogramChild, interval: float = 0.5) -> None:
+        """Initialize the monitor.
+
+        Args:
+            histogram: Series receiving one lag sample per interval
+            interval: Seconds between samples
+
+        """
+        self.histogram = histogram
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        """Start sampling on the running loop, if not already started."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.histogram.observe(self.last_lag)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class ACPMetrics:
+    """The metric series of an ACP server.
+
+    Request and run series are updated inline. Values that already live
+    elsewhere (in-flight and queued runs, cache hits) are read through
+    `watch_*` callbacks at scrape time instead of being mirrored on every
+    change. Updates happen on the event loop thread, so nothing is locked.
+    """
+
+    def __init__(self, loop_lag_interval: float = 0.5) -> None:
+        """Initialize the series.
+
+        Args:
+            loop_lag_interval: Seconds between event loop lag samples
+
+        """
+        self.registry = MetricsRegistry()
+        self.http_requests = self.registry.counter(
+            "acp_http_requests_total",
+            "HTTP requests by route, method and status",
+            ("route", "method", "status"),
+        )
+        self.http_duration = self.registry.histogram(
+            "acp_http_request_duration_seconds", "HTTP request latency by route", ("route",)
+        )
+        self.run_duration = self.registry.histogram(
+            "acp_agent_run_duration_seconds", "Agent run latency by outcome", ("status",)
+        )
+        self.scheduler_wait = self.registry.histogram(
+            "acp_scheduler_wait_seconds", "Time runs waited for a scheduler slot by lane", ("lane",)
+        )
+        self.loop_lag = LoopLagMonitor(
+            self.registry.histogram(
+                "acp_event_loop_lag_seconds", "Event loop wake-up delay", buckets=LOOP_LAG_BUCKETS
+            ).labels(),
+            loop_lag_interval,
+        )
+        self._cache_sources: list[Callable[[], dict[str, dict[str, Any]]]] = []
+        self.registry.callback(
+            "acp_cache_hits_total", "Cache hits by cache",
+            lambda: self._cache_stat("hits"), "counter", ("cache",),
+        )
+        self.registry.callback(
+            "acp_cache_misses_total", "Cache misses by cache",
+            lambda: self._cache_stat("misses"), "counter", ("cache",),
+        )
+        self.registry.callback(
+            "acp_cache_hit_ratio", "Cache hit ratio by cache", self._cache_ratio, "gauge", ("cache",)
+        )
+
+    def watch_runs(self, in_flight: Callable[[], float], queued: Callable[[], float]) -> None:
+        """Report in-flight and queued runs from callbacks."""
+        self.registry.callback("acp_runs_in_flight", "Runs currently executing", in_flight)
+        self.registry.callback("acp_runs_queued", "Runs waiting for an execution slot", queued)
+
+    def watch_caches(self, source: Callable[[], dict[str, dict[str, Any]]]) -> None:
+        """Report caches from a callback returning `{name: {"hits": ..., "misses": ...}}`."""
+        self._cache_sources.append(source)
+
+    def _caches(self) -> dict[str, dict[str, Any]]:
+        caches: dict[str, dict[str, Any]] = {}
+        for source in self._cache_sources:
+            caches.update(source())
+        return caches
+
+    def _cache_stat(self, key: str) -> dict[tuple[str, ...], float]:
+        return {(name,): stats[key] for name, stats in self._caches().items()}
+
+    def _cache_ratio(self) -> dict[tuple[str, ...], float]:
+        ratios = {}
+        for name, stats in self._caches().items():
+            lookups = stats["hits"] + stats["misses"]
+            ratios[(name,)] = stats["hits"] / lookups if lookups else 0.0
+        return ratios
+
+    def instrument(
+        self, route: str, handler: Callable[[Any], Awaitable[Any]]
+    ) -> Callable[[Any], Awaitable[Any]]:
+        """Wrap a Starlette handler to record request counts and latency.
+
+        Args:
+            route: Route name used as the `route` label
+            handler: The handler to wrap
+
+        """
+        duration = self.http_duration.labels(route)
+
+        async def instrumented(request: Any) -> Any:
+            self.loop_lag.ensure_started()
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            finally:
+                duration.observe(time.perf_counter() - start)
+                self.http_requests.labels(route, request.method, str(status)).inc()
+
+        instrumented.__name__ = getattr(handler, "__name__", route)
+        instrumented.__doc__ = handler.__doc__
+        return instrumented
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        return self.registry.render()
+
+    async def close(self) -> None:
+        """Stop the event loop lag monitor."""
+        await self.loop_lag.stop()
@@ -0,0 +1,95 @@
+"""Bounded request body reading for ACP serving."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+
+
+class RequestBodyTooLargeError(Exception):
+    """Raised when a request body exceeds the configured size limit."""
+
+    def __init__(self, limit: int, received: int) -> None:
+        self.limit = limit
+        self.received = received
+        super().__init__(f"Request body exceeds limit of {limit} bytes")
+
+
+class InvalidRequestBodyError(ValueError):
+    """Raised when a request's `Content-Length` or JSON body is malformed."""
+
+
+class BodyMemoryTracker:
+    """Track bytes held by request bodies that are currently being processed.
+
+    Handlers acquire the body size once it has been read and release it when
+    the run finishes, so `in_flight` reflects what all open requests pin.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+        self.total = 0
+
+    def acquire(self, size: int) -> None:
+        """Account for a body that is now held in memory."""
+        self.in_flight += size
+        self.total += size
+        self.peak = max(self.peak, self.in_flight)
+
+    def release(self, size: int) -> None:
+        """Account for a body that is no longer referenced."""
+        self.in_flight -= size
+
+
+body_memory = BodyMemoryTracker()
+
+
+async def read_json_body(request: Request, max_body_size: int) -> tuple[Any, int]:
+    """Read and decode a JSON request body without exceeding `max_body_size`.
+
+    Oversized requests are rejected up front from `Content-Length` when the
+    client sends it, otherwise as soon as the streamed body crosses the limit.
+    Chunks are appended into a single buffer that `json.loads` decodes in
+    place, so the body is never held twice as bytes and a joined copy.
+
+    Args:
+        request: The incoming Starlette request
+        max_body_size: Maximum accepted body size in bytes
+
+    Returns:
+        The decoded body and its size in bytes
+
+    Raises:
+        RequestBodyTooLargeError: If the body is larger than `max_body_size`
+        InvalidRequestBodyError: If `Content-Length` is malformed or the body
+            is not JSON
+
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            declared = -1
+        if declared < 0:
+            msg = f"Invalid Content-Length header: {content_length!r}"
+            raise InvalidRequestBodyError(msg)
+        if declared > max_body_size:
+            raise RequestBodyTooLargeError(max_body_size, declared)
+
+    buffer = bytearray()
+    async for chunk in request.stream():
+        if len(buffer) + len(chunk) > max_body_size:
+            raise RequestBodyTooLargeError(max_body_size, len(buffer) + len(chunk))
+        buffer += chunk
+
+    request.state.body_bytes = len(buffer)
+    try:
+        return json.loads(buffer), len(buffer)
+    except ValueError as e:
+        msg = f"Request body is not valid JSON: {e}"
+        raise InvalidRequestBodyError(msg) from e
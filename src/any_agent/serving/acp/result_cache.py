@@ -0,0 +1,159 @@
+"""Response cache for deterministic agent runs.
+
+Results of deterministic runs are reused while their entry is fresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different prompts share an entry."""
+    return " ".join(query.split())
+
+
+def make_cache_key(
+    query: str,
+    context: Any = None,
+    model_id: Optional[str] = None,
+    tools_fingerprint: str = "",
+) -> str:
+    """Cache key for a run of `query` with `context` on a given agent setup."""
+    payload = json.dumps(
+        [normalize_query(query), context, model_id, tools_fingerprint],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def tools_fingerprint(tools: list[dict[str, Any]]) -> str:
+    """Fingerprint of a tool catalog; changes whenever a tool is added or edited."""
+    payload = json.dumps(tools, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """LRU/TTL cache of run results, optionally backed by a SQLite file.
+
+    The in-memory LRU is always consulted first. With a `path`, entries
+    are also written to SQLite so they survive restarts and can be shared
+    by several server processes; disk access runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600.0,
+        path: Optional[str] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Entries kept in memory before the least recently
+                used one is evicted
+            ttl: Seconds an entry stays valid (`None` for no expiry)
+            path: Optional SQLite file backing the cache
+
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None:
+            with self._connect() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS results "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at)")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committing on success, closed on exit."""
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl if self.ttl is not None else float("inf")
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.path is not None:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under `key`."""
+        expires_at = self._expiry()
+        self._remember(key, expires_at, value)
+        if self.path is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, Any]]:
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT value, expires_at FROM results WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def stats(self) -> dict[str, Any]:
+        """Hit rate and size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
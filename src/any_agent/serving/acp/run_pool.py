@@ -0,0 +1,145 @@
+"""Bounded executor pool for blocking agent runs.
+
+Synchronous `agent.run` calls execute in worker threads or processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    """Run `fn` in a worker and report when it actually started."""
+    return time.time(), fn(*args)
+
+
+class SyncRunPool:
+    """Runs blocking agent calls off the event loop and tracks queueing.
+
+    `queue_depth` is the number of submitted calls waiting for a free
+    worker; `wait_time_*` measure how long calls waited before a worker
+    picked them up.
+    """
+
+    def __init__(self, kind: Literal["thread", "process"] = "thread", max_workers: int = 4) -> None:
+        """Initialize the pool.
+
+        Args:
+            kind: `"thread"` runs calls in threads of this process;
+                `"process"` runs them in worker processes, which requires
+                the agent and its results to be picklable
+            max_workers: Number of calls that can run at once
+
+        """
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Executor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.abandoned = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not yet picked up by a worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="acp-agent-run"
+                )
+        return self._executor
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """Run `fn(*args)` in the pool without blocking the event loop.
+
+        Args:
+            fn: The blocking callable
+            *args: Arguments for `fn`
+            on_done: Called on the event loop once `fn` is no longer
+                running, also when the caller was cancelled while `fn` kept
+                running in its worker
+
+        """
+        executor = self._get_executor()
+        submitted_at = time.time()
+        if self.kind == "thread":
+            # Keep context variables (e.g. run tracking) visible in the worker
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, _timed_call, fn, *args)
+        else:
+            future = executor.submit(_timed_call, fn, *args)
+        self.in_flight += 1
+        try:
+            started_at, result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                # Never started: the slot is free again right away
+                self.in_flight -= 1
+                if on_done is not None:
+                    on_done()
+            else:
+                # A running call cannot be interrupted; it keeps its slot
+                # until it returns
+                self.abandoned += 1
+                loop = asyncio.get_running_loop()
+                future.add_done_callback(lambda _: self._call_done(loop, on_done))
+            raise
+        except BaseException:
+            self.in_flight -= 1
+            if on_done is not None:
+                on_done()
+            raise
+        self.in_flight -= 1
+        if on_done is not None:
+            on_done()
+
+        wait = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self.wait_time_total += wait
+        self.wait_time_max = max(self.wait_time_max, wait)
+        return result
+
+    def _call_done(self, loop: asyncio.AbstractEventLoop, on_done: Optional[Callable[[], None]]) -> None:
+        # Called from the worker thread
+        def release() -> None:
+            self.in_flight -= 1
+            if on_done is not None:
+                on_done()
+
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(release)
+
+    def stats(self) -> dict[str, Any]:
+        """Current pool utilization and queueing metrics."""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+            "wait_time_avg": self.wait_time_total / self.completed if self.completed else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers; queued calls are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -6,41 +6,25 @@ Following patterns from any_agent.serving.a2a.server_a2a and any_agent.serving.m
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import json
+import os
+import socket
+import stat
 from typing import TYPE_CHECKING, Optional
 
 from any_agent.logging import logger
 from any_agent.serving.server_handle import ServerHandle
 
+from . import acp_models
 from .agent_executor import ACPAgentExecutor
 from .config_acp import ACPServingConfig
+from .rate_limit import RateLimiter
+from .request_body import InvalidRequestBodyError, RequestBodyTooLargeError, body_memory, read_json_body
 
 if TYPE_CHECKING:
     from any_agent.frameworks.any_agent import AnyAgent
 
-# Check if ACP is available
-acp_available = False
-try:
-    from agntcy_acp import (
-        Agent,
-        AgentMetadata,
-        RunCreateStateless,
-        RunStateless,
-        RunStatus,
-    )
-    acp_available = True
-except ImportError:
-    # Provide fallback classes when ACP not available
-    class RunStatus:
-        completed = "completed"
-        failed = "failed"
-    
-    class Agent:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-        def model_dump(self):
-            return self.__dict__
-
 
 async def serve_acp_async(
     agent: AnyAgent,
@@ -70,7 +54,7 @@ async def serve_acp_async(
         >>> server_handle = await serve_acp_async(agent, config)
 
     """
-    if not acp_available and serving_config is None:
+    if not acp_models.acp_available and serving_config is None:
         msg = "You need to `pip install 'agntcy-acp'` to use ACP serving"
         raise ImportError(msg)
     
@@ -85,7 +69,10 @@ async def serve_acp_async(
     server_handle = await _start_uvicorn_server(app, serving_config)
     
     # Log startup information
-    bridge_url = f"http://{serving_config.host}:{serving_config.port}{serving_config.endpoint}"
+    if serving_config.uds_only:
+        bridge_url = f"http://localhost{serving_config.endpoint}"
+    else:
+        bridge_url = f"http://{serving_config.host}:{serving_config.port}{serving_config.endpoint}"
     
     if serving_config.identity_id:
         logger.info(
@@ -94,6 +81,9 @@ async def serve_acp_async(
     else:
         logger.info(f"ACP server started at {bridge_url}")
     
+    if serving_config.uds:
+        logger.info(f"ACP server listening on unix socket {serving_config.uds}")
+    
     logger.info(f"ACP manifest available at: {bridge_url}/agents")
     
     return server_handle
@@ -116,7 +106,7 @@ async def _get_acp_app_async(
     try:
         from starlette.applications import Starlette
         from starlette.routing import Route
-        from starlette.responses import JSONResponse
+        from starlette.responses import JSONResponse, Response, StreamingResponse
     except ImportError as e:
         msg = "You need to `pip install 'starlette uvicorn'` to run ACP server"
         raise ImportError(msg) from e
@@ -125,6 +115,22 @@ async def _get_acp_app_async(
     executor = ACPAgentExecutor(agent, serving_config)
     await executor.initialize()
     
+    rate_limiter = RateLimiter(serving_config.rate_limit) if serving_config.rate_limit else None
+    
+    def rate_limited(request):
+        """Take a rate-limit token; returns `(decision, 429 response or None)`."""
+        limit = rate_limiter.check(request.headers) if rate_limiter else None
+        if limit is None or limit.allowed:
+            return limit, None
+        message = f"Rate limit exceeded, retry in {limit.headers()['Retry-After']}s"
+        logger.warning(message)
+        return limit, JSONResponse({
+            "id": "error",
+            "status": "failed",
+            "error": {"type": "RateLimited", "message": message},
+            "output": {"error": message, "success": False}
+        }, status_code=429, headers=limit.headers())
+    
     # Define route handlers
     async def get_agents(request):
         """List available agents."""
@@ -148,13 +154,42 @@ async def _get_acp_app_async(
     
     async def create_stateless_run(request):
         """Create a stateless run."""
+        limit, rejection = rate_limited(request)
+        if rejection is not None:
+            return rejection
+        
+        body_size = 0
         try:
-            body = await request.json()
-            result = await executor.execute_stateless_run(body)
+            body, body_size = await read_json_body(request, serving_config.max_request_body_size)
+            body_memory.acquire(body_size)
+            run = _execute_scheduled(executor, request, body)
+            if serving_config.cancel_on_disconnect:
+                result = await _run_until_disconnect(request, run)
+                if result is None:
+                    logger.info("Client disconnected, run cancelled")
+                    return Response(status_code=499)
+            else:
+                result = await run
             
             result_dict = result.model_dump() if hasattr(result, 'model_dump') else result
-            return JSONResponse(result_dict)
+            return JSONResponse(result_dict, headers=limit.headers() if limit else None)
             
+        except RequestBodyTooLargeError as e:
+            logger.warning(f"Rejected run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "RequestTooLarge", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=413)
+        except InvalidRequestBodyError as e:
+            logger.warning(f"Rejected run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "InvalidRequest", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=400)
         except Exception as e:
             logger.error(f"Error in create_stateless_run: {e}")
             return JSONResponse({
@@ -163,6 +198,66 @@ async def _get_acp_app_async(
                 "error": {"type": "RequestError", "message": str(e)},
                 "output": {"error": str(e), "success": False}
             }, status_code=500)
+        finally:
+            body_memory.release(body_size)
+    
+    async def stream_stateless_run(request):
+        """Create a stateless run and stream its output as server-sent events."""
+        limit, rejection = rate_limited(request)
+        if rejection is not None:
+            return rejection
+        
+        try:
+            body, body_size = await read_json_body(request, serving_config.max_request_body_size)
+        except RequestBodyTooLargeError as e:
+            logger.warning(f"Rejected streaming run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "RequestTooLarge", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=413)
+        except InvalidRequestBodyError as e:
+            logger.warning(f"Rejected streaming run request: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "InvalidRequest", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=400)
+        except Exception as e:
+            logger.error(f"Error in stream_stateless_run: {e}")
+            return JSONResponse({
+                "id": "error",
+                "status": "failed",
+                "error": {"type": "RequestError", "message": str(e)},
+                "output": {"error": str(e), "success": False}
+            }, status_code=500)
+        
+        async def event_stream():
+            # Each event is sent before the next one is produced, so the
+            # client's read rate paces the agent
+            body_memory.acquire(body_size)
+            try:
+                async with contextlib.AsyncExitStack() as stack:
+                    if executor.scheduler is not None:
+                        lane, caller = executor.scheduler.classify(request.headers, body)
+                        await stack.enter_async_context(executor.scheduler.slot(lane, caller))
+                    async for event in executor.stream_stateless_run(body):
+                        data = json.dumps(event["data"], default=str)
+                        yield f"event: {event['event']}\ndata: {data}\n\n"
+            finally:
+                body_memory.release(body_size)
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                **(limit.headers() if limit else {}),
+            },
+        )
     
     async def get_stateless_run(request):
         """Get stateless run status - not supported in stateless mode."""
@@ -171,17 +266,75 @@ async def _get_acp_app_async(
             status_code=501
         )
     
+    async def metrics(request):
+        """Prometheus metrics."""
+        return Response(executor.metrics.render(), media_type="text/plain; version=0.0.4")
+    
+    def instrument(handler):
+        return executor.metrics.instrument(handler.__name__, handler)
+    
     # Create routes
     base_path = serving_config.endpoint.rstrip("/")
     routes = [
-        Route(f"{base_path}/agents/search", search_agents, methods=["POST"]),
-        Route(f"{base_path}/agents", get_agents, methods=["GET"]),
-        Route(f"{base_path}/agents/{{agent_id}}", get_agent_by_id, methods=["GET"]),
-        Route(f"{base_path}/runs/stateless", create_stateless_run, methods=["POST"]),
-        Route(f"{base_path}/runs/stateless/{{run_id}}", get_stateless_run, methods=["GET"]),
+        Route(f"{base_path}/agents/search", instrument(search_agents), methods=["POST"]),
+        Route(f"{base_path}/agents", instrument(get_agents), methods=["GET"]),
+        Route(f"{base_path}/agents/{{agent_id}}", instrument(get_agent_by_id), methods=["GET"]),
+        Route(f"{base_path}/runs/stateless", instrument(create_stateless_run), methods=["POST"]),
+        Route(f"{base_path}/runs/stateless/{{run_id}}", instrument(get_stateless_run), methods=["GET"]),
     ]
+    if serving_config.stream_agent_responses:
+        # Latency covers the time to the response headers, not the stream
+        routes.append(
+            Route(f"{base_path}/runs/stateless/stream", instrument(stream_stateless_run), methods=["POST"])
+        )
+    if serving_config.metrics_path:
+        routes.append(Route(serving_config.metrics_path, metrics, methods=["GET"]))
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await executor.cleanup()
     
-    return Starlette(routes=routes)
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+async def _execute_scheduled(executor: ACPAgentExecutor, request, body):
+    """Execute a run once the scheduler, if any, grants it a slot."""
+    if executor.scheduler is None:
+        return await executor.execute_stateless_run(body)
+    lane, caller = executor.scheduler.classify(request.headers, body)
+    async with executor.scheduler.slot(lane, caller):
+        return await executor.execute_stateless_run(body)
+
+
+async def _run_until_disconnect(request, coro):
+    """Run `coro` unless the client disconnects first.
+
+    Returns the coroutine's result, or None after cancelling it because
+    the client went away.
+    """
+    run = asyncio.ensure_future(coro)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({run, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not run.done():
+            run.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await run
+    if run.cancelled():
+        return None
+    return run.result()
+
+
+async def _wait_for_disconnect(request) -> None:
+    # Only called once the body has been read, so the next message is
+    # the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
 
 
 async def _start_uvicorn_server(app, serving_config: ACPServingConfig) -> ServerHandle:
@@ -201,11 +354,63 @@ async def _start_uvicorn_server(app, serving_config: ACPServingConfig) -> Server
     )
     server = uvicorn.Server(config)
     
-    # Start server in background
-    task = asyncio.create_task(server.serve())
+    # Start server in background, on explicit sockets when a Unix socket is configured
+    if serving_config.uds:
+        task = asyncio.create_task(
+            _serve_on_sockets(server, _bind_sockets(serving_config), serving_config.uds)
+        )
+    else:
+        task = asyncio.create_task(server.serve())
     
     # Wait for server to start
     while not server.started:
         await asyncio.sleep(0.1)
     
-    return ServerHandle(task=task, server=server)
\ No newline at end of file
+    return ServerHandle(task=task, server=server)
+
+
+async def _serve_on_sockets(server, sockets: list[socket.socket], uds: str) -> None:
+    """Serve on bound sockets, removing the Unix socket file once serving stops."""
+    try:
+        await server.serve(sockets=sockets)
+    finally:
+        if os.path.exists(uds):
+            os.unlink(uds)
+
+
+def _bind_sockets(serving_config: ACPServingConfig) -> list[socket.socket]:
+    """Bind the Unix domain socket and, unless `uds_only`, the TCP socket."""
+    path = serving_config.uds
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            msg = f"Refusing to replace non-socket file at {path}"
+            raise OSError(msg)
+        os.unlink(path)
+    
+    uds_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The socket is created with `uds_mode` rather than chmod-ed after
+    # bind, so it is never reachable with the umask's permissions
+    umask = os.umask(0o777 & ~serving_config.uds_mode)
+    try:
+        uds_sock.bind(path)
+    except OSError:
+        uds_sock.close()
+        raise
+    finally:
+        os.umask(umask)
+    sockets = [uds_sock]
+    
+    if not serving_config.uds_only:
+        family = socket.AF_INET6 if ":" in serving_config.host else socket.AF_INET
+        tcp_sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            tcp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            tcp_sock.bind((serving_config.host, serving_config.port))
+        except OSError:
+            tcp_sock.close()
+            uds_sock.close()
+            os.unlink(path)
+            raise
+        sockets.append(tcp_sock)
+    
+    return sockets
@@ -0,0 +1,217 @@
+"""Per-run tool usage tracking for ACP serving.
+
+Following patterns from any_agent.callbacks
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from any_agent.callbacks import Callback as _CallbackBase
+except ImportError:
+    _CallbackBase = object
+
+_current_tracker: ContextVar[Optional[ToolUsageTracker]] = ContextVar(
+    "acp_tool_usage_tracker", default=None
+)
+
+
+class ToolUsageTracker:
+    """Collects tool start/end events and per-tool timings for one run.
+
+    Only tool names and timings are recorded, never arguments or outputs.
+    At most `max_events` events are kept for the run and for the pending
+    stream; older ones are dropped and counted in `dropped_events`.
+    """
+
+    def __init__(self, max_events: int = 256) -> None:
+        """Initialize the tracker.
+
+        Args:
+            max_events: Maximum number of events kept per run
+
+        """
+        self.started_at = time.perf_counter()
+        self.events: deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.dropped_events = 0
+        self.tools: Dict[str, Dict[str, float]] = {}
+        self._pending: deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._open: Dict[Any, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.changed = asyncio.Event()
+
+    def bind(self) -> Token:
+        """Make this tracker the active one for the current run context."""
+        self._loop = asyncio.get_running_loop()
+        return _current_tracker.set(self)
+
+    @staticmethod
+    def unbind(token: Token) -> None:
+        """Restore the tracker that was active before `bind`."""
+        _current_tracker.reset(token)
+
+    def tool_started(self, name: str, key: Any = None) -> None:
+        """Record the start of a tool call."""
+        now = time.perf_counter()
+        with self._lock:
+            self._open[key if key is not None else name] = (name, now)
+        self._add({"event": "tool_start", "tool": name, "at": round(now - self.started_at, 6)})
+
+    def tool_finished(self, name: str, key: Any = None, error: bool = False) -> None:
+        """Record the end of a tool call started with `tool_started`."""
+        now = time.perf_counter()
+        with self._lock:
+            _, started = self._open.pop(key if key is not None else name, (name, now))
+            duration = now - started
+            stats = self.tools.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0})
+            stats["calls"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+        event = {
+            "event": "tool_end",
+            "tool": name,
+            "at": round(now - self.started_at, 6),
+            "duration": round(duration, 6),
+        }
+        if error:
+            event["error"] = True
+        self._add(event)
+
+    def _add(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self.events) == self.events.maxlen:
+                self.dropped_events += 1
+            self.events.append(event)
+            self._pending.append(event)
+        self._notify()
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.changed.set()
+        else:
+            # Tool called from a worker thread of the sync run pool
+            loop.call_soon_threadsafe(self.changed.set)
+
+    def drain(self) -> list[Dict[str, Any]]:
+        """Return and forget the events not yet streamed."""
+        with self._lock:
+            events = list(self._pending)
+            self._pending.clear()
+        self.changed.clear()
+        return events
+
+    def timing(self) -> Dict[str, Any]:
+        """Timing metadata for the run output."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": int(stats["calls"]),
+                    "total": round(stats["total"], 6),
+                    "max": round(stats["max"], 6),
+                }
+                for name, stats in self.tools.items()
+            }
+            return {
+                "total": round(time.perf_counter() - self.started_at, 6),
+                "tools": tools,
+                "events": list(self.events),
+                "dropped_events": self.dropped_events,
+            }
+
+
+def current_tracker() -> Optional[ToolUsageTracker]:
+    """Return the tracker of the run executing in this context, if any."""
+    return _current_tracker.get()
+
+
+class ToolUsageCallback(_CallbackBase):
+    """any-agent callback feeding tool executions into the active tracker.
+
+    Installed once on the agent's `callbacks`; it does nothing for runs
+    without a tracker, so the cost of a disabled run is one context
+    variable lookup per tool call.
+    """
+
+    def before_tool_execution(self, context: Any, *args: Any, **kwargs: Any) -> Any:
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.tool_started(_tool_name(context, kwargs), _call_key(context))
+        return context
+
+    def after_tool_execution(self, context: Any, *args: Any, **kwargs: Any) -> Any:
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.tool_finished(_tool_name(context, kwargs), _call_key(context))
+        return context
+
+
+def _tool_name(context: Any, kwargs: Dict[str, Any]) -> str:
+    span = getattr(context, "current_span", None)
+    attributes = getattr(span, "attributes", None) or {}
+    name = attributes.get("gen_ai.tool.name") or kwargs.get("name")
+    return str(name) if name else "unknown"
+
+
+def _call_key(context: Any) -> Any:
+    # Pair start and end of the same call even when tools run in parallel
+    span = getattr(context, "current_span", None)
+    return id(span) if span is not None else None
+
+
+def track_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Record calls of a tool function in the active run's tracker.
+
+    For agents whose framework does not run any-agent callbacks; wrap the
+    tools before creating the agent.
+    """
+    name = getattr(func, "__name__", str(func))
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracker = _current_tracker.get()
+            if tracker is None:
+                return await func(*args, **kwargs)
+            key = object()
+            tracker.tool_started(name, key)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                tracker.tool_finished(name, key, error=True)
+                raise
+            tracker.tool_finished(name, key)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        tracker = _current_tracker.get()
+        if tracker is None:
+            return func(*args, **kwargs)
+        key = object()
+        tracker.tool_started(name, key)
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            tracker.tool_finished(name, key, error=True)
+            raise
+        tracker.tool_finished(name, key)
+        return result
+
+    return wrapper
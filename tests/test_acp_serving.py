@@ -25,6 +25,9 @@ class TestACPServingConfig:
         assert config.organization == "any-agent"
         assert config.stream_agent_responses is True
         assert config.stream_tool_usage is False
+        assert config.max_request_body_size == 10 * 1024 * 1024
+        assert config.sync_run_executor == "thread"
+        assert config.sync_run_workers == 4
     
     def test_custom_config(self):
         """Test custom configuration."""
@@ -77,4 +80,619 @@ async def test_serve_acp_async_import_error():
     finally:
         # Restore modules
         for module, orig in original_modules.items():
-            sys.modules[module] = orig
\ No newline at end of file
+            sys.modules[module] = orig
+
+def make_mock_agent(run):
+    """Mock any-agent instance with the given run callable."""
+    mock_agent = MagicMock()
+    mock_agent.agent_config = MagicMock(description="Test agent", model_id="test-model")
+    mock_agent.agent_framework = "tinyagent"
+    mock_agent.get_tools = MagicMock(return_value=[])
+    mock_agent.run = run
+    del mock_agent.run_stream
+    return mock_agent
+
+
+@pytest.mark.asyncio
+async def test_sync_agent_runs_off_event_loop():
+    """Test that blocking agent runs execute concurrently in the run pool."""
+    import asyncio
+    import time
+
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+
+    def blocking_run(query):
+        time.sleep(0.2)
+        return f"answer to {query}"
+
+    executor = ACPAgentExecutor(make_mock_agent(blocking_run), ACPServingConfig(sync_run_workers=2))
+    await executor.initialize()
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        executor.execute_stateless_run({"input": {"query": "a"}}),
+        executor.execute_stateless_run({"input": {"query": "b"}}),
+    )
+    assert time.monotonic() - start < 0.35
+    assert [r.output["result"] for r in results] == ["answer to a", "answer to b"]
+
+    stats = executor.get_run_pool_stats()
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_stream_stateless_run_forwards_tokens_and_steps():
+    """Test that the SSE run endpoint streams tokens, steps and the final result."""
+    import json
+
+    import httpx
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    async def run_stream(query):
+        yield "Hel"
+        yield {"tool": "search", "args": {"q": query}}
+        yield "lo"
+
+    mock_agent = make_mock_agent(MagicMock(return_value="unused"))
+    mock_agent.run_stream = run_stream
+    app = await _get_acp_app_async(mock_agent, ACPServingConfig())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/acp/runs/stateless/stream", json={"input": {"query": "hi"}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["run", "token", "step", "token", "result"]
+    assert events[2][1] == {"tool": "search", "args": {"q": "hi"}}
+    assert events[-1][1]["status"] == "completed"
+    assert events[-1][1]["output"]["result"] == "Hello"
+    assert events[-1][1]["id"] == events[0][1]["id"]
+
+
+@pytest.mark.asyncio
+async def test_stream_route_disabled_without_stream_agent_responses():
+    """Test that the SSE run endpoint is only served when streaming is enabled."""
+    import httpx
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    app = await _get_acp_app_async(
+        make_mock_agent(MagicMock(return_value="ok")), ACPServingConfig(stream_agent_responses=False)
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/acp/runs/stateless/stream", json={"input": {"query": "hi"}})
+    assert response.status_code in (404, 405)
+
+
+@pytest.mark.asyncio
+async def test_stream_tool_usage_reports_tool_timings():
+    """Test that tool executions appear as events and in the run timing."""
+    import time
+
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+    from src.any_agent.serving.acp.tool_usage import track_tool
+
+    @track_tool
+    def search(query):
+        time.sleep(0.01)
+        return "found"
+
+    def run(query):
+        search(query)
+        search(query)
+        return "done"
+
+    executor = ACPAgentExecutor(make_mock_agent(run), ACPServingConfig(stream_tool_usage=True))
+    await executor.initialize()
+
+    result = await executor.execute_stateless_run({"input": {"query": "hi"}})
+    timing = result.output["timing"]
+    assert timing["tools"]["search"]["calls"] == 2
+    assert timing["tools"]["search"]["total"] >= 0.02
+    assert [e["event"] for e in timing["events"]] == ["tool_start", "tool_end"] * 2
+
+    events = [event async for event in executor.stream_stateless_run({"input": {"query": "hi"}})]
+    assert [e["event"] for e in events] == ["run", "tool_start", "tool_end", "tool_start", "tool_end", "result"]
+    assert events[2]["data"]["duration"] >= 0.01
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_tool_usage_disabled_by_default():
+    """Test that runs carry no timing metadata unless stream_tool_usage is on."""
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+
+    executor = ACPAgentExecutor(make_mock_agent(MagicMock(return_value="done")), ACPServingConfig())
+    await executor.initialize()
+    result = await executor.execute_stateless_run({"input": {"query": "hi"}})
+    assert "timing" not in result.output
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_agent_replica_pool_runs_queries_on_separate_replicas():
+    """Test that concurrent runs each get their own replica, up to the limit."""
+    import asyncio
+
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+
+    def make_stateful_agent():
+        state = {"busy": False}
+
+        async def run(query):
+            assert not state["busy"], "replica used by two runs at once"
+            state["busy"] = True
+            await asyncio.sleep(0.05)
+            state["busy"] = False
+            return query
+
+        return make_mock_agent(run)
+
+    created = []
+
+    async def factory():
+        created.append(make_stateful_agent())
+        return created[-1]
+
+    config = ACPServingConfig(max_agent_replicas=3, min_agent_replicas=1)
+    executor = ACPAgentExecutor(make_stateful_agent(), config, agent_factory=factory)
+    await executor.initialize()
+
+    results = await asyncio.gather(
+        *(executor.execute_stateless_run({"input": {"query": f"q{i}"}}) for i in range(6))
+    )
+    assert [r.output["result"] for r in results] == [f"q{i}" for i in range(6)]
+    assert len(created) == 2
+
+    stats = executor.get_agent_pool_stats()
+    assert stats["size"] == 3
+    assert stats["busy"] == 0
+    assert stats["idle"] == 3
+    assert stats["checkouts"] == 6
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_agent_replica_pool_retires_idle_replicas():
+    """Test that replicas above the minimum are retired after the idle timeout."""
+    import asyncio
+
+    from src.any_agent.serving.acp.agent_pool import AgentReplicaPool
+
+    async def factory():
+        return make_mock_agent(MagicMock(return_value="ok"))
+
+    pool = AgentReplicaPool(make_mock_agent(MagicMock()), factory, max_replicas=2, idle_timeout=0.01)
+    async with pool.checkout(), pool.checkout():
+        assert pool.stats()["utilization"] == 1.0
+    assert pool.size == 2
+
+    await asyncio.sleep(0.02)
+    async with pool.checkout():
+        pass
+    assert pool.size == 1
+    assert pool.retired == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_replica_pool_retires_idle_replicas_without_traffic():
+    """Test that idle replicas are retired even when no further run checks one in."""
+    import asyncio
+
+    from src.any_agent.serving.acp.agent_pool import AgentReplicaPool
+
+    replicas = []
+
+    async def factory():
+        replicas.append(make_mock_agent(MagicMock(return_value="ok")))
+        replicas[-1].cleanup_async = AsyncMock()
+        return replicas[-1]
+
+    pool = AgentReplicaPool(make_mock_agent(MagicMock()), factory, max_replicas=3, idle_timeout=0.05)
+    pool.ensure_started()
+    async with pool.checkout(), pool.checkout(), pool.checkout():
+        pass
+    assert pool.size == 3
+
+    await asyncio.sleep(0.2)
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["retired"] == 2
+    assert all(replica.cleanup_async.await_count == 1 for replica in replicas)
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_replica_pool_cleans_up_cancelled_replicas():
+    """Test that a replica dropped by a cancelled run is cleaned up once its worker returns."""
+    import asyncio
+    import threading
+
+    from src.any_agent.serving.acp.agent_pool import AgentReplicaPool
+    from src.any_agent.serving.acp.run_pool import SyncRunPool
+
+    finish = threading.Event()
+    replicas = []
+
+    async def factory():
+        replica = make_mock_agent(MagicMock(side_effect=lambda query: finish.wait(5)))
+        replica.cleanup_async = AsyncMock()
+        replicas.append(replica)
+        return replica
+
+    pool = AgentReplicaPool(make_mock_agent(MagicMock()), factory, max_replicas=2)
+    run_pool = SyncRunPool(max_workers=1)
+    started = asyncio.Event()
+
+    async def run():
+        # The second checkout creates a replica; the first is the served agent
+        async with pool.checkout(), pool.checkout() as replica:
+            started.set()
+            await run_pool.run(replica.run, "query", on_done=pool.hold(replica))
+
+    task = asyncio.create_task(run())
+    await started.wait()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.05)
+    replicas[0].cleanup_async.assert_not_awaited()
+
+    finish.set()
+    for _ in range(100):
+        if replicas[0].cleanup_async.await_count:
+            break
+        await asyncio.sleep(0.01)
+    replicas[0].cleanup_async.assert_awaited_once()
+    assert pool.size == 0
+
+    # Replicas still discarded at shutdown are cleaned up by close()
+    started.clear()
+    task = asyncio.create_task(run())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await pool.close()
+    assert len(replicas) > 1
+    assert all(replica.cleanup_async.await_count == 1 for replica in replicas)
+    run_pool.shutdown()
+
+
+def test_agent_replica_bounds_validation():
+    """Test that the replica minimum cannot exceed the maximum."""
+    with pytest.raises(ValueError):
+        ACPServingConfig(max_agent_replicas=1, min_agent_replicas=2)
+
+
+@pytest.mark.asyncio
+async def test_result_cache_serves_repeated_queries(tmp_path):
+    """Test that identical normalized inputs hit the cache and others miss."""
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+
+    run = MagicMock(side_effect=lambda query: f"answer {query}")
+    config = ACPServingConfig(result_cache=True, result_cache_path=str(tmp_path / "cache.db"))
+    executor = ACPAgentExecutor(make_mock_agent(run), config)
+    await executor.initialize()
+
+    first = await executor.execute_stateless_run({"input": {"query": "what  is 2+2?"}})
+    second = await executor.execute_stateless_run({"input": {"query": " what is 2+2? "}})
+    other = await executor.execute_stateless_run({"input": {"query": "what is 2+2?", "context": {"user": "a"}}})
+
+    assert run.call_count == 2
+    assert second.output["cached"] is True
+    assert second.output["result"] == first.output["result"]
+    assert "cached" not in other.output
+    stats = executor.get_result_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    await executor.cleanup()
+
+    # A new executor on the same file starts warm
+    run.reset_mock()
+    executor = ACPAgentExecutor(make_mock_agent(run), config)
+    await executor.initialize()
+    result = await executor.execute_stateless_run({"input": {"query": "what is 2+2?"}})
+    assert result.output["cached"] is True
+    assert run.call_count == 0
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_result_cache_lru_and_ttl():
+    """Test LRU eviction and expiry of in-memory cache entries."""
+    import asyncio
+
+    from src.any_agent.serving.acp.result_cache import ResultCache
+
+    cache = ResultCache(max_entries=2, ttl=0.05)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")
+    assert await cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    await asyncio.sleep(0.06)
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_malformed_run_body_rejected_as_client_error():
+    """Test that a bad Content-Length or a non-JSON body gets 400, not 500."""
+    import httpx
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    app = await _get_acp_app_async(make_mock_agent(MagicMock(return_value="ok")), ACPServingConfig())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for path in ("/acp/runs/stateless", "/acp/runs/stateless/stream"):
+            response = await client.post(path, content=b"{}", headers={"Content-Length": "-1"})
+            assert response.status_code == 400
+            assert response.json()["error"]["type"] == "InvalidRequest"
+
+            response = await client.post(path, content=b"not json")
+            assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_run_server_failure_is_server_error(monkeypatch):
+    """Test that an unexpected failure reading the run request gets 500 on both endpoints."""
+    import httpx
+
+    from src.any_agent.serving.acp import server_acp
+
+    async def failing_read(request, limit):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server_acp, "read_json_body", failing_read)
+    app = await server_acp._get_acp_app_async(make_mock_agent(MagicMock(return_value="ok")), ACPServingConfig())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for path in ("/acp/runs/stateless", "/acp/runs/stateless/stream"):
+            response = await client.post(path, json={"input": {"query": "hi"}})
+            assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_permissions_and_cleanup(tmp_path):
+    """Test that the Unix socket is owner-only and removed when the server stops."""
+    import os
+    import socket
+    import stat
+
+    import httpx
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async, _start_uvicorn_server
+
+    socket_path = str(tmp_path / "acp.sock")
+    serving_config = ACPServingConfig(uds=socket_path, uds_only=True)
+    app = await _get_acp_app_async(make_mock_agent(MagicMock(return_value="ok")), serving_config)
+    server_handle = await _start_uvicorn_server(app, serving_config)
+    try:
+        transport = httpx.AsyncHTTPTransport(uds=socket_path)
+        async with httpx.AsyncClient(transport=transport, base_url="http://acp") as client:
+            response = await client.get("/acp/agents")
+            assert response.status_code == 200
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    finally:
+        await server_handle.shutdown()
+    assert not os.path.exists(socket_path)
+
+    # A TCP port that cannot be bound leaves no socket file behind
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        serving_config = ACPServingConfig(uds=socket_path, host="127.0.0.1", port=taken.getsockname()[1])
+        with pytest.raises(OSError):
+            await _start_uvicorn_server(app, serving_config)
+    assert not os.path.exists(socket_path)
+
+
+async def call_and_disconnect(app, path, body, disconnect_after):
+    """Drive an ASGI request whose client disconnects after `disconnect_after` seconds."""
+    import asyncio
+    import json
+
+    payload = json.dumps(body).encode()
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_run_cancelled_when_client_disconnects():
+    """Test that an async agent run is cancelled once its caller goes away."""
+    import asyncio
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    cancelled = asyncio.Event()
+
+    async def run(query):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "too late"
+
+    app = await _get_acp_app_async(make_mock_agent(run), ACPServingConfig())
+    sent = await asyncio.wait_for(
+        call_and_disconnect(app, "/acp/runs/stateless", {"input": {"query": "hi"}}, 0.05), 2
+    )
+    assert cancelled.is_set()
+    assert sent[0]["status"] == 499
+
+
+@pytest.mark.asyncio
+async def test_cancelled_sync_run_stops_at_next_step():
+    """Test that a cancelled blocking run sees the cancellation flag and frees its slot."""
+    import asyncio
+    import time
+
+    from src.any_agent.serving.acp.agent_executor import ACPAgentExecutor
+    from src.any_agent.serving.acp.cancellation import RunCancelledError, raise_if_cancelled
+
+    steps = []
+
+    def run(query):
+        for _ in range(50):
+            time.sleep(0.01)
+            try:
+                raise_if_cancelled()
+            except RunCancelledError:
+                steps.append("cancelled")
+                raise
+        return "done"
+
+    executor = ACPAgentExecutor(make_mock_agent(run), ACPServingConfig(sync_run_workers=1))
+    await executor.initialize()
+    task = asyncio.ensure_future(executor.execute_stateless_run({"input": {"query": "hi"}}))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await asyncio.sleep(0.1)
+    assert steps == ["cancelled"]
+    assert executor.cancelled_runs == 1
+    stats = executor.get_run_pool_stats()
+    assert stats["abandoned"] == 1
+    assert stats["in_flight"] == 0
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_interactive_lane_first():
+    """Test that queued interactive runs overtake queued batch runs."""
+    import asyncio
+
+    import httpx
+
+    from src.any_agent.serving.acp.scheduler import SchedulerConfig
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    order = []
+
+    async def run(query):
+        order.append(query)
+        await asyncio.sleep(0.02)
+        return query
+
+    config = ACPServingConfig(scheduler=SchedulerConfig(max_concurrency=1))
+    app = await _get_acp_app_async(make_mock_agent(run), config)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def post(query, lane):
+            headers = {"X-ACP-Priority": lane, "X-AGNTCY-Identity": f"did:{lane}"}
+            return await client.post("/acp/runs/stateless", json={"input": {"query": query}}, headers=headers)
+
+        first = asyncio.ensure_future(post("batch-0", "batch"))
+        await asyncio.sleep(0.005)
+        rest = [asyncio.ensure_future(post(f"batch-{i}", "batch")) for i in (1, 2)]
+        await asyncio.sleep(0.005)
+        rest.append(asyncio.ensure_future(post("chat", "interactive")))
+        responses = await asyncio.gather(first, *rest)
+        metrics = await client.get("/metrics")
+
+    assert all(r.status_code == 200 for r in responses)
+    assert order == ["batch-0", "chat", "batch-1", "batch-2"]
+    assert 'acp_scheduler_wait_seconds_count{lane="batch"} 3' in metrics.text
+    assert 'acp_scheduler_wait_seconds_count{lane="interactive"} 1' in metrics.text
+
+    with pytest.raises(ValueError):
+        SchedulerConfig(caller_weights={"did:batch": 0})
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_organization():
+    """Test that an organization's identities share the organization bucket."""
+    import httpx
+
+    from src.any_agent.serving.acp.rate_limit import RateLimitConfig
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    config = ACPServingConfig(
+        rate_limit=RateLimitConfig(identity_rate=None, organization_rate=0.5, organization_burst=2)
+    )
+    app = await _get_acp_app_async(make_mock_agent(MagicMock(return_value="ok")), config)
+    transport = httpx.ASGITransport(app=app)
+    run = {"input": {"query": "hi"}}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = []
+        for identity in ("did:a", "did:b", "did:c"):
+            headers = {"X-AGNTCY-Identity": identity, "X-AGNTCY-Organization": "acme"}
+            response = await client.post("/acp/runs/stateless", json=run, headers=headers)
+            statuses.append(response.status_code)
+        assert statuses == [200, 200, 429]
+        assert response.headers["Retry-After"] == "2"
+        assert response.headers["RateLimit-Remaining"] == "0"
+
+        other = await client.post(
+            "/acp/runs/stateless", json=run, headers={"X-AGNTCY-Organization": "globex"}
+        )
+        assert other.status_code == 200
+        assert other.headers["RateLimit-Remaining"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """Test that request, run and cache series show up at /metrics."""
+    import httpx
+
+    from src.any_agent.serving.acp.server_acp import _get_acp_app_async
+
+    config = ACPServingConfig(result_cache=True)
+    app = await _get_acp_app_async(make_mock_agent(MagicMock(return_value="ok")), config)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(2):
+            await client.post("/acp/runs/stateless", json={"input": {"query": "hi"}})
+        await client.get("/acp/agents/unknown")
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'acp_http_requests_total{route="create_stateless_run",method="POST",status="200"} 2' in body
+    assert 'acp_http_requests_total{route="get_agent_by_id",method="GET",status="404"} 1' in body
+    assert 'acp_agent_run_duration_seconds_count{status="completed"} 1' in body
+    assert 'acp_agent_run_duration_seconds_count{status="cached"} 1' in body
+    assert 'acp_cache_hit_ratio{cache="result"} 0.5' in body
+    assert "acp_runs_in_flight 0" in body
+    assert "acp_runs_queued 0" in body
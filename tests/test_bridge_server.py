@@ -0,0 +1,408 @@
+"""Tests for the standalone MCP-ACP bridge server."""
+
+import os
+import stat
+import sys
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from bridge.bridge_executor import MCPToACPBridgeExecutor, SimpleMCPClient
+from bridge.config_acp import MCPToACPBridgeConfig
+from bridge.http_client import create_uds_client
+from bridge.request_body import body_memory
+from bridge.server_acp import _create_route_handlers, _create_starlette_app, serve_mcp_as_acp_async
+
+
+def make_bridge_config(**kwargs) -> MCPToACPBridgeConfig:
+    """Bridge config whose MCP process is an idle Python interpreter."""
+    return MCPToACPBridgeConfig(
+        mcp_command=sys.executable,
+        mcp_args=["-c", "import time; time.sleep(60)"],
+        server_name="test-server",
+        **kwargs,
+    )
+
+
+@pytest_asyncio.fixture
+async def bridge_client(request):
+    """HTTP client wired to an in-process bridge app."""
+    overrides = getattr(request, "param", {})
+    bridge_config = make_bridge_config(**overrides)
+    executor = MCPToACPBridgeExecutor(SimpleMCPClient(bridge_config), bridge_config)
+    await executor.initialize()
+
+    app = _create_starlette_app(bridge_config, _create_route_handlers(executor, bridge_config))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bridge/mcp-bridge") as client:
+        yield client
+
+    await executor.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_stateless_run_echo(bridge_client):
+    """Test a tool call through the run endpoint."""
+    response = await bridge_client.post(
+        "/runs/stateless",
+        json={"config": {"tool": "echo", "args": {"message": "hi"}}},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["status"] == "completed"
+    assert result["output"]["result"] == "hi"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bridge_client", [{"max_request_body_size": 64}], indirect=True)
+async def test_oversized_body_rejected_from_content_length(bridge_client):
+    """Test that a declared oversized body is rejected with 413."""
+    response = await bridge_client.post(
+        "/runs/stateless",
+        json={"config": {"tool": "echo", "args": {"message": "x" * 1000}}},
+    )
+    assert response.status_code == 413
+    assert response.json()["error"]["type"] == "RequestTooLarge"
+    assert body_memory.in_flight == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bridge_client", [{"max_request_body_size": 64}], indirect=True)
+async def test_oversized_body_rejected_while_streaming(bridge_client):
+    """Test that a chunked body is rejected once it crosses the limit."""
+    async def chunks():
+        yield b'{"config": {"tool": "echo", "args": {"message": "'
+        yield b"x" * 1000
+        yield b'"}}}'
+
+    response = await bridge_client.post("/runs/stateless", content=chunks())
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_malformed_body_rejected_as_client_error(bridge_client):
+    """Test that a bad Content-Length or a non-JSON body gets 400, not 500."""
+    for content_length in ("abc", "-1"):
+        response = await bridge_client.post(
+            "/runs/stateless", content=b"{}", headers={"Content-Length": content_length}
+        )
+        assert response.status_code == 400
+        assert response.json()["error"]["type"] == "InvalidRequest"
+
+    response = await bridge_client.post("/runs/stateless", content=b"not json")
+    assert response.status_code == 400
+    assert body_memory.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_serve_on_unix_socket(tmp_path):
+    """Test serving the bridge on a Unix domain socket only."""
+    socket_path = str(tmp_path / "bridge.sock")
+    bridge_config = make_bridge_config(uds=socket_path, uds_only=True)
+    server_handle = await serve_mcp_as_acp_async(bridge_config)
+
+    try:
+        async with create_uds_client(socket_path) as client:
+            response = await client.get("/mcp-bridge/agents")
+            assert response.status_code == 200
+            assert response.json()[0]["id"] == "mcp-bridge-test-server"
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    finally:
+        await server_handle.shutdown()
+
+    assert not os.path.exists(socket_path)
+
+
+def test_unix_socket_removed_when_tcp_bind_fails(tmp_path):
+    """Test that a TCP port that cannot be bound leaves no socket file behind."""
+    import socket
+
+    from bridge.server_acp import _bind_sockets
+
+    socket_path = str(tmp_path / "bridge.sock")
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        bridge_config = make_bridge_config(uds=socket_path, host="127.0.0.1", port=taken.getsockname()[1])
+        with pytest.raises(OSError):
+            _bind_sockets(bridge_config)
+    assert not os.path.exists(socket_path)
+
+
+def test_uds_only_requires_uds():
+    """Test that uds_only without a socket path is rejected."""
+    with pytest.raises(ValueError):
+        make_bridge_config(uds_only=True)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority_lanes_and_fair_share():
+    """Test that interactive runs go first and callers share a lane fairly."""
+    import asyncio
+
+    from bridge.scheduler import RunScheduler, SchedulerConfig
+
+    scheduler = RunScheduler(SchedulerConfig(max_concurrency=1))
+    order = []
+
+    async def run(name, lane, caller):
+        async with scheduler.slot(lane, caller):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async with scheduler.slot("default", "warmup"):
+        tasks = [asyncio.ensure_future(run(f"batch-{i}", "default", "batch-job")) for i in range(3)]
+        tasks.append(asyncio.ensure_future(run("user-1", "default", "user")))
+        tasks.append(asyncio.ensure_future(run("urgent", "interactive", "user")))
+        tasks.append(asyncio.ensure_future(run("user-2", "default", "user")))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["lanes"]["default"]["waiting"] == 5
+
+    await asyncio.gather(*tasks)
+    assert order == ["urgent", "batch-0", "user-1", "batch-1", "user-2", "batch-2"]
+    assert scheduler.stats()["lanes"]["default"]["dispatched"] == 6
+
+
+@pytest.mark.asyncio
+async def test_scheduler_lane_cap_and_classification():
+    """Test per-lane concurrency caps and lane/caller selection from requests."""
+    import asyncio
+
+    from bridge.scheduler import RunScheduler, SchedulerConfig
+
+    scheduler = RunScheduler(SchedulerConfig(max_concurrency=4))
+    assert scheduler.classify({"X-ACP-Priority": "batch", "X-AGNTCY-Identity": "did:a"}) == ("batch", "did:a")
+    assert scheduler.classify({"X-AGNTCY-Organization": "org"}, {"metadata": {"priority": "interactive"}}) == ("interactive", "org")
+    assert scheduler.classify({}, {"metadata": {"priority": "unknown"}}) == ("default", "anonymous")
+
+    running = []
+    release = asyncio.Event()
+
+    async def run():
+        async with scheduler.slot("batch", "job"):
+            running.append(1)
+            await release.wait()
+
+    tasks = [asyncio.ensure_future(run()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert len(running) == 2  # the batch lane is capped at 2
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.stats()["running"] == 0
+
+
+@pytest.mark.parametrize(
+    "bridge_client", [{"scheduler": {"max_concurrency": 2}}], indirect=True
+)
+@pytest.mark.asyncio
+async def test_scheduled_run_through_server(bridge_client):
+    """Test that runs still execute when the scheduler is enabled."""
+    response = await bridge_client.post(
+        "/runs/stateless",
+        json={"input": {"tool": "missing", "arguments": {}}},
+        headers={"X-ACP-Priority": "interactive"},
+    )
+    assert response.status_code == 200
+
+    metrics = await bridge_client.get("http://bridge/metrics")
+    assert 'acp_scheduler_wait_seconds_count{lane="interactive"} 1' in metrics.text
+
+
+def test_scheduler_rejects_non_positive_weights():
+    """Test that caller weights must be above zero."""
+    from bridge.scheduler import SchedulerConfig
+
+    for weight in (0, -1):
+        with pytest.raises(ValueError):
+            SchedulerConfig(caller_weights={"did:a": weight})
+
+
+@pytest.mark.parametrize(
+    "bridge_client",
+    [{"rate_limit": {"identity_rate": 1.0, "identity_burst": 2}}],
+    indirect=True,
+)
+@pytest.mark.asyncio
+async def test_rate_limit_per_identity(bridge_client):
+    """Test that each identity gets its own bucket and excess runs get 429."""
+    run = {"input": {"tool": "missing", "arguments": {}}}
+    alice = {"X-AGNTCY-Identity": "did:agntcy:dev:org:alice"}
+
+    first = await bridge_client.post("/runs/stateless", json=run, headers=alice)
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+
+    await bridge_client.post("/runs/stateless", json=run, headers=alice)
+    rejected = await bridge_client.post("/runs/stateless", json=run, headers=alice)
+    assert rejected.status_code == 429
+    assert rejected.json()["error"]["type"] == "RateLimited"
+    assert rejected.headers["Retry-After"] == "1"
+
+    other = await bridge_client.post("/runs/stateless", json=run, headers={"X-AGNTCY-Identity": "did:bob"})
+    assert other.status_code == 200
+
+
+def test_rate_limit_state_is_bounded():
+    """Test that idle buckets expire and tracked keys stay under the cap."""
+    from bridge.rate_limit import TokenBucketLimiter
+
+    limiter = TokenBucketLimiter(rate=10.0, burst=5, max_keys=100)
+    for i in range(1000):
+        limiter.take(f"caller-{i}", now=0.0)
+    assert len(limiter) == 100
+
+    # After burst / rate seconds every bucket is full again and can go
+    limiter.take("late", now=1.0)
+    assert len(limiter) == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(bridge_client):
+    """Test that request, tool and run series show up at /metrics."""
+    await bridge_client.post("/runs/stateless", json={"config": {"tool": "echo", "args": {"message": "hi"}}})
+    await bridge_client.get("/agents/unknown")
+
+    response = await bridge_client.get("http://bridge/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'acp_http_requests_total{route="create_stateless_run",method="POST",status="200"} 1' in body
+    assert 'acp_http_requests_total{route="get_agent_by_id",method="GET",status="404"} 1' in body
+    assert 'mcp_tool_call_duration_seconds_count{tool="echo"} 1' in body
+    assert "acp_runs_in_flight 0" in body
+    assert "mcp_process_restarts_total 0" in body
+    assert 'acp_store_entries{store="tools"} 3' in body
+
+
+def test_histogram_render():
+    """Test that histogram buckets are cumulative and end in +Inf."""
+    from bridge.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    series = histogram.labels("runs")
+    for value in (0.05, 0.1, 0.5, 5.0):
+        series.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="runs",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="runs",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="runs",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="runs"} 4' in lines
+
+
+@pytest.mark.asyncio
+async def test_run_traced_end_to_end(tmp_path):
+    """Test that a run's spans join the caller's trace and are exported."""
+    import json
+
+    from bridge.tracing import TracingConfig
+
+    trace_file = tmp_path / "traces.jsonl"
+    bridge_config = make_bridge_config(tracing=TracingConfig(sample_rate=0.0, file_path=str(trace_file)))
+    executor = MCPToACPBridgeExecutor(SimpleMCPClient(bridge_config), bridge_config)
+    await executor.initialize()
+    app = _create_starlette_app(bridge_config, _create_route_handlers(executor, bridge_config))
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bridge/mcp-bridge") as client:
+        run = {"config": {"tool": "echo", "args": {"message": "hi"}}}
+        # Sampled upstream, so recorded despite sample_rate=0
+        traced = await client.post("/runs/stateless", json=run, headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+        untraced = await client.post("/runs/stateless", json=run)
+        assert traced.status_code == untraced.status_code == 200
+    await executor.cleanup()
+
+    spans = {span["name"]: span for span in map(json.loads, trace_file.read_text().splitlines())}
+    assert set(spans) == {"POST /runs/stateless", "read_body", "execute_stateless_run", "mcp.call_tool", "serialize_response"}
+    assert {span["trace_id"] for span in spans.values()} == {trace_id}
+    assert spans["POST /runs/stateless"]["parent_span_id"] == "00f067aa0ba902b7"
+    assert spans["mcp.call_tool"]["parent_span_id"] == spans["execute_stateless_run"]["span_id"]
+    assert spans["execute_stateless_run"]["attributes"]["acp.run.status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_loop_watchdog_reports_blocking_call():
+    """Test that a blocking call on the loop is reported with its stack."""
+    import asyncio
+    import time
+
+    from bridge.diagnostics import LoopWatchdog
+
+    def blocking_call():
+        time.sleep(0.3)
+
+    watchdog = LoopWatchdog(threshold=0.1)
+    watchdog.start()
+    await asyncio.sleep(0.05)
+    blocking_call()
+    await asyncio.sleep(0.05)
+    watchdog.stop()
+
+    assert watchdog.stalls == 1
+    assert "blocking_call" in watchdog.last_stack
+    assert watchdog.longest_stall >= 0.1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bridge_client", [{"admin_token": "s3cret"}], indirect=True)
+async def test_admin_profile_endpoint(bridge_client):
+    """Test that profiles need the admin token and come back collapsed or as pstats."""
+    import marshal
+
+    url = "http://bridge/admin/profile"
+    assert (await bridge_client.get(url, params={"seconds": 0.1})).status_code == 401
+
+    auth = {"Authorization": "Bearer s3cret"}
+    collapsed = await bridge_client.get(url, params={"seconds": 0.1}, headers=auth)
+    assert collapsed.status_code == 200
+    stack, _, count = collapsed.text.splitlines()[0].rpartition(" ")
+    assert int(count) > 0 and ";" in stack
+
+    profile = await bridge_client.get(url, params={"seconds": 0.1, "format": "pstats"}, headers=auth)
+    assert profile.status_code == 200
+    assert isinstance(marshal.loads(profile.content), dict)
+
+    bad = await bridge_client.get(url, params={"format": "svg"}, headers=auth)
+    assert bad.status_code == 400
+    for seconds in ("nan", "inf", "-1", "0"):
+        bad = await bridge_client.get(url, params={"seconds": seconds, "format": "pstats"}, headers=auth)
+        assert bad.status_code == 400
+
+    # A rejected request leaves the profiler free
+    assert (await bridge_client.get(url, params={"seconds": 0.05}, headers=auth)).status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bridge_client", [{"admin_token": "s3cret"}], indirect=True)
+async def test_admin_memory_endpoints(bridge_client):
+    """Test that memory snapshots can be taken and diffed to find what grew."""
+    url = "http://bridge/admin/memory"
+    auth = {"Authorization": "Bearer s3cret"}
+    assert (await bridge_client.post(f"{url}/start")).status_code == 401
+    assert (await bridge_client.post(f"{url}/snapshots", headers=auth)).status_code == 409
+
+    started = await bridge_client.post(f"{url}/start", headers=auth)
+    try:
+        assert started.json()["tracing"] is True
+        first = (await bridge_client.post(f"{url}/snapshots", headers=auth)).json()["id"]
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = (await bridge_client.post(f"{url}/snapshots", headers=auth, params={"limit": 5})).json()
+        assert len(second["top"]) <= 5
+
+        diff = await bridge_client.get(f"{url}/diff", headers=auth, params={"from": first, "to": second["id"]})
+        assert diff.status_code == 200
+        grown = diff.json()["diff"][0]
+        assert grown["site"].startswith(__file__) and grown["size_diff_bytes"] >= 1024 * 1000
+        del retained
+
+        top = await bridge_client.get(f"{url}/snapshots/{first}", headers=auth, params={"group_by": "filename"})
+        assert top.status_code == 200 and top.json()["id"] == first
+        assert (await bridge_client.get(f"{url}/snapshots/999", headers=auth)).status_code == 404
+        assert (await bridge_client.get(f"{url}/diff", headers=auth, params={"from": first})).status_code == 400
+    finally:
+        stopped = await bridge_client.post(f"{url}/stop", headers=auth)
+    status = stopped.json()
+    assert status["tracing"] is False and status["snapshots"] == []
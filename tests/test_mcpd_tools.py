@@ -0,0 +1,572 @@
+"""Tests for the mcpd REST tool helpers."""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import inspect
+import json
+import threading
+
+import httpx
+import pytest
+
+from bridge.backends import MCPDBackend
+from bridge.bridge_executor import MCPToACPBridgeExecutor
+from bridge.config_acp import MCPToACPBridgeConfig
+from bridge.http_client import MCPDClientManager, close_mcpd_clients, default_client_manager
+from bridge.identity import ASSERTION_HEADER, DID_HEADER, IdentityHeaderProvider
+from bridge.mcpd_catalog import MCPDToolCatalog
+from bridge.mcpd_stream import JSONBodyExtractor, mcpd_call_tool_streaming, mcpd_stream_tool
+from bridge.mcpd_tools import (
+    create_mcpd_tool,
+    mcpd_call_many,
+    mcpd_call_tool,
+    mcpd_call_tool_raw,
+    mcpd_iter_many,
+)
+from bridge.resilience import CircuitOpenError, MCPDResilience, ResiliencePolicy
+from bridge.sync_tools import BackgroundLoop, create_mcpd_sync_tool, sync_tool
+
+MCPD_URL = "http://mcpd.test"
+
+FAKE_CATALOG = {
+    "filesystem": [
+        {"name": "read_file", "description": "Read a file", "inputSchema": {"type": "object"}},
+        {"name": "list_directory", "description": "List a directory", "inputSchema": {}},
+    ],
+    "time": [{"name": "now", "description": "Current time"}],
+}
+
+
+def make_mcpd_client(handler=None) -> httpx.AsyncClient:
+    """AsyncClient backed by an in-memory fake of mcpd's tool endpoint."""
+    def default_handler(request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.split("/")
+        if request.method == "GET" and parts[-1] == "servers":
+            return httpx.Response(200, json=list(FAKE_CATALOG))
+        if request.method == "GET":
+            return httpx.Response(200, json={"tools": FAKE_CATALOG[parts[-2]]})
+        _, _, _, _, server, _, tool = parts
+        args = json.loads(request.content)
+        return httpx.Response(200, json={"body": f"{server}.{tool}:{args.get('path')}"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler or default_handler))
+
+
+@pytest.mark.asyncio
+async def test_mcpd_call_tool_with_injected_client():
+    """Test a call through an injected client."""
+    async with make_mcpd_client() as client:
+        result = await mcpd_call_tool("filesystem", "read_file", {"path": "a.txt"}, MCPD_URL, client=client)
+    assert result == "filesystem.read_file:a.txt"
+
+
+@pytest.mark.asyncio
+async def test_mcpd_call_tool_error_string():
+    """Test that failures are returned as error strings."""
+    async with make_mcpd_client(lambda request: httpx.Response(500)) as client:
+        result = await mcpd_call_tool("filesystem", "read_file", {}, MCPD_URL, client=client)
+    assert result.startswith("Error calling MCP tool read_file")
+
+
+@pytest.mark.asyncio
+async def test_create_mcpd_tool():
+    """Test the generated tool function."""
+    async with make_mcpd_client() as client:
+        read_file = create_mcpd_tool("filesystem", "read_file", MCPD_URL, client=client)
+        assert read_file.__name__ == "read_file"
+        assert await read_file(path="b.txt") == "filesystem.read_file:b.txt"
+
+
+class TestMCPDClientManager:
+    """Test pooled client management."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_client_per_url(self):
+        """Test one client per mcpd URL."""
+        async with MCPDClientManager() as manager:
+            client = manager.get_client(MCPD_URL)
+            assert manager.get_client(MCPD_URL + "/") is client
+            assert manager.get_client("http://other.test") is not client
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_injected_client_is_not_closed(self):
+        """Test that registered clients stay owned by the caller."""
+        injected = make_mcpd_client()
+        manager = MCPDClientManager()
+        manager.register("*", injected)
+        assert manager.get_client(MCPD_URL) is injected
+        await manager.aclose()
+        assert not injected.is_closed
+        await injected.aclose()
+
+    @pytest.mark.asyncio
+    async def test_default_manager_per_loop(self):
+        """Test the shared manager of the running loop."""
+        manager = default_client_manager()
+        assert default_client_manager() is manager
+        client = manager.get_client(MCPD_URL)
+        await close_mcpd_clients()
+        assert client.is_closed
+        assert default_client_manager() is not manager
+
+
+@pytest.mark.asyncio
+async def test_mcpd_backend_executor():
+    """Test the bridge executor on top of the mcpd backend."""
+    bridge_config = MCPToACPBridgeConfig(mcpd_url=MCPD_URL, server_name="mcpd")
+    manager = MCPDClientManager()
+    manager.register(MCPD_URL, make_mcpd_client())
+    executor = MCPToACPBridgeExecutor(MCPDBackend(bridge_config, manager), bridge_config)
+    await executor.initialize()
+
+    tool_names = [tool["name"] for tool in executor._agent_manifest["acp"]["tools"]]
+    assert tool_names == ["filesystem/read_file", "filesystem/list_directory", "time/now"]
+
+    class RunRequest:
+        config = {"tool": "filesystem/read_file", "args": {"path": "c.txt"}}
+
+    result = await executor.execute_stateless_run(RunRequest())
+    assert result.status == "completed"
+    assert result.output["result"] == "filesystem.read_file:c.txt"
+
+    await executor.cleanup()
+    await manager.get_client(MCPD_URL).aclose()
+
+
+def test_bridge_config_requires_one_backend():
+    """Test that exactly one of mcp_command and mcpd_url is accepted."""
+    with pytest.raises(ValueError):
+        MCPToACPBridgeConfig()
+    with pytest.raises(ValueError):
+        MCPToACPBridgeConfig(mcp_command="npx", mcpd_url=MCPD_URL)
+
+
+@pytest.mark.asyncio
+async def test_mcpd_call_many_respects_limits():
+    """Test ordered batch results under the overall and per-server caps."""
+    in_flight = {"total": 0, "peak": 0, "filesystem": 0, "filesystem_peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        server = request.url.path.split("/")[4]
+        in_flight["total"] += 1
+        in_flight[server] = in_flight.get(server, 0) + 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["total"])
+        if server == "filesystem":
+            in_flight["filesystem_peak"] = max(in_flight["filesystem_peak"], in_flight["filesystem"])
+        await asyncio.sleep(0.01)
+        in_flight["total"] -= 1
+        in_flight[server] -= 1
+        return httpx.Response(200, json={"body": json.loads(request.content)["path"]})
+
+    calls = [
+        ("filesystem" if i % 2 else "time", "read_file", {"path": str(i)})
+        for i in range(20)
+    ]
+    async with make_mcpd_client(handler) as client:
+        results = await mcpd_call_many(
+            calls, MCPD_URL, max_concurrency=4, per_server_limit=1, client=client
+        )
+
+    assert results == [str(i) for i in range(20)]
+    assert in_flight["peak"] <= 2
+    assert in_flight["filesystem_peak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_mcpd_iter_many_yields_as_completed():
+    """Test that results arrive in completion order with their indexes."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        delay = json.loads(request.content)["delay"]
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"body": str(delay)})
+
+    calls = [("s", "sleep", {"delay": 0.05}), ("s", "sleep", {"delay": 0.0})]
+    async with make_mcpd_client(handler) as client:
+        results = [item async for item in mcpd_iter_many(calls, MCPD_URL, client=client)]
+
+    assert results == [(1, "0.0"), (0, "0.05")]
+
+
+class TestMCPDToolCatalog:
+    """Test cached mcpd tool discovery."""
+
+    @staticmethod
+    def make_counting_client(requests_seen):
+        """Fake mcpd that serves ETags and answers 304 to matching validators."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            etag = '"v1"'
+            if request.headers.get("if-none-match") == etag:
+                return httpx.Response(304)
+            parts = request.url.path.split("/")
+            data = list(FAKE_CATALOG) if parts[-1] == "servers" else {"tools": FAKE_CATALOG[parts[-2]]}
+            return httpx.Response(200, json=data, headers={"ETag": etag})
+
+        return make_mcpd_client(handler)
+
+    @pytest.mark.asyncio
+    async def test_discovers_tools_with_signatures(self):
+        """Test callables built from the listing."""
+        seen = []
+        async with self.make_counting_client(seen) as client:
+            catalog = MCPDToolCatalog(MCPD_URL, client=client)
+            tools = await catalog.get_tools()
+
+        assert [tool.__name__ for tool in tools] == ["read_file", "list_directory", "now"]
+        assert tools[0].__doc__ == "Read a file"
+        assert len(seen) == 3
+        assert catalog.version is not None
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_revalidation(self):
+        """Test that fresh listings skip requests and stale ones revalidate."""
+        seen = []
+        async with self.make_counting_client(seen) as client:
+            catalog = MCPDToolCatalog(MCPD_URL, client=client, ttl=60)
+            first = await catalog.get_tools()
+            assert await catalog.get_tools() is first
+            assert len(seen) == 3
+
+            catalog.ttl = 0
+            assert await catalog.get_tools() is first
+            assert len(seen) == 6
+            assert all(request.headers.get("if-none-match") == '"v1"' for request in seen[3:])
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_avoids_listing_calls(self, tmp_path):
+        """Test that a new process starts from the on-disk catalog."""
+        cache_path = str(tmp_path / "catalog.json")
+        seen = []
+        async with self.make_counting_client(seen) as client:
+            await MCPDToolCatalog(MCPD_URL, client=client, cache_path=cache_path).refresh()
+            restored = MCPDToolCatalog(MCPD_URL, client=client, cache_path=cache_path)
+            tools = await restored.get_tools()
+
+        assert len(seen) == 3
+        assert len(tools) == 3
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_ignored_for_other_server_filter(self, tmp_path):
+        """Test that a cache written without a server filter is not reused by a filtered catalog."""
+        cache_path = str(tmp_path / "catalog.json")
+        seen = []
+        async with self.make_counting_client(seen) as client:
+            await MCPDToolCatalog(MCPD_URL, client=client, cache_path=cache_path).refresh()
+            filtered = MCPDToolCatalog(MCPD_URL, servers=["time"], client=client, cache_path=cache_path)
+            assert not filtered.is_fresh
+            tools = await filtered.get_tools()
+
+        assert [tool.__name__ for tool in tools] == ["now"]
+
+
+def test_create_mcpd_tool_signature_from_schema():
+    """Test the signature and docs generated from a JSON schema."""
+    schema = {
+        "type": "object",
+        "properties": {
+            "head": {"type": "integer"},
+            "path": {"type": "string", "description": "File to read"},
+        },
+        "required": ["path"],
+    }
+    read_file = create_mcpd_tool("filesystem", "read_file", MCPD_URL, input_schema=schema)
+
+    signature = inspect.signature(read_file)
+    assert list(signature.parameters) == ["path", "head"]
+    assert signature.parameters["path"].annotation is str
+    assert signature.parameters["head"].default is None
+    assert "path: File to read" in read_file.__doc__
+
+
+class TestResilience:
+    """Test hedging, circuit breaking and retries of mcpd calls."""
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_fails_fast(self):
+        """Test that repeated server errors open the circuit."""
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            return httpx.Response(503)
+
+        resilience = MCPDResilience(ResiliencePolicy(failure_threshold=2, max_retries=0))
+        async with make_mcpd_client(handler) as client:
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await mcpd_call_tool_raw("slow", "t", {}, MCPD_URL, client=client, resilience=resilience)
+            with pytest.raises(CircuitOpenError):
+                await mcpd_call_tool_raw("slow", "t", {}, MCPD_URL, client=client, resilience=resilience)
+
+        assert len(attempts) == 2
+        assert resilience.breaker("slow").state == "open"
+        assert resilience.breaker("other").state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_idempotent_call_is_hedged(self):
+        """Test that a slow first attempt is overtaken by the hedge."""
+        attempts = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={"body": f"attempt {len(attempts)}"})
+
+        resilience = MCPDResilience(ResiliencePolicy(hedge_delay=0.01))
+        async with make_mcpd_client(handler) as client:
+            result = await asyncio.wait_for(
+                mcpd_call_tool_raw(
+                    "fs", "read_file", {}, MCPD_URL, client=client, idempotent=True, resilience=resilience
+                ),
+                timeout=1,
+            )
+
+        assert result == "attempt 2"
+
+    @pytest.mark.asyncio
+    async def test_only_idempotent_calls_are_retried(self):
+        """Test that server errors are retried for idempotent tools only."""
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            return httpx.Response(500)
+
+        policy = ResiliencePolicy(hedge=False, max_retries=2, backoff_base=0.001)
+        async with make_mcpd_client(handler) as client:
+            for idempotent in (False, True):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await mcpd_call_tool_raw(
+                        "fs", "t", {}, MCPD_URL, client=client,
+                        idempotent=idempotent, resilience=MCPDResilience(policy),
+                    )
+
+        assert len(attempts) == 1 + 3
+
+    @pytest.mark.parametrize("field,value", [
+        ("max_retries", -1),
+        ("failure_threshold", 0),
+        ("reset_timeout", 0),
+        ("hedge_delay", 0),
+        ("retry_budget_ratio", 0),
+        ("retry_budget_reserve", 0),
+        ("backoff_base", -0.1),
+    ])
+    def test_policy_rejects_out_of_range_settings(self, field, value):
+        """Test that settings which would disable or break the controls are rejected."""
+        with pytest.raises(ValueError):
+            ResiliencePolicy(**{field: value})
+
+
+class TestSyncTools:
+    """Test the blocking tool facades."""
+
+    def test_sync_tool_runs_on_persistent_loop(self):
+        """Test that every call runs on the same background loop."""
+        loop = BackgroundLoop()
+
+        async def which_loop(**kwargs):
+            """Report the running loop."""
+            return asyncio.get_running_loop(), kwargs
+
+        tool = sync_tool(which_loop, loop=loop)
+        try:
+            first_loop, kwargs = tool(path="x")
+            second_loop, _ = tool()
+            assert first_loop is second_loop is loop.loop
+            assert kwargs == {"path": "x"}
+            assert tool.__name__ == "which_loop"
+            assert tool.__doc__ == "Report the running loop."
+        finally:
+            loop.stop()
+
+    def test_sync_tool_timeout(self):
+        """Test that slow calls time out and are cancelled."""
+        loop = BackgroundLoop()
+        cancelled = threading.Event()
+
+        async def slow(**kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        try:
+            with pytest.raises(TimeoutError):
+                sync_tool(slow, timeout=0.05, loop=loop)()
+            assert cancelled.wait(1)
+        finally:
+            loop.stop()
+
+    def test_create_mcpd_sync_tool_signature(self):
+        """Test that the facade keeps the schema-derived signature."""
+        tool = create_mcpd_sync_tool(
+            "filesystem", "read_file", MCPD_URL,
+            input_schema={"properties": {"path": {"type": "string"}}, "required": ["path"]},
+        )
+        assert list(inspect.signature(tool).parameters) == ["path"]
+
+
+class TestStreaming:
+    """Test incremental extraction of large mcpd responses."""
+
+    @pytest.mark.parametrize("document", [
+        {"meta": {"a": [1, "}\"]"]}, "body": "café \"quoted\" \\ \n \U0001F600", "after": 1},
+        {"body": {"structured": True}},
+        {"other": "no body"},
+    ])
+    def test_extractor_matches_full_parse(self, document):
+        """Test that any chunking yields what mcpd_call_tool would return."""
+        text = json.dumps(document)
+        expected = document.get("body", document)
+        expected = expected if isinstance(expected, str) else str(expected)
+
+        for size in (1, 2, 3, 7, len(text)):
+            extractor = JSONBodyExtractor()
+            pieces = []
+            for start in range(0, len(text), size):
+                pieces += extractor.feed(text[start:start + size])
+            fallback = extractor.finish()
+            assert ("".join(pieces) if fallback is None else fallback) == expected
+
+    @pytest.mark.asyncio
+    async def test_stream_tool_yields_body_chunks(self):
+        """Test streaming a response body through the async iterator."""
+        payload = "line\n" * 10000
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"body": payload})
+
+        async with make_mcpd_client(handler) as client:
+            chunks = [chunk async for chunk in mcpd_stream_tool("fs", "read_file", {}, MCPD_URL, client=client)]
+            joined = await mcpd_call_tool_streaming("fs", "read_file", {}, MCPD_URL, client=client)
+
+        assert "".join(chunks) == payload
+        assert joined == payload
+
+
+class TestIdentity:
+    """Test signed identity headers on pooled clients."""
+
+    @pytest.mark.asyncio
+    async def test_pooled_requests_carry_cached_assertion(self, tmp_path):
+        """Test that every request is signed with one cached assertion."""
+        key_path = tmp_path / "identity.key"
+        key_path.write_bytes(b"test-secret")
+        identity = IdentityHeaderProvider("did:agntcy:dev:org:agent", str(key_path))
+
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers)
+            return httpx.Response(200, json={"body": "ok"})
+
+        manager = MCPDClientManager(identity=identity)
+        manager.register(MCPD_URL, make_mcpd_client(handler))
+        for _ in range(3):
+            await mcpd_call_tool("fs", "read_file", {}, MCPD_URL, client=manager.get_client(MCPD_URL))
+        await manager.get_client(MCPD_URL).aclose()
+
+        assert identity.mint_count == 1
+        assert {headers[DID_HEADER] for headers in seen} == {"did:agntcy:dev:org:agent"}
+        token = seen[0][ASSERTION_HEADER]
+        signing_input, _, signature = token.rpartition(".")
+        expected = hmac.new(b"test-secret", signing_input.encode(), hashlib.sha256).digest()
+        assert base64.urlsafe_b64decode(signature + "==") == expected
+
+    @pytest.mark.asyncio
+    async def test_refreshes_in_background_before_expiry(self, tmp_path):
+        """Test that a near-expiry assertion is still served while refreshing."""
+        key_path = tmp_path / "identity.key"
+        key_path.write_bytes(b"test-secret")
+        identity = IdentityHeaderProvider("did:agntcy:dev:org:agent", str(key_path), ttl=10, refresh_margin=10 - 1e-6)
+
+        first = identity.headers()
+        await asyncio.sleep(0.01)
+        assert identity.headers() is first
+        for _ in range(100):
+            if identity.mint_count == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert identity.mint_count == 2
+        assert identity.headers()[ASSERTION_HEADER] != first[ASSERTION_HEADER]
+
+
+@pytest.mark.asyncio
+async def test_traceparent_propagated_to_mcpd():
+    """Test that mcpd calls in a trace are client spans sending traceparent."""
+    from bridge.tracing import SpanContext, Tracer, TracingConfig
+
+    class ListExporter:
+        def __init__(self):
+            self.spans = []
+
+        async def export(self, spans):
+            self.spans.extend(spans)
+
+        async def close(self):
+            pass
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"body": "ok"})
+
+    exporter = ListExporter()
+    tracer = Tracer(TracingConfig(sample_rate=1.0), exporter)
+    async with make_mcpd_client(handler) as client:
+        with tracer.span("run") as root:
+            await mcpd_call_tool_raw("time", "now", {}, MCPD_URL, client=client)
+        await mcpd_call_tool_raw("time", "now", {}, MCPD_URL, client=client)
+    await tracer.close()
+
+    call_span = next(span for span in exporter.spans if span.name == "mcpd.call_tool")
+    assert call_span.parent_id == root.context.span_id
+    assert call_span.attributes["mcp.tool"] == "now"
+    sent = SpanContext.from_traceparent(seen[0])
+    assert (sent.trace_id, sent.span_id, sent.sampled) == (root.context.trace_id, call_span.context.span_id, True)
+    # Outside a trace nothing is added
+    assert seen[1] is None
+
+
+@pytest.mark.asyncio
+async def test_traceparent_propagated_to_streamed_mcpd_call():
+    """Test that streamed mcpd calls in a trace are client spans sending traceparent."""
+    from bridge.tracing import SpanContext, Tracer, TracingConfig
+
+    class ListExporter:
+        def __init__(self):
+            self.spans = []
+
+        async def export(self, spans):
+            self.spans.extend(spans)
+
+        async def close(self):
+            pass
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"body": "ok"})
+
+    exporter = ListExporter()
+    tracer = Tracer(TracingConfig(sample_rate=1.0), exporter)
+    async with make_mcpd_client(handler) as client:
+        with tracer.span("run") as root:
+            assert await mcpd_call_tool_streaming("fs", "read_file", {}, MCPD_URL, client=client) == "ok"
+        await mcpd_call_tool_streaming("fs", "read_file", {}, MCPD_URL, client=client)
+    await tracer.close()
+
+    call_span = next(span for span in exporter.spans if span.name == "mcpd.call_tool")
+    assert call_span.parent_id == root.context.span_id
+    assert call_span.attributes["http.status_code"] == 200
+    sent = SpanContext.from_traceparent(seen[0])
+    assert (sent.trace_id, sent.span_id) == (root.context.trace_id, call_span.context.span_id)
+    assert seen[1] is None